@@ -0,0 +1,281 @@
+from datetime import date
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections, router
+
+from api import consts, geohash
+from api.geocoding import geocode_cache
+from weather.models import Forecast, ForecastArchive, Location
+
+TEMPERATURES = ('min_temperature', 'max_temperature')
+
+# Mean of the forecasts of a day made during that day, see get_accuracy
+OBSERVATIONS_SQL = (
+    'SELECT cell, target_date, '
+    'AVG(min_temperature) AS min_temperature, '
+    'AVG(max_temperature) AS max_temperature '
+    'FROM {archive} '
+    'WHERE target_date BETWEEN %s AND %s AND lead_days = 0{cell} '
+    'GROUP BY cell, target_date'
+)
+OBSERVED_DAYS_SQL = 'SELECT COUNT(*) FROM ({observations}) observed'
+FORECAST_ERRORS_SQL = (
+    'SELECT forecast.lead_days, {errors} '
+    'FROM {archive} forecast '
+    'JOIN ({observations}) observed '
+    'ON observed.cell = forecast.cell '
+    'AND observed.target_date = forecast.target_date '
+    'WHERE forecast.target_date BETWEEN %s AND %s '
+    'AND forecast.lead_days > 0{cell} '
+    'GROUP BY forecast.lead_days ORDER BY forecast.lead_days'
+)
+OVERRIDE_ERRORS_SQL = (
+    'WITH cities (city, cell) AS (VALUES {cities}) '
+    'SELECT {errors} '
+    'FROM {overrides} forecast '
+    'JOIN cities ON cities.city = forecast.city '
+    'JOIN ({observations}) observed '
+    'ON observed.cell = cities.cell '
+    'AND observed.target_date = forecast.date '
+    'WHERE forecast.date BETWEEN %s AND %s'
+)
+
+
+def get_error_columns() -> str:
+    """
+    Returns aggregates of the errors of both temperatures: the number of
+    pairs and the sums of errors, absolute errors and squared errors. Pairs
+    with a missing value are not counted.
+    """
+    columns = []
+    for field in TEMPERATURES:
+        error = f'(forecast.{field} - observed.{field})'
+        columns.extend(
+            (
+                f'COUNT({error})',
+                f'SUM({error})',
+                f'SUM(ABS({error}))',
+                f'SUM({error} * {error})',
+            )
+        )
+    return ', '.join(columns)
+
+
+def summarize(sums: list) -> dict:
+    """
+    Turns the aggregates of ``get_error_columns`` into error statistics.
+
+    Args:
+        sums (list): Aggregates of both temperatures.
+
+    Returns:
+        dict: Number of pairs, mean error (bias), mean absolute error and
+        root mean square error of every temperature.
+    """
+    errors = {}
+    for index, field in enumerate(TEMPERATURES):
+        count, total, absolute, squared = sums[index * 4 : index * 4 + 4]
+        if not count:
+            errors[field] = {
+                'count': 0,
+                'bias': None,
+                'mae': None,
+                'rmse': None,
+            }
+            continue
+        errors[field] = {
+            'count': count,
+            'bias': round(total / count, 2),
+            'mae': round(absolute / count, 2),
+            'rmse': round((squared / count) ** 0.5, 2),
+        }
+    return errors
+
+
+class AccuracyQuery:
+    """
+    Compares archived forecasts and overrides with observed temperatures.
+
+    The database joins forecasts with observations and aggregates the
+    errors, rows of the archive never reach Python. Every query is bounded
+    by the dates of the range, which are the leading column of the archive
+    index and its partition key, so the time does not grow with the size of
+    the archive.
+    """
+
+    def __init__(
+        self, date_from: date, date_to: date, cell: Optional[str] = None
+    ):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.cell = cell
+        self.connection = connections[
+            router.db_for_read(ForecastArchive) or 'default'
+        ]
+
+    def get_table(self, model) -> str:
+        return self.connection.ops.quote_name(model._meta.db_table)
+
+    def get_cell_filter(self, alias: str = '') -> tuple:
+        """Returns the condition on the cell of the city and its params."""
+        if self.cell is None:
+            return '', []
+        return f' AND {alias}cell = %s', [self.cell]
+
+    def get_observations(self) -> tuple:
+        """Returns the subquery of observations and its params."""
+        condition, params = self.get_cell_filter()
+        sql = OBSERVATIONS_SQL.format(
+            archive=self.get_table(ForecastArchive), cell=condition
+        )
+        return sql, [self.date_from, self.date_to, *params]
+
+    def fetch(self, sql: str, params: list) -> list:
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def get_observed_days(self) -> int:
+        """Returns the number of observed days of all cells."""
+        observations, params = self.get_observations()
+        sql = OBSERVED_DAYS_SQL.format(observations=observations)
+        return self.fetch(sql, params)[0][0]
+
+    def get_forecast_errors(self) -> list:
+        """
+        Compares archived forecasts made days ahead with observations.
+
+        Returns:
+            list: Errors of minimal and maximal temperature by lead time.
+        """
+        observations, params = self.get_observations()
+        condition, cell_params = self.get_cell_filter('forecast.')
+        sql = FORECAST_ERRORS_SQL.format(
+            errors=get_error_columns(),
+            archive=self.get_table(ForecastArchive),
+            observations=observations,
+            cell=condition,
+        )
+        params += [self.date_from, self.date_to, *cell_params]
+        return [
+            {'lead_days': lead_days, **summarize(sums)}
+            for lead_days, *sums in self.fetch(sql, params)
+        ]
+
+    def get_override_errors(self, cells: dict) -> dict:
+        """
+        Compares manual forecast overrides with observations.
+
+        Cities are sent with their cells in chunks of
+        ``ACCURACY_CITIES_PER_QUERY``, the aggregates of the chunks add up.
+
+        Args:
+            cells (dict): Geohashes of grid cells by normalized city names.
+
+        Returns:
+            dict: Errors of minimal and maximal temperature.
+        """
+        totals = [0] * 4 * len(TEMPERATURES)
+        cities = list(cells.items())
+        size = consts.ACCURACY_CITIES_PER_QUERY
+        for start in range(0, len(cities), size):
+            chunk = cities[start : start + size]
+            observations, observation_params = self.get_observations()
+            sql = OVERRIDE_ERRORS_SQL.format(
+                cities=', '.join(['(%s, %s)'] * len(chunk)),
+                errors=get_error_columns(),
+                overrides=self.get_table(Forecast),
+                observations=observations,
+            )
+            params = [value for pair in chunk for value in pair]
+            params += observation_params + [self.date_from, self.date_to]
+            sums = self.fetch(sql, params)[0]
+            totals = [
+                total + (value or 0) for total, value in zip(totals, sums)
+            ]
+        return summarize(totals)
+
+
+def get_override_cells(
+    date_from: date,
+    date_to: date,
+    city: Optional[str] = None,
+    cell: Optional[str] = None,
+) -> dict:
+    """
+    Places cities with overrides in the range into grid cells.
+
+    Cities are placed by coordinates of ``Location`` or, when the row is
+    missing, of the geocoding cache and the gazetteer. Cities that were
+    never geocoded are skipped.
+
+    Args:
+        date_from (date): First date of the range.
+        date_to (date): Last date of the range.
+        city (str | None): Normalized city name, all cities if None.
+        cell (str | None): Geohash of the cell of the city.
+
+    Returns:
+        dict: Geohashes of grid cells by normalized city names.
+    """
+    if city is not None:
+        return {city: cell}
+
+    cities = set(
+        Forecast.objects.filter(date__range=(date_from, date_to))
+        .order_by()
+        .values_list('city', flat=True)
+        .distinct()
+    )
+    coordinates = {
+        query: (latitude, longitude)
+        for query, latitude, longitude in Location.objects.filter(
+            query__in=cities, latitude__isnull=False, longitude__isnull=False
+        ).values_list('query', 'latitude', 'longitude')
+    }
+    for query in cities - coordinates.keys():
+        _, location = geocode_cache.get_cached(query)
+        if location is not None:
+            coordinates[query] = location
+    return {
+        query: geohash.encode(
+            latitude, longitude, settings.FORECAST_GRID_PRECISION
+        )
+        for query, (latitude, longitude) in coordinates.items()
+    }
+
+
+def get_accuracy(
+    date_from: date,
+    date_to: date,
+    city: Optional[str] = None,
+    cell: Optional[str] = None,
+) -> dict:
+    """
+    Computes errors of archived forecasts and overrides of the range.
+
+    There is no feed of observations. The observed value of a day is the
+    mean of the forecasts of that very day (lead time 0) fetched during it,
+    which include the hours that have passed, ``observed_source`` of the
+    result says so.
+
+    Args:
+        date_from (date): First date of the range.
+        date_to (date): Last date of the range.
+        city (str | None): Normalized city name, all cities if None.
+        cell (str | None): Geohash of the cell of the city.
+
+    Returns:
+        dict: Source and number of observed days and errors of forecasts by
+        lead time and of overrides.
+    """
+    query = AccuracyQuery(date_from, date_to, cell)
+    return {
+        'observed_source': consts.ACCURACY_OBSERVED_SOURCE,
+        'observed_days': query.get_observed_days(),
+        'forecasts': query.get_forecast_errors(),
+        'overrides': query.get_override_errors(
+            get_override_cells(date_from, date_to, city, cell)
+        ),
+    }
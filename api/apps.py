@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from api import checks  # noqa: F401
+        from api.metrics import install_query_timer
+        from api.override_cache import forecast_deleted, forecast_saved
+        from weather.models import Forecast
+
+        connection_created.connect(
+            install_query_timer, dispatch_uid='api.metrics'
+        )
+        post_save.connect(
+            forecast_saved, sender=Forecast, dispatch_uid='api.override_cache'
+        )
+        post_delete.connect(
+            forecast_deleted,
+            sender=Forecast,
+            dispatch_uid='api.override_cache',
+        )
+        if settings.PREFETCH_IN_PROCESS:
+            from api.prefetch import start_prefetcher
+
+            request_started.connect(
+                start_prefetcher, dispatch_uid='api.prefetch'
+            )
@@ -0,0 +1,308 @@
+import atexit
+import logging
+import os
+import threading
+from datetime import date
+from typing import Optional
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.utils import timezone
+
+from api import consts, geohash
+from api.metrics import archived_forecasts, timed
+from weather.models import ForecastArchive
+
+logger = logging.getLogger(__name__)
+
+PARTITION_FORMAT = '{table}_y{year:04d}m{month:02d}'
+
+
+class ForecastArchiver:
+    """
+    Appends fetched daily forecasts to ``ForecastArchive``.
+
+    A request only puts the rows of the payload into a buffer of the
+    process. A daemon thread writes them with ``bulk_create`` every
+    ``flush_interval`` seconds or as soon as ``ARCHIVE_BATCH_SIZE`` rows are
+    buffered. When the database does not keep up, at most
+    ``ARCHIVE_MAX_PENDING`` rows are kept and the oldest ones are dropped,
+    the archive is not worth slowing requests down.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.enabled = (
+            settings.FORECAST_ARCHIVE if enabled is None else enabled
+        )
+        self.flush_interval = (
+            flush_interval or settings.FORECAST_ARCHIVE_FLUSH_INTERVAL
+        )
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._pid = None
+
+    def record(self, latitude: float, longitude: float, data: dict) -> int:
+        """
+        Buffers the daily temperatures of the fetched forecast.
+
+        Days of the payload start with the local date of the location, so
+        the position of a day is its lead time. Payloads of partial
+        variants without both temperatures are not archived, their missing
+        values would skew the accuracy.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            data (dict): Forecast payload of Open-Meteo.
+
+        Returns:
+            int: Number of buffered rows.
+        """
+        daily = data.get('daily') if self.enabled else None
+        if not daily or not (
+            'temperature_2m_min' in daily and 'temperature_2m_max' in daily
+        ):
+            return 0
+
+        cell, _, _ = geohash.snap(
+            latitude, longitude, settings.FORECAST_GRID_PRECISION
+        )
+        issued_at = timezone.now()
+        days = daily['time']
+        rows = [
+            (cell, day, issued_at, lead, minimum, maximum)
+            for lead, (day, minimum, maximum) in enumerate(
+                zip(
+                    days,
+                    daily['temperature_2m_min'],
+                    daily['temperature_2m_max'],
+                )
+            )
+        ]
+        with self._lock:
+            self._rows.extend(rows)
+            dropped = len(self._rows) - consts.ARCHIVE_MAX_PENDING
+            if dropped > 0:
+                del self._rows[:dropped]
+            pending = len(self._rows)
+        if dropped > 0:
+            archived_forecasts.inc('dropped', amount=dropped)
+
+        self.start()
+        if pending >= consts.ARCHIVE_BATCH_SIZE:
+            self._wakeup.set()
+        return len(rows)
+
+    def flush(self) -> int:
+        """
+        Writes the buffered rows to the database.
+
+        Returns:
+            int: Number of written rows.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            objects = [
+                ForecastArchive(
+                    cell=cell,
+                    target_date=date.fromisoformat(day),
+                    issued_at=issued_at,
+                    lead_days=lead,
+                    min_temperature=minimum,
+                    max_temperature=maximum,
+                )
+                for cell, day, issued_at, lead, minimum, maximum in rows
+            ]
+            try:
+                with timed('archive'):
+                    ForecastArchive.objects.bulk_create(
+                        objects, batch_size=consts.IMPORT_BATCH_SIZE
+                    )
+            except DatabaseError:
+                logger.exception(
+                    'Failed to archive %s forecast rows.', len(rows)
+                )
+                archived_forecasts.inc('failed', amount=len(rows))
+                return 0
+            archived_forecasts.inc('written', amount=len(rows))
+            return len(rows)
+
+    def run_forever(self) -> None:
+        """
+        Flushes the buffer periodically until stopped.
+
+        Partitions of the coming months are created when the writer starts
+        and when a month begins, a failure is left to the next month or to
+        ``manage.py archive_partitions``.
+        """
+        month = None
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                if month != timezone.localdate().replace(day=1):
+                    month = timezone.localdate().replace(day=1)
+                    ensure_partitions()
+                self.flush()
+            except DatabaseError:
+                logger.exception('Failed to create archive partitions.')
+            finally:
+                close_old_connections()
+
+    def start(self) -> None:
+        """Starts the writer in a daemon thread of the current process."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            threading.Thread(
+                target=self.run_forever, name='forecast-archiver', daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        """Stops the writer and writes what is left in the buffer."""
+        self._stop.set()
+        self._wakeup.set()
+        self.flush()
+
+
+def add_months(day: date, months: int) -> date:
+    """Returns the first day of the month ``months`` after the day."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    return PARTITION_FORMAT.format(
+        table=ForecastArchive._meta.db_table,
+        year=month.year,
+        month=month.month,
+    )
+
+
+def get_partitions(connection) -> list:
+    """Returns names of the monthly partitions of the archive."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE parent.relname = %s',
+            [ForecastArchive._meta.db_table],
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    return sorted(names - {f'{ForecastArchive._meta.db_table}_default'})
+
+
+def ensure_partitions(
+    ahead: int = consts.ARCHIVE_PARTITIONS_AHEAD, using: str = 'default'
+) -> list:
+    """
+    Creates monthly partitions of the archive up to ``ahead`` months ahead.
+
+    Only PostgreSQL partitions the archive. Rows of a month without a
+    partition are kept in the default partition, they are moved to the
+    partition of their month when it is created.
+
+    Args:
+        ahead (int): Number of months after the current one.
+        using (str): Alias of the database.
+
+    Returns:
+        list: Names of the created partitions.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return []
+
+    table = connection.ops.quote_name(ForecastArchive._meta.db_table)
+    default = connection.ops.quote_name(
+        f'{ForecastArchive._meta.db_table}_default'
+    )
+    existing = set(get_partitions(connection))
+    current = timezone.localdate().replace(day=1)
+    created = []
+    for months in range(ahead + 1):
+        start = add_months(current, months)
+        end = add_months(start, 1)
+        name = get_partition_name(start)
+        if name in existing:
+            continue
+
+        partition = connection.ops.quote_name(name)
+        with transaction.atomic(using), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE {partition} '
+                f'(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {default} '
+                f'WHERE target_date >= %s AND target_date < %s '
+                f'RETURNING *) INSERT INTO {partition} SELECT * FROM moved',
+                [start, end],
+            )
+            cursor.execute(
+                f'ALTER TABLE {table} ATTACH PARTITION {partition} '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+        created.append(name)
+    return created
+
+
+def drop_partitions(keep: int, using: str = 'default') -> tuple:
+    """
+    Removes archived forecasts of the months before the last ``keep``.
+
+    On PostgreSQL monthly partitions are dropped, which takes no time
+    whatever their size, and old rows left in the default partition are
+    deleted. Other databases delete the rows.
+
+    Args:
+        keep (int): Number of months to keep, including the current one.
+        using (str): Alias of the database.
+
+    Returns:
+        Tuple[int, int]: Numbers of dropped partitions and deleted rows.
+    """
+    cutoff = add_months(timezone.localdate(), 1 - keep)
+    connection = connections[using]
+    dropped = 0
+    if connection.vendor == 'postgresql':
+        for name in get_partitions(connection):
+            if name >= get_partition_name(cutoff):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+            dropped += 1
+
+    deleted, _ = (
+        ForecastArchive.objects.using(using)
+        .filter(target_date__lt=cutoff)
+        .delete()
+    )
+    return dropped, deleted
+
+
+forecast_archiver = ForecastArchiver()
+atexit.register(forecast_archiver.stop)
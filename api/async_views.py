@@ -0,0 +1,317 @@
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import Throttled, ValidationError
+
+from api import consts
+from api.archive import forecast_archiver
+from api.exeptions import LocationError, UpstreamError
+from api.forecast_cache import (
+    async_forecast_flight,
+    async_forecast_revalidation,
+    forecast_cache,
+)
+from api.geocoding import geocode_cache
+from api.http_cache import (
+    get_cache_headers,
+    get_override_max_age,
+    is_not_modified,
+    make_etag,
+)
+from api.metrics import geocode_lookups, throttled_requests, timed
+from api.prefetch import popularity
+from api.ratelimit import client_limiter, get_client_id
+from api.renderers import select_lean_renderer
+from api.upstream import async_open_meteo
+from api.validators import parse_forecast_query
+from api.views import BaseWeatherMixin
+
+
+class AsyncWeatherMixin:
+    """
+    Mixin to work with weather forecast through open-meteo without blocking
+    the event loop.
+    """
+
+    data_age = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        wait = await client_limiter.aacquire(get_client_id(request))
+        if wait:
+            throttled_requests.inc('client')
+            error = Throttled(wait)
+            return self.error_response(
+                {'detail': error.detail},
+                error.status_code,
+                headers={'Retry-After': str(error.wait)},
+            )
+        return await super().dispatch(request, *args, **kwargs)
+
+    def error_response(
+        self, data: dict, status_code: int, headers: Optional[dict] = None
+    ) -> HttpResponse:
+        """
+        Builds the error response rendered like the one of the sync view.
+
+        Args:
+            data (dict): Payload of the response.
+            status_code (int): HTTP status code.
+            headers (dict | None): Response headers.
+
+        Returns:
+            HttpResponse: Rendered response.
+        """
+        renderer = select_lean_renderer(self.request)
+        return HttpResponse(
+            renderer.render(data),
+            content_type=renderer.media_type,
+            status=status_code,
+            headers=headers,
+        )
+
+    @staticmethod
+    async def get_coordinates(city: str):
+        """
+        Returns coordinates of the city.
+
+        Cities from the in-process geocode cache are resolved in place, the
+        rest go through the database and Nominatim in a worker thread.
+
+        Raises:
+            LocationError: If the city cannot be geocoded.
+            UpstreamError: If the geocoder did not answer.
+        """
+        found, coordinates = geocode_cache.get_cached(city)
+        if not found:
+            return await sync_to_async(geocode_cache.get_coordinates)(city)
+        geocode_lookups.inc('local')
+
+        if coordinates is None:
+            raise LocationError
+        return coordinates
+
+    @staticmethod
+    async def get_override(city: str, date):
+        """Async version of ``BaseWeatherMixin.get_override``."""
+        return await sync_to_async(BaseWeatherMixin.get_override)(city, date)
+
+    def cached_response(
+        self, request, data: dict, max_age: int, last_modified=None
+    ) -> HttpResponse:
+        """Version of ``BaseWeatherMixin.cached_response`` for Django views."""
+        renderer = select_lean_renderer(request)
+        etag = make_etag(data, renderer.format)
+        if self.data_age is not None:
+            max_age = 0
+        headers = get_cache_headers(etag, max_age, last_modified)
+        if self.data_age is not None:
+            headers['X-Data-Age'] = str(self.data_age)
+        if is_not_modified(request, etag):
+            return HttpResponseNotModified(headers=headers)
+        return HttpResponse(
+            renderer.render(data),
+            content_type=renderer.media_type,
+            headers=headers,
+        )
+
+    @staticmethod
+    async def get_forecast(latitude: float, longitude: float):
+        """
+        Fetches daily weather forecast from Open-Meteo API.
+
+        Raises:
+            UpstreamError: If Open-Meteo API did not answer.
+
+        Returns:
+            httpx.Response: HTTP response object from Open-Meteo API.
+        """
+        return await async_open_meteo.get(
+            settings.OPEN_METEO_URL,
+            params=BaseWeatherMixin.get_forecast_params(latitude, longitude),
+        )
+
+    @staticmethod
+    def parse_weather_response(response):
+        """
+        Parses weather API response and handles possible errors.
+
+        Returns:
+            Tuple[dict | None, Tuple[dict, int] | None]: Parsed JSON data and
+            None on success, or None and error payload with its status code
+            on failure.
+        """
+        try:
+            with timed('parse'):
+                data = response.json()
+        except ValueError:
+            return None, (
+                {'message': 'Error parsing data with weather API'},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if response.status_code != status.HTTP_200_OK:
+            return None, (data, response.status_code)
+        return data, None
+
+    async def get_validated_forecast(self, city: str):
+        """
+        Validates city and fetches weather data from Open-Meteo API.
+
+        Returns:
+            Tuple[dict | None, HttpResponse | None]: Parsed forecast data or
+            error response.
+        """
+        try:
+            latitude, longitude = await self.get_coordinates(city)
+        except LocationError:
+            return None, self.error_response(
+                {'message': 'Location not found.'},
+                status.HTTP_404_NOT_FOUND,
+            )
+        except UpstreamError:
+            return None, self.error_response(
+                {'message': 'Weather service is unavailable.'},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        popularity.record(city)
+
+        latitude, longitude = forecast_cache.snap(latitude, longitude)
+        key = forecast_cache.make_key(latitude, longitude)
+        cached = await forecast_cache.alookup(latitude, longitude)
+        if cached is not None and not cached.stale:
+            return cached.data, None
+        if (
+            cached is not None
+            and cached.stale <= settings.FORECAST_STALE_WHILE_REVALIDATE
+        ):
+            await forecast_cache.aincrement('stale')
+            async_forecast_revalidation.submit(
+                key, self.revalidate_forecast, latitude, longitude
+            )
+            self.data_age = cached.age
+            return cached.data, None
+
+        try:
+            data, error = await async_forecast_flight.do(
+                key, self.fetch_forecast, latitude, longitude
+            )
+        except UpstreamError:
+            data, error = None, (
+                {'message': 'Weather service is unavailable.'},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        if error is None:
+            return data, None
+        if (
+            cached is not None
+            and cached.stale <= settings.FORECAST_STALE_IF_ERROR
+            and error[1] in consts.STALE_IF_ERROR_STATUSES
+        ):
+            await forecast_cache.aincrement('stale_if_error')
+            self.data_age = cached.age
+            return cached.data, None
+        return None, self.error_response(*error)
+
+    async def revalidate_forecast(
+        self, latitude: float, longitude: float
+    ) -> None:
+        """Async version of ``BaseWeatherMixin.revalidate_forecast``."""
+        try:
+            _, error = await async_forecast_flight.do(
+                forecast_cache.make_key(latitude, longitude),
+                self.fetch_forecast,
+                latitude,
+                longitude,
+            )
+        except UpstreamError:
+            await forecast_cache.aincrement('revalidation_errors')
+            return
+        if error is not None:
+            await forecast_cache.aincrement('revalidation_errors')
+
+    async def fetch_forecast(self, latitude: float, longitude: float):
+        """
+        Fetches the forecast from Open-Meteo API and stores it in the cache.
+
+        Returns:
+            Tuple[dict | None, Tuple[dict, int] | None]: Parsed forecast data
+            or error payload with its status code.
+        """
+        data = await forecast_cache.apeek(latitude, longitude)
+        if data is not None:
+            return data, None
+
+        response = await self.get_forecast(latitude, longitude)
+        data, error = self.parse_weather_response(response)
+        if data is not None:
+            await forecast_cache.aset(latitude, longitude, data)
+            forecast_archiver.record(latitude, longitude, data)
+        return data, error
+
+
+class AsyncCurrentWeatherView(AsyncWeatherMixin, View):
+    """Async view for precessing requests for current weather."""
+
+    async def get(self, request):
+        city = request.GET.get('city')
+
+        if not city:
+            return self.error_response(
+                {'message': 'The required parameter city was not passed'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        data, error_response = await self.get_validated_forecast(city)
+
+        if error_response:
+            return error_response
+
+        return self.cached_response(
+            request,
+            BaseWeatherMixin.get_current_weather(data),
+            forecast_cache.get_timeout(),
+        )
+
+
+class AsyncForecastWeatherView(AsyncWeatherMixin, View):
+    """Async view for precessing requests for forecast weather."""
+
+    async def get(self, request):
+        try:
+            with timed('validate'):
+                city, date = parse_forecast_query(request.GET)
+        except ValidationError as error:
+            return self.error_response(
+                error.detail, status.HTTP_400_BAD_REQUEST
+            )
+
+        override = await self.get_override(city, date)
+        if override is not None:
+            updated_at = override.pop('updated_at')
+            return self.cached_response(
+                request,
+                override,
+                get_override_max_age(updated_at),
+                updated_at,
+            )
+
+        data, error_response = await self.get_validated_forecast(city)
+
+        if error_response:
+            return error_response
+
+        forecast = BaseWeatherMixin.get_daily_forecast(data, date)
+        if forecast is None:
+            return self.error_response(
+                {'message': 'Forecast for this date is not available.'},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        return self.cached_response(
+            request, forecast, forecast_cache.get_timeout()
+        )
@@ -0,0 +1,24 @@
+from django.db.backends.sqlite3 import base
+
+from api import consts
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend tuned for concurrent web traffic.
+
+    Every connection switches the database to WAL, so readers are not
+    blocked by the writer, and applies the rest of ``SQLITE_PRAGMAS``.
+    Transactions start with ``BEGIN IMMEDIATE``: a deferred transaction
+    that reads and then writes fails with "database is locked" instead of
+    waiting for ``busy_timeout`` when another writer got in between.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in consts.SQLITE_PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
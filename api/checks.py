@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+
+@register()
+def check_gazetteer(app_configs, **kwargs):
+    """Checks that the configured offline gazetteer exists."""
+    path = settings.GEOCODER_GAZETTEER
+    if path and not os.path.isfile(path):
+        return [
+            Error(
+                f'Gazetteer {path} does not exist.',
+                hint='Build it with "manage.py build_gazetteer" or unset '
+                'GEOCODER_GAZETTEER.',
+                id='api.E001',
+            )
+        ]
+    return []
+
+
+@register()
+def check_cache_size(app_configs, **kwargs):
+    """Checks that a culling cache can hold the prefetched cities."""
+    cache = settings.CACHES['default']
+    max_entries = cache.get('OPTIONS', {}).get('MAX_ENTRIES')
+    needed = settings.PREFETCH_TOP_CITIES * settings.CACHE_ENTRIES_PER_CITY
+    if (
+        cache['BACKEND'] in settings.CULLING_CACHE_BACKENDS
+        and max_entries is not None
+        and max_entries < needed
+    ):
+        return [
+            Warning(
+                f'The cache holds {max_entries} entries, prefetching '
+                f'{settings.PREFETCH_TOP_CITIES} cities needs about {needed}.',
+                hint='Raise CACHE_MAX_ENTRIES or set it to 0, or lower '
+                'PREFETCH_TOP_CITIES.',
+                id='api.W002',
+            )
+        ]
+    return []
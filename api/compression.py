@@ -0,0 +1,69 @@
+import gzip
+from typing import Optional
+
+from api import consts
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def compress_gzip(content: bytes) -> bytes:
+    # mtime is fixed so that equal payloads give equal bytes.
+    return gzip.compress(content, compresslevel=consts.GZIP_LEVEL, mtime=0)
+
+
+def compress_brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=consts.BROTLI_QUALITY)
+
+
+COMPRESSORS = {'gzip': compress_gzip}
+if brotli is not None:
+    COMPRESSORS = {'br': compress_brotli, **COMPRESSORS}
+
+
+def parse_accept_encoding(value: str) -> set:
+    """
+    Returns content codings accepted by the client.
+
+    Args:
+        value (str): Value of the ``Accept-Encoding`` header.
+
+    Returns:
+        set: Lowercase codings, codings with zero quality are left out.
+    """
+    accepted = set()
+    for item in value.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, number = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def get_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the content coding of the response.
+
+    Brotli is preferred to gzip when it is installed, since it compresses
+    JSON better at the same speed.
+
+    Args:
+        accept_encoding (str): Value of the ``Accept-Encoding`` header.
+
+    Returns:
+        str | None: ``br``, ``gzip`` or None if the client accepts neither.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    for encoding in COMPRESSORS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
@@ -1,2 +1,102 @@
 DATE_FORMAT = '%d.%m.%Y'
 REQUIRED_FORECAST_DAYS = 11
+NOMINATIM_USER_AGENT = 'weather_api'
+NOMINATIM_MIN_DELAY_SECONDS = 1
+GEOCODE_CACHE_SIZE = 4096
+GEOCODE_NEGATIVE_TTL = 24 * 60 * 60
+FORECAST_CACHE_PREFIX = 'forecast'
+FORECAST_UPDATE_INTERVAL = 60 * 60
+SINGLEFLIGHT_PREFIX = 'singleflight'
+SINGLEFLIGHT_POLL_INTERVAL = 0.05
+UPSTREAM_RETRY_STATUSES = (500, 502, 503, 504)
+BATCH_MAX_ITEMS = 500
+BATCH_LOCATIONS_PER_REQUEST = 50
+BATCH_MAX_WORKERS = 8
+FORECAST_MAX_DAYS_AHEAD = 10
+IMPORT_BATCH_SIZE = 1000
+EXPORT_PAGE_SIZE = 2000
+OVERRIDE_MAX_AGE = 5 * 60
+OVERRIDE_CACHE_PREFIX = 'override'
+OVERRIDE_CACHE_TIMEOUT = 24 * 60 * 60
+INVALIDATION_LOG_MAX_SIZE = 1024 * 1024
+RANGE_LAYOUTS = ('rows', 'columns')
+HOURLY_LAYOUTS = ('columns',)
+
+# Fields of the API by Open-Meteo variables they are read from.
+DAILY_FIELDS = {
+    'min_temperature': 'temperature_2m_min',
+    'max_temperature': 'temperature_2m_max',
+    'precipitation': 'precipitation_sum',
+    'precipitation_probability': 'precipitation_probability_max',
+    'wind_speed': 'wind_speed_10m_max',
+    'wind_gusts': 'wind_gusts_10m_max',
+    'humidity': 'relative_humidity_2m_mean',
+}
+HOURLY_FIELDS = {
+    'temperature': 'temperature_2m',
+    'humidity': 'relative_humidity_2m',
+    'precipitation': 'precipitation',
+    'precipitation_probability': 'precipitation_probability',
+    'wind_speed': 'wind_speed_10m',
+    'wind_direction': 'wind_direction_10m',
+    'wind_gusts': 'wind_gusts_10m',
+    'cloud_cover': 'cloud_cover',
+}
+DAILY_DEFAULT_FIELDS = ('min_temperature', 'max_temperature')
+HOURLY_DEFAULT_FIELDS = ('temperature',)
+OVERRIDE_FIELDS = ('min_temperature', 'max_temperature')
+FORECAST_VARIANT_SIZE = 6
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+PREFETCH_PREFIX = 'prefetch'
+PREFETCH_FLUSH_INTERVAL = 10
+PREFETCH_HALF_LIFE = 24 * 60 * 60
+PREFETCH_JITTER = 0.1
+PREFETCH_GEOCODE_PER_CYCLE = 10
+GEOCODE_MAX_AGE = 30 * 24 * 60 * 60
+
+REVALIDATION_MAX_WORKERS = 4
+WARMUP_TOP_CITIES = 1000
+
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_MAX_PENDING = 100_000
+ARCHIVE_PARTITIONS_AHEAD = 3
+ACCURACY_DEFAULT_DAYS = 30
+ACCURACY_MAX_DAYS = 366
+ACCURACY_CITIES_PER_QUERY = 1000
+ACCURACY_OBSERVED_SOURCE = 'same_day_forecast'
+RATE_LIMIT_PREFIX = 'ratelimit'
+RATE_LIMIT_TTL = 60 * 60
+UPSTREAM_BUDGET_PREFIX = 'budget'
+UPSTREAM_BUDGET_BURST = 10
+STALE_IF_ERROR_STATUSES = (429, 500, 502, 503, 504)
+
+METRICS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+GAZETTEER_MAGIC = b'GZT1'
+GAZETTEER_LIMIT = 100_000
+
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 20_000),
+    ('cache_size', -20_000),
+    ('temp_store', 'MEMORY'),
+    ('mmap_size', 256 * 1024 * 1024),
+)
+REPLICA_MODELS = ('weather.forecast', 'weather.forecastarchive')
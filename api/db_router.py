@@ -0,0 +1,35 @@
+import random
+
+from django.conf import settings
+
+from api import consts
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads of forecast overrides and the forecast
+    archive to replicas.
+
+    Replicas are the aliases of ``DATABASE_REPLICAS``, PostgreSQL only, a
+    random one is picked for every query. Writes, reads of other models and
+    migrations go to the default database. Replicas lag behind the
+    primary, so reads whose result is cached for long, like misses of the
+    override cache, pick the default database explicitly.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.DATABASE_REPLICAS
+            and model._meta.label_lower in consts.REPLICA_MODELS
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
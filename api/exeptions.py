@@ -1,2 +1,14 @@
 class LocationError(BaseException):
     pass
+
+
+class UpstreamError(Exception):
+    """Upstream service did not answer."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Calls to upstream service are suspended after repeated failures."""
+
+
+class BudgetExceededError(UpstreamError):
+    """Calls to upstream service are shed to stay within its quota."""
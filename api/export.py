@@ -0,0 +1,100 @@
+import csv
+import json
+from typing import Iterator, Optional
+
+from django.db.models import Q
+
+from api import consts
+from weather.models import Forecast
+from weather.utils import normalize_city
+
+CSV_HEADER = ('city', 'date', 'min_temperature', 'max_temperature')
+
+
+class _Echo:
+    """File-like object returning written value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_forecasts(
+    city_prefix: Optional[str] = None,
+    date_from=None,
+    date_to=None,
+    page_size: int = consts.EXPORT_PAGE_SIZE,
+) -> Iterator[list]:
+    """
+    Yields forecast overrides ordered by (date, city) page by page.
+
+    Pages are selected by keyset pagination over the (date, city) index, so
+    every query is short and memory use does not depend on the table size.
+
+    Args:
+        city_prefix (str | None): Beginning of the city name.
+        date_from (date | None): First date of the range.
+        date_to (date | None): Last date of the range.
+        page_size (int): Number of rows per query.
+
+    Yields:
+        list: Tuples of city, date, minimal and maximal temperature.
+    """
+    queryset = Forecast.objects.order_by('date', 'city').values_list(
+        'city', 'date', 'min_temperature', 'max_temperature'
+    )
+    if city_prefix:
+        queryset = queryset.filter(
+            city__startswith=normalize_city(city_prefix)
+        )
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+
+    page = list(queryset[:page_size])
+    while page:
+        yield page
+        if len(page) < page_size:
+            return
+
+        city, date = page[-1][0], page[-1][1]
+        page = list(
+            queryset.filter(Q(date__gt=date) | Q(date=date, city__gt=city))[
+                :page_size
+            ]
+        )
+
+
+def render_ndjson(pages: Iterator[list]) -> Iterator[str]:
+    """Renders pages of forecasts as newline delimited JSON."""
+    for page in pages:
+        yield ''.join(
+            json.dumps(
+                {
+                    'city': city,
+                    'date': date.strftime(consts.DATE_FORMAT),
+                    'min_temperature': min_temperature,
+                    'max_temperature': max_temperature,
+                }
+            )
+            + '\n'
+            for city, date, min_temperature, max_temperature in page
+        )
+
+
+def render_csv(pages: Iterator[list]) -> Iterator[str]:
+    """Renders pages of forecasts as CSV with a header row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for page in pages:
+        yield ''.join(
+            writer.writerow(
+                (
+                    city,
+                    date.strftime(consts.DATE_FORMAT),
+                    min_temperature,
+                    max_temperature,
+                )
+            )
+            for city, date, min_temperature, max_temperature in page
+        )
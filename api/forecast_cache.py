@@ -0,0 +1,326 @@
+import hashlib
+import math
+import time
+from typing import NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api import consts, geohash
+from api.singleflight import (
+    AsyncBackgroundFlight,
+    AsyncSingleFlight,
+    BackgroundFlight,
+    SingleFlight,
+    get_lease,
+)
+
+
+class CachedForecast(NamedTuple):
+    """Forecast payload found in the cache."""
+
+    data: dict
+    age: int
+    stale: int
+
+
+class ForecastCache:
+    """
+    Cache of Open-Meteo forecasts backed by the Django cache framework.
+
+    Entries are keyed by the geohash of ``precision`` characters of the
+    location, so all places within one grid cell share the forecast fetched
+    for the center of the cell. Entries hold the whole upstream payload, so
+    every date of the forecast window is answered from one entry. Payloads
+    with other sets of variables than the default one are kept under keys
+    with the ``variant`` of the set, so every set is cached on its own.
+    Entries are fresh until the upstream model run they were fetched from
+    is replaced. After that they are kept for
+    ``FORECAST_STALE_WHILE_REVALIDATE`` or ``FORECAST_STALE_IF_ERROR``
+    seconds, whichever is longer, to be served while they are revalidated
+    or when upstream fails.
+    """
+
+    STATS = (
+        'hits',
+        'misses',
+        'stale',
+        'stale_if_error',
+        'revalidation_errors',
+    )
+
+    def __init__(
+        self,
+        prefix: str = consts.FORECAST_CACHE_PREFIX,
+        precision: Optional[int] = None,
+        update_interval: int = consts.FORECAST_UPDATE_INTERVAL,
+    ):
+        self.prefix = prefix
+        self.precision = precision or settings.FORECAST_GRID_PRECISION
+        self.update_interval = update_interval
+
+    @property
+    def max_stale(self) -> int:
+        return max(
+            settings.FORECAST_STALE_WHILE_REVALIDATE,
+            settings.FORECAST_STALE_IF_ERROR,
+        )
+
+    def snap(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """
+        Returns the center of the grid cell containing the location.
+
+        Forecasts are fetched for centers of cells, so that one upstream
+        request serves every place of the cell.
+        """
+        _, latitude, longitude = geohash.snap(
+            latitude, longitude, self.precision
+        )
+        return latitude, longitude
+
+    def make_key(
+        self, latitude: float, longitude: float, variant: str = ''
+    ) -> str:
+        cell, _, _ = geohash.snap(latitude, longitude, self.precision)
+        if variant:
+            return f'{self.prefix}:{cell}:{variant}'
+        return f'{self.prefix}:{cell}'
+
+    @staticmethod
+    def get_variant(variables: Optional[dict]) -> str:
+        """
+        Returns the variant of the set of Open-Meteo variables.
+
+        Args:
+            variables (dict | None): Daily and hourly variables of the
+                payload, None for the default set.
+
+        Returns:
+            str: Short hash of the set or an empty string for the default
+            set, whose payloads are shared by every endpoint.
+        """
+        if variables is None:
+            return ''
+        value = ';'.join(
+            f'{kind}={",".join(sorted(names))}'
+            for kind, names in sorted(variables.items())
+        )
+        digest = hashlib.blake2b(
+            value.encode(), digest_size=consts.FORECAST_VARIANT_SIZE
+        )
+        return digest.hexdigest()
+
+    def get_timeout(self) -> int:
+        """
+        Returns seconds left until the next upstream model update.
+        """
+        return self.update_interval - int(time.time()) % self.update_interval
+
+    def get(
+        self, latitude: float, longitude: float, variant: str = ''
+    ) -> Optional[dict]:
+        """
+        Returns the fresh cached forecast payload for the coordinates.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variant (str): Variant of the set of variables of the payload.
+
+        Returns:
+            dict | None: Open-Meteo payload or None on a cache miss.
+        """
+        data = self.peek(latitude, longitude, variant)
+        self.increment('hits' if data is not None else 'misses')
+        return data
+
+    def peek(
+        self, latitude: float, longitude: float, variant: str = ''
+    ) -> Optional[dict]:
+        """Same as ``get``, but does not touch hit and miss counters."""
+        key = self.make_key(latitude, longitude, variant)
+        return self._unwrap(cache.get(key))
+
+    def lookup(
+        self, latitude: float, longitude: float, variant: str = ''
+    ) -> Optional[CachedForecast]:
+        """
+        Returns the cached forecast payload, even if it is stale.
+
+        Fresh entries are counted as hits, stale and missing ones as misses.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variant (str): Variant of the set of variables of the payload.
+
+        Returns:
+            CachedForecast | None: Payload with seconds since it was fetched
+            and seconds since it became stale (0 while fresh).
+        """
+        entry = cache.get(self.make_key(latitude, longitude, variant))
+        cached = self._to_cached(entry)
+        fresh = cached is not None and not cached.stale
+        self.increment('hits' if fresh else 'misses')
+        return cached
+
+    def set(
+        self,
+        latitude: float,
+        longitude: float,
+        data: dict,
+        timeout: Optional[int] = None,
+        variant: str = '',
+    ) -> None:
+        """
+        Stores the forecast payload until the next upstream model update.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            data (dict): Open-Meteo payload.
+            timeout (int | None): Freshness lifetime of the entry, defaults
+                to the time left until the next upstream model update.
+            variant (str): Variant of the set of variables of the payload.
+        """
+        key = self.make_key(latitude, longitude, variant)
+        self.set_many({key: data}, timeout)
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Returns fresh cached forecast payloads for several locations at once.
+
+        Args:
+            keys (list): Cache keys made by ``make_key``.
+
+        Returns:
+            dict: Open-Meteo payloads by keys, misses are left out.
+        """
+        found = self.peek_many(keys)
+        self.increment('hits', len(found))
+        self.increment('misses', len(keys) - len(found))
+        return found
+
+    def peek_many(self, keys: list) -> dict:
+        """Same as ``get_many``, but does not touch hit and miss counters."""
+        found = {}
+        for key, entry in cache.get_many(keys).items():
+            data = self._unwrap(entry)
+            if data is not None:
+                found[key] = data
+        return found
+
+    def set_many(self, payloads: dict, timeout: Optional[int] = None) -> None:
+        """
+        Stores forecast payloads of several locations at once.
+
+        Args:
+            payloads (dict): Open-Meteo payloads by keys made by ``make_key``.
+            timeout (int | None): Freshness lifetime of the entries, defaults
+                to the time left until the next upstream model update.
+        """
+        if timeout is None:
+            timeout = self.get_timeout()
+        now = time.time()
+        cache.set_many(
+            {
+                key: self._wrap(data, now, timeout)
+                for key, data in payloads.items()
+            },
+            timeout + self.max_stale,
+        )
+
+    async def aget(self, latitude: float, longitude: float) -> Optional[dict]:
+        """Async version of ``get``."""
+        data = await self.apeek(latitude, longitude)
+        await self.aincrement('hits' if data is not None else 'misses')
+        return data
+
+    async def apeek(self, latitude: float, longitude: float) -> Optional[dict]:
+        """Async version of ``peek``."""
+        entry = await cache.aget(self.make_key(latitude, longitude))
+        return self._unwrap(entry)
+
+    async def alookup(
+        self, latitude: float, longitude: float
+    ) -> Optional[CachedForecast]:
+        """Async version of ``lookup``."""
+        entry = await cache.aget(self.make_key(latitude, longitude))
+        cached = self._to_cached(entry)
+        fresh = cached is not None and not cached.stale
+        await self.aincrement('hits' if fresh else 'misses')
+        return cached
+
+    async def aset(
+        self, latitude: float, longitude: float, data: dict
+    ) -> None:
+        """Async version of ``set``."""
+        timeout = self.get_timeout()
+        await cache.aset(
+            self.make_key(latitude, longitude),
+            self._wrap(data, time.time(), timeout),
+            timeout + self.max_stale,
+        )
+
+    def get_stats(self) -> dict:
+        """Returns counters shared by all workers."""
+        keys = {name: self._stats_key(name) for name in self.STATS}
+        values = cache.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    def increment(self, name: str, delta: int = 1) -> None:
+        """
+        Increments the counter shared by all workers.
+
+        Args:
+            name (str): One of ``STATS``.
+            delta (int): Value to add.
+        """
+        if not delta:
+            return
+        key = self._stats_key(name)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            if not cache.add(key, delta, timeout=None):
+                cache.incr(key, delta)
+
+    async def aincrement(self, name: str) -> None:
+        """Async version of ``increment``."""
+        key = self._stats_key(name)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            if not await cache.aadd(key, 1, timeout=None):
+                await cache.aincr(key)
+
+    def _stats_key(self, name: str) -> str:
+        return f'{self.prefix}:stats:{name}'
+
+    @staticmethod
+    def _wrap(data: dict, now: float, timeout: int) -> dict:
+        return {'data': data, 'fetched_at': now, 'expires_at': now + timeout}
+
+    @staticmethod
+    def _unwrap(entry: Optional[dict]) -> Optional[dict]:
+        if entry is None or entry['expires_at'] < time.time():
+            return None
+        return entry['data']
+
+    @staticmethod
+    def _to_cached(entry: Optional[dict]) -> Optional[CachedForecast]:
+        if entry is None:
+            return None
+        now = time.time()
+        return CachedForecast(
+            data=entry['data'],
+            age=int(now - entry['fetched_at']),
+            stale=max(0, math.ceil(now - entry['expires_at'])),
+        )
+
+
+forecast_cache = ForecastCache()
+forecast_flight = SingleFlight(get_lease())
+async_forecast_flight = AsyncSingleFlight()
+forecast_revalidation = BackgroundFlight(consts.REVALIDATION_MAX_WORKERS)
+async_forecast_revalidation = AsyncBackgroundFlight()
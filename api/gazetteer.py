@@ -0,0 +1,155 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from api import consts
+from weather.utils import normalize_city
+
+HEADER = struct.Struct('<4sI')
+RECORD = struct.Struct('<Qff')
+HASH = struct.Struct('<Q')
+
+Coordinates = Tuple[float, float]
+
+
+def fold_name(name: str) -> str:
+    """
+    Brings a place name to the form used as a gazetteer key.
+
+    Normalizes the name like ``normalize_city`` and drops diacritics, so
+    ``Zürich``, ``zurich`` and ``ZURICH`` are the same key.
+
+    Args:
+        name (str): Place name.
+
+    Returns:
+        str: Folded name.
+    """
+    decomposed = unicodedata.normalize('NFKD', normalize_city(name))
+    return ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+
+
+def hash_name(name: str) -> int:
+    """Returns the 64-bit key of the place name."""
+    digest = hashlib.blake2b(fold_name(name).encode(), digest_size=8)
+    return HASH.unpack(digest.digest())[0]
+
+
+class Gazetteer:
+    """
+    Read-only city-to-coordinates index in a memory-mapped file.
+
+    The file holds a header and fixed-size records of a 64-bit hash of the
+    folded name and float32 coordinates, sorted by hash. Lookups are a
+    binary search over the mapping, so the pages are shared by all worker
+    processes through the OS page cache instead of being copied into each
+    heap. Names themselves are not stored, a hash collision of two names
+    is possible but improbable for any realistic number of places.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap = None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def lookup(self, name: str) -> Optional[Coordinates]:
+        """
+        Returns coordinates of the place.
+
+        Args:
+            name (str): Place name.
+
+        Returns:
+            Tuple[float, float] | None: Latitude and longitude or None if
+            the place is not in the gazetteer.
+        """
+        self._open()
+        key = hash_name(name)
+        data = self._mmap
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            value = HASH.unpack_from(data, offset)[0]
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                _, latitude, longitude = RECORD.unpack_from(data, offset)
+                return round(latitude, 5), round(longitude, 5)
+        return None
+
+    def _open(self) -> None:
+        if self._mmap is not None:
+            return
+        with self._lock:
+            if self._mmap is not None:
+                return
+            with open(self.path, 'rb') as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = HEADER.unpack_from(data, 0)
+            if magic != consts.GAZETTEER_MAGIC:
+                data.close()
+                raise ValueError(f'{self.path} is not a gazetteer file.')
+            self._count = count
+            self._mmap = data
+
+
+def write_gazetteer(path: str, places: Iterable) -> int:
+    """
+    Writes places to a gazetteer file.
+
+    The file is replaced atomically, so running workers keep the mapping of
+    the previous version until they restart.
+
+    Args:
+        path (str): Path of the file.
+        places (Iterable): Name, latitude and longitude of every place in
+            order of priority, the first place of every name wins.
+
+    Returns:
+        int: Number of written names.
+    """
+    records = {}
+    for name, latitude, longitude in places:
+        key = hash_name(name)
+        if key not in records:
+            records[key] = (latitude, longitude)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+        'wb', dir=directory, delete=False
+    ) as file:
+        file.write(HEADER.pack(consts.GAZETTEER_MAGIC, len(records)))
+        for key in sorted(records):
+            file.write(RECORD.pack(key, *records[key]))
+    os.replace(file.name, path)
+    return len(records)
+
+
+_gazetteer = None
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Returns the gazetteer configured in settings, if any."""
+    global _gazetteer
+    if not settings.GEOCODER_GAZETTEER:
+        return None
+    if _gazetteer is None or _gazetteer.path != settings.GEOCODER_GAZETTEER:
+        _gazetteer = Gazetteer(settings.GEOCODER_GAZETTEER)
+    return _gazetteer
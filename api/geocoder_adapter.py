@@ -0,0 +1,27 @@
+import requests
+from geopy.adapters import BaseSyncAdapter
+
+from api.exeptions import UpstreamError
+from api.upstream import nominatim
+
+
+class UpstreamGeocoderAdapter(BaseSyncAdapter):
+    """Geopy adapter sending geocoder requests through ``nominatim``."""
+
+    def __init__(self, *, proxies=None, ssl_context=None):
+        super().__init__(proxies=proxies, ssl_context=ssl_context)
+
+    def get_text(self, url, *, timeout, headers):
+        return self._request(url, headers).text
+
+    def get_json(self, url, *, timeout, headers):
+        return self._request(url, headers).json()
+
+    @staticmethod
+    def _request(url: str, headers: dict) -> requests.Response:
+        response = nominatim.get(url, headers=headers)
+        if response.status_code != 200:
+            raise UpstreamError(
+                f'{nominatim.name}: status code {response.status_code}'
+            )
+        return response
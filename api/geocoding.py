@@ -0,0 +1,265 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from api import consts
+from api.exeptions import LocationError
+from api.gazetteer import get_gazetteer
+from api.metrics import geocode_lookups
+from api.singleflight import SingleFlight, get_lease
+from weather.models import Location
+from weather.utils import normalize_city
+
+if TYPE_CHECKING:
+    from geopy.geocoders import Nominatim
+
+Coordinates = Tuple[float, float]
+
+
+class GeocodeCache:
+    """
+    Geocoding cache in front of Nominatim.
+
+    Lookups go through an in-process LRU first, then through the offline
+    gazetteer if one is configured, then through the Location table, and
+    only then to Nominatim. Cities that Nominatim could not resolve are
+    cached too, but only for ``negative_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = consts.GEOCODE_CACHE_SIZE,
+        negative_ttl: int = consts.GEOCODE_NEGATIVE_TTL,
+    ):
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._geolocator = None
+        self._flight = SingleFlight(get_lease())
+
+    @property
+    def geolocator(self) -> 'Nominatim':
+        # geopy is imported with the first geocoder request, most lookups
+        # are answered by the cache layers without it.
+        if self._geolocator is None:
+            from geopy.geocoders import Nominatim
+
+            from api.geocoder_adapter import UpstreamGeocoderAdapter
+
+            self._geolocator = Nominatim(
+                user_agent=consts.NOMINATIM_USER_AGENT,
+                domain=settings.NOMINATIM_DOMAIN,
+                scheme=settings.NOMINATIM_SCHEME,
+                adapter_factory=UpstreamGeocoderAdapter,
+            )
+        return self._geolocator
+
+    def get_coordinates(self, city: str) -> Coordinates:
+        """
+        Returns coordinates of the city.
+
+        Args:
+            city (str): City name.
+
+        Raises:
+            LocationError: If the city cannot be geocoded.
+            UpstreamError: If the geocoder did not answer.
+
+        Returns:
+            Tuple[float, float]: Latitude and longitude of the city.
+        """
+        query = normalize_city(city)
+
+        found, coordinates = self._get_local(query)
+        layer = 'local'
+        if not found:
+            found, coordinates = self._get_offline(query)
+            layer = 'gazetteer'
+        if not found:
+            found, coordinates = self._get_stored(query)
+            layer = 'stored'
+        if not found:
+            coordinates = self._flight.do(
+                f'geocode:{query}', self._geocode_once, query
+            )
+            layer = 'geocoder'
+        geocode_lookups.inc(layer)
+
+        if coordinates is None:
+            raise LocationError
+        return coordinates
+
+    def get_cached(self, city: str) -> Tuple[bool, Optional[Coordinates]]:
+        """
+        Looks the city up in the in-process layer and the gazetteer only.
+
+        Never touches the database or the network, so it is safe to call
+        from async code.
+
+        Args:
+            city (str): City name.
+
+        Returns:
+            Tuple[bool, Tuple[float, float] | None]: Whether the city is
+            cached and its coordinates (None for unknown cities).
+        """
+        query = normalize_city(city)
+        found, coordinates = self._get_local(query)
+        if not found:
+            found, coordinates = self._get_offline(query)
+        return found, coordinates
+
+    def preload(self, locations) -> int:
+        """
+        Puts known coordinates into the in-process layer.
+
+        Args:
+            locations (Iterable): Normalized city name, latitude and
+                longitude of every city, the most important first.
+
+        Returns:
+            int: Number of preloaded cities.
+        """
+        locations = list(locations)[: self.maxsize]
+        # The most important cities go last to be evicted last.
+        for query, latitude, longitude in reversed(locations):
+            self._set_local(query, (latitude, longitude))
+        return len(locations)
+
+    def store_offline(self, queries) -> int:
+        """
+        Saves coordinates of cities found in the gazetteer to ``Location``.
+
+        Gazetteer hits are answered without the database, so the cities
+        get their ``Location`` rows, which popularity, prefetch and warm-up
+        rely on, only when this is called off the request path.
+
+        Args:
+            queries (Iterable): Normalized city names.
+
+        Returns:
+            int: Number of cities found in the gazetteer.
+        """
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            return 0
+
+        locations = []
+        for query in queries:
+            coordinates = gazetteer.lookup(query)
+            if coordinates is not None:
+                latitude, longitude = coordinates
+                locations.append(
+                    Location(
+                        query=query, latitude=latitude, longitude=longitude
+                    )
+                )
+        Location.objects.bulk_create(locations, ignore_conflicts=True)
+        return len(locations)
+
+    def forget(self, city: str) -> None:
+        """Drops the city from the in-process layer."""
+        with self._lock:
+            self._entries.pop(normalize_city(city), None)
+
+    def clear(self) -> None:
+        """Drops every entry from the in-process layer."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, query: str) -> Tuple[bool, Optional[Coordinates]]:
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                return False, None
+
+            coordinates, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[query]
+                return False, None
+
+            self._entries.move_to_end(query)
+            return True, coordinates
+
+    def _set_local(
+        self, query: str, coordinates: Optional[Coordinates]
+    ) -> None:
+        expires_at = None
+        if coordinates is None:
+            expires_at = time.monotonic() + self.negative_ttl
+
+        with self._lock:
+            self._entries[query] = (coordinates, expires_at)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _get_offline(self, query: str) -> Tuple[bool, Optional[Coordinates]]:
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            return False, None
+
+        coordinates = gazetteer.lookup(query)
+        if coordinates is None:
+            return False, None
+
+        self._set_local(query, coordinates)
+        return True, coordinates
+
+    def _get_stored(self, query: str) -> Tuple[bool, Optional[Coordinates]]:
+        location = Location.objects.filter(query=query).first()
+        if location is None:
+            return False, None
+
+        if location.is_found:
+            coordinates = (location.latitude, location.longitude)
+        elif timezone.now() - location.updated_at < timedelta(
+            seconds=self.negative_ttl
+        ):
+            coordinates = None
+        else:
+            return False, None
+
+        self._set_local(query, coordinates)
+        return True, coordinates
+
+    def _geocode_once(self, query: str) -> Optional[Coordinates]:
+        found, coordinates = self._get_stored(query)
+        if found:
+            return coordinates
+        return self._geocode(query)
+
+    def _geocode(self, query: str) -> Optional[Coordinates]:
+        location = self.geolocator.geocode(query)
+        coordinates = None
+        if location:
+            coordinates = (location.latitude, location.longitude)
+
+        self.store(query, coordinates)
+        return coordinates
+
+    def store(self, city: str, coordinates: Optional[Coordinates]) -> None:
+        """
+        Saves a geocoding result to both cache layers.
+
+        Args:
+            city (str): City name.
+            coordinates (Tuple[float, float] | None): Coordinates of the
+                city or None if the city was not found.
+        """
+        query = normalize_city(city)
+        latitude, longitude = coordinates or (None, None)
+        Location.objects.update_or_create(
+            query=query,
+            defaults={'latitude': latitude, 'longitude': longitude},
+        )
+        self._set_local(query, coordinates)
+
+
+geocode_cache = GeocodeCache()
@@ -0,0 +1,94 @@
+from functools import lru_cache
+from typing import Tuple
+
+from api import consts
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DECODE_MAP = {char: index for index, char in enumerate(BASE32)}
+
+
+def encode(latitude: float, longitude: float, precision: int) -> str:
+    """
+    Encodes coordinates as a geohash.
+
+    Args:
+        latitude (float): Latitude of the point.
+        longitude (float): Longitude of the point.
+        precision (int): Number of characters of the geohash.
+
+    Returns:
+        str: Geohash of the cell containing the point.
+    """
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            interval, coordinate = longitude_range, longitude
+        else:
+            interval, coordinate = latitude_range, latitude
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """
+    Decodes a geohash into the center of its cell.
+
+    Args:
+        geohash (str): Geohash.
+
+    Returns:
+        Tuple[float, float]: Latitude and longitude of the center.
+    """
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            interval = longitude_range if even else latitude_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+
+    return (
+        (latitude_range[0] + latitude_range[1]) / 2,
+        (longitude_range[0] + longitude_range[1]) / 2,
+    )
+
+
+@lru_cache(maxsize=consts.GEOCODE_CACHE_SIZE)
+def snap(latitude: float, longitude: float, precision: int):
+    """
+    Moves the point to the center of its geohash cell.
+
+    Args:
+        latitude (float): Latitude of the point.
+        longitude (float): Longitude of the point.
+        precision (int): Number of characters of the geohash.
+
+    Returns:
+        Tuple[str, float, float]: Geohash of the cell and latitude and
+        longitude of its center.
+    """
+    geohash = encode(latitude, longitude, precision)
+    center_latitude, center_longitude = decode(geohash)
+    return geohash, round(center_latitude, 6), round(center_longitude, 6)
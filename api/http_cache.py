@@ -0,0 +1,90 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from api import consts
+
+
+def make_etag(data, representation: str = 'json') -> str:
+    """
+    Computes a strong ETag of the response payload.
+
+    Args:
+        data: Payload of the response.
+        representation (str): Format of the rendered payload, other formats
+            than JSON get ETags of their own.
+
+    Returns:
+        str: Quoted ETag.
+    """
+    content = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    if representation != 'json':
+        content = f'{representation}:{content}'
+    return quote_etag(
+        hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    )
+
+
+def get_override_max_age(updated_at: datetime) -> int:
+    """
+    Returns freshness lifetime of an override-backed answer.
+
+    Overrides that have not changed for a long time are likely to stay the
+    same, so the lifetime is a tenth of the time since the last change,
+    limited by ``OVERRIDE_MAX_AGE``.
+
+    Args:
+        updated_at (datetime): Time of the last change of the override.
+
+    Returns:
+        int: Lifetime in seconds.
+    """
+    age = (timezone.now() - updated_at).total_seconds()
+    return max(0, min(int(age / 10), consts.OVERRIDE_MAX_AGE))
+
+
+def get_cache_headers(
+    etag: str, max_age: int, last_modified: Optional[datetime] = None
+) -> dict:
+    """
+    Builds HTTP caching headers of the response.
+
+    Args:
+        etag (str): Quoted ETag of the payload.
+        max_age (int): Freshness lifetime in seconds.
+        last_modified (datetime | None): Time of the last change of data.
+
+    Returns:
+        dict: Response headers.
+    """
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={max_age}',
+        'Vary': 'Accept',
+    }
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """
+    Checks whether the client already has the payload with this ETag.
+
+    Args:
+        request: Django or DRF request.
+        etag (str): Quoted ETag of the payload.
+
+    Returns:
+        bool: True if the response can be 304 Not Modified.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+
+    etags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+    return '*' in etags or etag in etags
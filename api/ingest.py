@@ -0,0 +1,230 @@
+import csv
+import io
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from api import consts
+from api.override_cache import override_cache
+from weather import consts as weather_consts
+from weather.models import Forecast
+from weather.utils import normalize_city
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_MESSAGE = 'This field is required.'
+BLANK_MESSAGE = 'This field may not be blank.'
+NUMBER_MESSAGE = 'A valid number is required.'
+DATE_MESSAGE = (
+    'Date has wrong format. Use one of these formats instead: DD.MM.YYYY.'
+)
+SAVE_MESSAGE = 'The row could not be saved, try again later.'
+
+
+def read_csv(text: str) -> list:
+    """
+    Reads forecast overrides from CSV with a header row.
+
+    Args:
+        text (str): CSV document.
+
+    Returns:
+        list: Rows as dicts.
+    """
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def validate_rows(rows: list):
+    """
+    Validates forecast overrides in one pass over the rows.
+
+    Applies the rules of ``ForecastWriteSerializer`` without building a
+    serializer per row. Rows repeating a (city, date) pair override the
+    earlier ones.
+
+    Args:
+        rows (list): Rows as dicts.
+
+    Returns:
+        Tuple[dict, list]: Valid temperatures with the number of the row
+        by (city, date) and errors with the numbers of their rows.
+    """
+    today = timezone.now().date()
+    last_date = today + timedelta(consts.FORECAST_MAX_DAYS_AHEAD)
+    min_temp, max_temp = weather_consts.MIN_TEMP, weather_consts.MAX_TEMP
+    parse_date = datetime.strptime
+
+    valid = {}
+    errors = []
+    for number, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(
+                {
+                    'row': number,
+                    'errors': {'non_field_errors': ['Invalid data.']},
+                }
+            )
+            continue
+
+        row_errors = {}
+        city = row.get('city')
+        if city is None:
+            row_errors['city'] = [REQUIRED_MESSAGE]
+        elif not str(city).strip():
+            row_errors['city'] = [BLANK_MESSAGE]
+        else:
+            city = normalize_city(str(city))
+            if len(city) > weather_consts.MAX_NAME_LENGTH:
+                row_errors['city'] = [
+                    'Ensure this field has no more than '
+                    f'{weather_consts.MAX_NAME_LENGTH} characters.'
+                ]
+
+        date = row.get('date')
+        if not date:
+            row_errors['date'] = [REQUIRED_MESSAGE]
+        else:
+            try:
+                date = parse_date(str(date), consts.DATE_FORMAT).date()
+            except ValueError:
+                row_errors['date'] = [DATE_MESSAGE]
+            else:
+                if date < today:
+                    row_errors['date'] = {
+                        'message': 'The date cannot be in the past.'
+                    }
+                elif date > last_date:
+                    row_errors['date'] = {
+                        'message': 'The date cannot be more than 10 days in '
+                        'the future.'
+                    }
+
+        temperatures = []
+        for field in ('min_temperature', 'max_temperature'):
+            value = row.get(field)
+            if value is None or value == '':
+                row_errors[field] = [REQUIRED_MESSAGE]
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                row_errors[field] = [NUMBER_MESSAGE]
+                continue
+            if not math.isfinite(value):
+                row_errors[field] = [NUMBER_MESSAGE]
+                continue
+            if value < min_temp:
+                row_errors[field] = [
+                    'Ensure this value is greater than or equal to '
+                    f'{min_temp}.'
+                ]
+            elif value > max_temp:
+                row_errors[field] = [
+                    f'Ensure this value is less than or equal to {max_temp}.'
+                ]
+            temperatures.append(value)
+
+        if not row_errors and temperatures[0] > temperatures[1]:
+            row_errors['message'] = [
+                'min_temperature can not be more then max_temperature.'
+            ]
+
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        else:
+            valid[city, date] = (*temperatures, number)
+
+    return valid, errors
+
+
+def upsert_forecasts(values: dict, batch_size: int):
+    """
+    Creates or updates forecast overrides with batched upserts.
+
+    Every batch is saved in its own transaction. A batch the database
+    rejects is reported row by row and the import goes on with the next
+    one.
+
+    Args:
+        values (dict): Minimal and maximal temperatures with the number of
+            the row by (city, date).
+        batch_size (int): Number of rows per statement and transaction.
+
+    Returns:
+        Tuple[int, list]: Number of saved rows and errors with the numbers
+        of the rows that were not saved.
+    """
+    items = list(values.items())
+    saved = 0
+    errors = []
+    for start in range(0, len(items), batch_size):
+        batch = items[start : start + batch_size]
+        forecasts = [
+            Forecast(
+                city=city,
+                date=date,
+                min_temperature=min_temperature,
+                max_temperature=max_temperature,
+            )
+            for (city, date), (min_temperature, max_temperature, _) in batch
+        ]
+        try:
+            with transaction.atomic():
+                Forecast.objects.bulk_create(
+                    forecasts,
+                    update_conflicts=True,
+                    unique_fields=('city', 'date'),
+                    update_fields=(
+                        'min_temperature',
+                        'max_temperature',
+                        'updated_at',
+                    ),
+                )
+        except DatabaseError:
+            logger.exception(
+                'Failed to save a batch of %s forecasts.', len(batch)
+            )
+            errors.extend(
+                {'row': number, 'errors': {'non_field_errors': [SAVE_MESSAGE]}}
+                for _, (_, _, number) in batch
+            )
+            continue
+        saved += len(batch)
+        # Bulk upserts send no signals, so cached overrides of the cities
+        # are dropped at once.
+        override_cache.invalidate(forecast.city for forecast in forecasts)
+    return saved, errors
+
+
+def import_forecasts(
+    rows: list, batch_size: int = consts.IMPORT_BATCH_SIZE
+) -> dict:
+    """
+    Validates and saves forecast overrides.
+
+    Args:
+        rows (list): Rows as dicts.
+        batch_size (int): Number of rows per statement and transaction.
+
+    Returns:
+        dict: Report with counters, per-row errors and speed of import.
+    """
+    started = time.perf_counter()
+    values, errors = validate_rows(rows)
+    saved, save_errors = upsert_forecasts(values, batch_size)
+    if save_errors:
+        errors = sorted(errors + save_errors, key=lambda error: error['row'])
+    seconds = time.perf_counter() - started
+
+    return {
+        'received': len(rows),
+        'saved': saved,
+        'failed': len(errors),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(len(rows) / seconds) if seconds else 0,
+    }
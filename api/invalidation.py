@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from django.conf import settings
+
+from api import consts
+
+MISSING = object()
+
+
+class InvalidationLog:
+    """
+    Append-only file broadcasting cache invalidations between processes.
+
+    Every worker of the host appends its invalidations as JSON lines and
+    reads the lines of the other workers on ``poll``, which costs one
+    ``stat`` call when nothing was published. Once the file outgrows
+    ``max_size`` it is replaced with an empty one; workers that had not
+    read it to the end are told so and have to drop their caches.
+    """
+
+    def __init__(
+        self, path: str, max_size: int = consts.INVALIDATION_LOG_MAX_SIZE
+    ):
+        self.path = path
+        self.max_size = max_size
+        self._inode = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict) -> None:
+        """
+        Appends the message to the log.
+
+        Args:
+            message (dict): JSON-serializable message.
+        """
+        line = (json.dumps(dict(message, pid=os.getpid())) + '\n').encode()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        while True:
+            descriptor = os.open(
+                self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                os.write(descriptor, line)
+                written = os.fstat(descriptor)
+            finally:
+                os.close(descriptor)
+            # Written to a file rotated meanwhile, nobody will read it.
+            if os.stat(self.path).st_ino == written.st_ino:
+                break
+
+        if written.st_size > self.max_size:
+            with tempfile.NamedTemporaryFile(
+                dir=directory, delete=False
+            ) as file:
+                pass
+            os.replace(file.name, self.path)
+
+    def poll(self) -> Optional[list]:
+        """
+        Returns messages published by other processes since the last poll.
+
+        Returns:
+            list | None: Messages in order of publishing or None if the log
+            was rotated before it was read to the end, so some messages
+            might have been lost.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            with self._lock:
+                # Whatever is published later is news for this process.
+                self._inode, self._offset = MISSING, 0
+            return []
+
+        with self._lock:
+            if self._inode is None:
+                self._inode, self._offset = stat.st_ino, stat.st_size
+            elif self._inode is MISSING:
+                self._inode = stat.st_ino
+            elif stat.st_ino != self._inode:
+                self._inode, self._offset = stat.st_ino, 0
+                return None
+            if stat.st_size == self._offset:
+                return []
+
+            with open(self.path, 'rb') as file:
+                if os.fstat(file.fileno()).st_ino != self._inode:
+                    self._inode, self._offset = None, 0
+                    return None
+                file.seek(self._offset)
+                chunk = file.read(stat.st_size - self._offset)
+            # A line being written is left for the next poll.
+            chunk = chunk[: chunk.rfind(b'\n') + 1]
+            self._offset += len(chunk)
+
+        pid = os.getpid()
+        messages = []
+        for line in chunk.splitlines():
+            message = json.loads(line)
+            if message.pop('pid') != pid:
+                messages.append(message)
+        return messages
+
+
+def get_invalidation_log() -> Optional[InvalidationLog]:
+    """Builds the invalidation log configured in settings."""
+    if not settings.CACHE_INVALIDATION_LOG:
+        return None
+    return InvalidationLog(settings.CACHE_INVALIDATION_LOG)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api import consts
+from api.archive import drop_partitions, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates monthly partitions of the forecast archive ahead of time '
+        '(PostgreSQL only) and removes months older than --keep.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=consts.ARCHIVE_PARTITIONS_AHEAD,
+            help='Months after the current one to create partitions for.',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            help='Months to keep including the current one, all by default.',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        created = ensure_partitions(options['ahead'], options['database'])
+        for name in created:
+            self.stdout.write(f'Created {name}.')
+
+        if options['keep']:
+            dropped, deleted = drop_partitions(
+                options['keep'], options['database']
+            )
+            self.stdout.write(
+                f'Dropped {dropped} partitions, deleted {deleted} rows.'
+            )
+        self.stdout.write(self.style.SUCCESS('Archive partitions are ready.'))
@@ -0,0 +1,108 @@
+import io
+import zipfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import consts
+from api.gazetteer import write_gazetteer
+
+NAME, ASCII_NAME, ALTERNATE_NAMES = 1, 2, 3
+LATITUDE, LONGITUDE, FEATURE_CLASS, POPULATION = 4, 5, 6, 14
+
+
+class Command(BaseCommand):
+    help = (
+        'Builds the offline gazetteer from a GeoNames dump '
+        '(cities500.txt, cities1000.zip, allCountries.txt, ...).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dump', help='Path to a GeoNames .txt or .zip.')
+        parser.add_argument(
+            '-o',
+            '--output',
+            default=settings.GEOCODER_GAZETTEER,
+            help='Path of the gazetteer, GEOCODER_GAZETTEER by default.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=consts.GAZETTEER_LIMIT,
+            help='Number of the most populated places to keep.',
+        )
+        parser.add_argument(
+            '--no-aliases',
+            action='store_true',
+            help='Index main names only, without alternate names.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError(
+                'Pass --output or set GEOCODER_GAZETTEER in the environment.'
+            )
+
+        places = sorted(
+            self.read_places(options['dump']),
+            key=lambda place: place[0],
+            reverse=True,
+        )[: options['limit']]
+
+        names = []
+        for _, name_list, latitude, longitude in places:
+            names.extend((name, latitude, longitude) for name in name_list[:2])
+        if not options['no_aliases']:
+            for _, name_list, latitude, longitude in places:
+                names.extend(
+                    (name, latitude, longitude) for name in name_list[2:]
+                )
+
+        count = write_gazetteer(options['output'], names)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote {count} names of {len(places)} places to '
+                f'{options["output"]}.'
+            )
+        )
+
+    @staticmethod
+    def read_places(path: str):
+        """
+        Yields populated places of the dump.
+
+        Yields:
+            Tuple[int, list, float, float]: Population, name, ASCII name and
+            alternate names, latitude and longitude of the place.
+        """
+        if path.endswith('.zip'):
+            with zipfile.ZipFile(path) as archive:
+                member = next(
+                    name
+                    for name in archive.namelist()
+                    if name.endswith('.txt')
+                )
+                with archive.open(member) as binary:
+                    yield from Command.parse_lines(
+                        io.TextIOWrapper(binary, encoding='utf-8')
+                    )
+            return
+
+        with open(path, encoding='utf-8') as file:
+            yield from Command.parse_lines(file)
+
+    @staticmethod
+    def parse_lines(lines):
+        for line in lines:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) <= POPULATION or fields[FEATURE_CLASS] != 'P':
+                continue
+            names = [fields[NAME], fields[ASCII_NAME]]
+            if fields[ALTERNATE_NAMES]:
+                names.extend(fields[ALTERNATE_NAMES].split(','))
+            yield (
+                int(fields[POPULATION] or 0),
+                names,
+                float(fields[LATITUDE]),
+                float(fields[LONGITUDE]),
+            )
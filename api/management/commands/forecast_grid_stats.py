@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import geohash
+from weather.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        'Shows how many geocoded locations share grid cells, that is how '
+        'many upstream forecast requests the grid saves.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'precisions',
+            nargs='*',
+            type=int,
+            help='Geohash lengths to check, FORECAST_GRID_PRECISION if none.',
+        )
+
+    def handle(self, *args, **options):
+        precisions = options['precisions'] or [
+            settings.FORECAST_GRID_PRECISION
+        ]
+        locations = list(
+            Location.objects.filter(
+                latitude__isnull=False, longitude__isnull=False
+            ).values_list('latitude', 'longitude')
+        )
+        for precision in precisions:
+            cells = {
+                geohash.encode(latitude, longitude, precision)
+                for latitude, longitude in locations
+            }
+            saved = 1 - len(cells) / len(locations) if locations else 0
+            self.stdout.write(
+                f'Precision {precision}: {len(locations)} locations in '
+                f'{len(cells)} cells, {saved:.0%} fewer upstream requests.'
+            )
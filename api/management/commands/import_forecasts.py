@@ -0,0 +1,61 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import consts
+from api.ingest import import_forecasts, read_csv
+
+
+class Command(BaseCommand):
+    help = 'Creates or updates forecast overrides from a CSV or JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Path to the file, "-" to read from stdin.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json'),
+            help='Format of the file, guessed from its extension if omitted.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=consts.IMPORT_BATCH_SIZE,
+            help='Number of rows per statement and transaction.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            file_format = 'json' if path.endswith('.json') else 'csv'
+
+        if path == '-':
+            text = sys.stdin.read()
+        else:
+            with open(path, encoding='utf-8') as file:
+                text = file.read()
+
+        if file_format == 'json':
+            try:
+                rows = json.loads(text)
+            except ValueError as error:
+                raise CommandError(f'JSON parse error - {error}')
+            if not isinstance(rows, list):
+                raise CommandError('Expected a list of forecasts.')
+        else:
+            rows = read_csv(text)
+
+        report = import_forecasts(rows, options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f'Row {error["row"]}: {error["errors"]}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Saved {report["saved"]} of {report["received"]} rows, '
+                f'{report["failed"]} failed, '
+                f'{report["rows_per_second"]} rows/s.'
+            )
+        )
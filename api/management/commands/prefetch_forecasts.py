@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.prefetch import Prefetcher
+
+
+class Command(BaseCommand):
+    help = (
+        'Keeps forecasts and coordinates of the most requested cities '
+        'fresh in the cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run one refresh cycle and exit.',
+        )
+        parser.add_argument(
+            '--top', type=int, help='Number of cities to keep fresh.'
+        )
+        parser.add_argument(
+            '--lead',
+            type=int,
+            help='Seconds after the upstream update in which one prefetcher '
+            'refreshes all cities.',
+        )
+        parser.add_argument(
+            '--interval', type=float, help='Seconds between refresh cycles.'
+        )
+        parser.add_argument(
+            '--rate',
+            type=int,
+            help='Open-Meteo locations per minute.',
+        )
+
+    def handle(self, *args, **options):
+        if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            raise CommandError(
+                'The cache is local to this process, forecasts prefetched '
+                'here would not reach the workers. Set a shared '
+                'CACHE_BACKEND or use PREFETCH_IN_PROCESS=True.'
+            )
+        prefetcher = Prefetcher(
+            top_cities=options['top'],
+            lead=options['lead'],
+            interval=options['interval'],
+            open_meteo_rate=options['rate'],
+        )
+        if not options['once']:
+            try:
+                prefetcher.run_forever()
+            except KeyboardInterrupt:
+                pass
+            return
+
+        stats = prefetcher.run_once()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Refreshed {stats["cities"]} cities: '
+                f'{stats["fetched"]} forecasts fetched, '
+                f'{stats["failed"]} failed, '
+                f'{stats["geocoded"]} cities geocoded.'
+            )
+        )
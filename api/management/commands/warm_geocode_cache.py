@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from geopy.extra.rate_limiter import RateLimiter
+
+from api import consts
+from api.exeptions import UpstreamError
+from api.geocoding import geocode_cache
+from weather.models import Location
+from weather.utils import normalize_city
+
+FAILED = object()
+
+
+class Command(BaseCommand):
+    help = 'Geocodes the given cities and stores them in the geocode cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('cities', nargs='*', help='City names.')
+        parser.add_argument(
+            '-f',
+            '--file',
+            help='Path to a file with one city name per line.',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Geocode cities even if they are already cached.',
+        )
+
+    def handle(self, *args, **options):
+        cities = list(options['cities'])
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as file:
+                cities.extend(line for line in file if line.strip())
+
+        queries = list(dict.fromkeys(normalize_city(city) for city in cities))
+        if not queries:
+            raise CommandError('No cities were passed.')
+
+        if not options['refresh']:
+            cached = set(
+                Location.objects.filter(
+                    query__in=queries, latitude__isnull=False
+                ).values_list('query', flat=True)
+            )
+            queries = [query for query in queries if query not in cached]
+
+        # Calls stay within the Nominatim budget shared with the workers.
+        min_delay = consts.NOMINATIM_MIN_DELAY_SECONDS
+        if settings.NOMINATIM_BUDGET:
+            min_delay = max(min_delay, 60 / settings.NOMINATIM_BUDGET)
+        geocode = RateLimiter(
+            geocode_cache.geolocator.geocode,
+            min_delay_seconds=min_delay,
+            return_value_on_exception=FAILED,
+        )
+        not_found = failed = 0
+        for query in queries:
+            try:
+                location = geocode(query)
+            except UpstreamError:
+                # Budget spent, circuit open or Nominatim failing.
+                location = FAILED
+            if location is FAILED:
+                failed += 1
+                continue
+
+            coordinates = None
+            if location:
+                coordinates = (location.latitude, location.longitude)
+            else:
+                not_found += 1
+            geocode_cache.store(query, coordinates)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Geocoded {len(queries) - failed} cities, '
+                f'{not_found} not found, {failed} failed.'
+            )
+        )
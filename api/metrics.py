@@ -0,0 +1,273 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.http import HttpResponse
+
+from api import consts
+
+
+class Histogram:
+    """
+    Prometheus histogram kept in memory of the process.
+
+    Observations are labelled with values of ``labels`` in the same order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple,
+        buckets: tuple = consts.METRICS_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> list:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            ]
+
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for label_values, counts, total in sorted(series, key=sort_key):
+            labels = format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket = format_labels(
+                    self.labels + ('le',), label_values + (bound,)
+                )
+                lines.append(f'{self.name}_bucket{bucket} {cumulative}')
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Counter:
+    """Prometheus counter kept in memory of the process."""
+
+    def __init__(self, name: str, documentation: str, labels: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: int = 1) -> None:
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def collect(self) -> list:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ]
+        with self._lock:
+            values = sorted(self._values.items(), key=sort_key)
+        for label_values, value in values:
+            labels = format_labels(self.labels, label_values)
+            lines.append(f'{self.name}{labels} {value}')
+        return lines
+
+
+def sort_key(item: tuple) -> list:
+    return [str(value) for value in item[0]]
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{escape_label(str(value))}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def escape_label(value: str) -> str:
+    value = value.replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"')
+
+
+class RequestTimings:
+    """Durations of the stages of the request being processed."""
+
+    __slots__ = ('stages',)
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def get_server_timing(self, total: float) -> str:
+        """Formats the stages as the value of ``Server-Timing`` header."""
+        metrics = [
+            f'{stage};dur={seconds * 1000:.1f}'
+            for stage, seconds in self.stages.items()
+        ]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'current_timings', default=None
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Records the duration of a stage.
+
+    Stages of a request are observed by ``TimingMiddleware`` when the
+    request ends, stages outside of requests are observed right away.
+
+    Args:
+        stage (str): Name of the stage.
+        seconds (float): Duration of the stage.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        stage_duration.observe(seconds, 'background', stage)
+    else:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Records the duration of the block as a stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper timing ORM queries as the ``db`` stage."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_stage('db', time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs) -> None:
+    """Receiver of ``connection_created`` installing ``time_query``."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def collect_cache_metrics() -> list:
+    from api.forecast_cache import forecast_cache
+
+    stats = forecast_cache.get_stats()
+    name = 'weather_forecast_cache_events_total'
+    lines = [
+        f'# HELP {name} Forecast cache events of all workers.',
+        f'# TYPE {name} counter',
+    ]
+    for event, value in stats.items():
+        labels = format_labels(('event',), (event,))
+        lines.append(f'{name}{labels} {value}')
+
+    lookups = stats['hits'] + stats['misses']
+    ratio = stats['hits'] / lookups if lookups else 0.0
+    name = 'weather_forecast_cache_hit_ratio'
+    lines.extend(
+        (
+            f'# HELP {name} Share of forecast cache lookups that were hits.',
+            f'# TYPE {name} gauge',
+            f'{name} {ratio}',
+        )
+    )
+    return lines
+
+
+def render_metrics() -> str:
+    """Renders all metrics in Prometheus text format."""
+    lines = []
+    for metric in (
+        request_duration,
+        stage_duration,
+        upstream_requests,
+        throttled_requests,
+        geocode_lookups,
+        compressed_responses,
+        archived_forecasts,
+    ):
+        lines.extend(metric.collect())
+    lines.extend(collect_cache_metrics())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Exposes metrics of this process in Prometheus text format."""
+    return HttpResponse(
+        render_metrics(), content_type='text/plain; version=0.0.4'
+    )
+
+
+request_duration = Histogram(
+    'weather_request_duration_seconds',
+    'Duration of HTTP requests.',
+    ('endpoint', 'method', 'status'),
+)
+stage_duration = Histogram(
+    'weather_stage_duration_seconds',
+    'Duration of request processing stages.',
+    ('endpoint', 'stage'),
+)
+upstream_requests = Counter(
+    'weather_upstream_requests_total',
+    'Requests sent to upstream services.',
+    ('upstream', 'status'),
+)
+throttled_requests = Counter(
+    'weather_throttled_requests_total',
+    'Requests rejected by the client rate limit or upstream budgets.',
+    ('limit',),
+)
+geocode_lookups = Counter(
+    'weather_geocode_lookups_total',
+    'Geocoding lookups by the layer that answered them.',
+    ('layer',),
+)
+compressed_responses = Counter(
+    'weather_compressed_responses_total',
+    'Responses compressed by the content coding.',
+    ('encoding',),
+)
+archived_forecasts = Counter(
+    'weather_archived_forecasts_total',
+    'Daily forecast rows written to the archive, dropped or failed.',
+    ('result',),
+)
@@ -0,0 +1,131 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from api.compression import COMPRESSORS, get_encoding
+from api.metrics import (
+    RequestTimings,
+    compressed_responses,
+    current_timings,
+    request_duration,
+    stage_duration,
+    timed,
+)
+
+
+class TimingMiddleware:
+    """
+    Measures requests and stages of their processing.
+
+    Durations are observed in Prometheus histograms labelled with the URL
+    route of the request and sent back in the ``Server-Timing`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.finish(request, response, timings, started)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.finish(request, response, timings, started)
+        return response
+
+    @staticmethod
+    def finish(request, response, timings: RequestTimings, started: float):
+        total = time.perf_counter() - started
+        match = request.resolver_match
+        endpoint = match.route if match is not None else 'unmatched'
+
+        request_duration.observe(
+            total, endpoint, request.method, response.status_code
+        )
+        for stage, seconds in timings.stages.items():
+            stage_duration.observe(seconds, endpoint, stage)
+        response['Server-Timing'] = timings.get_server_timing(total)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip.
+
+    Responses of at least ``COMPRESSION_MIN_SIZE`` bytes are compressed with
+    the coding accepted by the client, brotli if it is installed, and the
+    chosen coding is sent in ``Content-Encoding`` and counted in metrics.
+    Like Django ``GZipMiddleware`` it weakens strong ETags, as compressed
+    bytes differ from the identity ones. Streaming responses are sent as is.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    @staticmethod
+    def process_response(request, response):
+        min_size = settings.COMPRESSION_MIN_SIZE
+        if (
+            not min_size
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < min_size
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        with timed('compress'):
+            content = COMPRESSORS[encoding](response.content)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        compressed_responses.inc(encoding)
+        return response
@@ -0,0 +1,19 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class ContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation skipping renderers that cannot work.
+
+    Renderers with optional dependencies, like ``MessagePackRenderer``, are
+    left out while ``available`` is false, so clients asking only for their
+    media type get 406 Not Acceptable instead of a server error.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [
+            renderer
+            for renderer in renderers
+            if getattr(renderer, 'available', True)
+        ]
+        return super().select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,198 @@
+import hashlib
+import time
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from api import consts
+from api.invalidation import get_invalidation_log
+from weather.utils import normalize_city
+
+# Minimal and maximal temperature and time of the last change.
+Override = Tuple[float, float, datetime]
+
+
+class OverrideCache:
+    """
+    Cache of manual forecast overrides kept correct by write-through.
+
+    Entries hold the override of one (city, date) or the fact that there is
+    none. Saving or deleting a ``Forecast`` overwrites its entry, so readers
+    filling the cache with ``add`` can never put an older value over it.
+    Bulk changes bump the version of the city instead, which makes every
+    entry of the city unreachable at once.
+
+    Caches local to the process are kept in sync through the invalidation
+    log: changes are published to other workers of the host and applied
+    before every read.
+    """
+
+    def __init__(
+        self,
+        prefix: str = consts.OVERRIDE_CACHE_PREFIX,
+        timeout: int = consts.OVERRIDE_CACHE_TIMEOUT,
+    ):
+        self.prefix = prefix
+        self.timeout = timeout
+        self.log = get_invalidation_log()
+        # Changed when invalidations of other workers were lost.
+        self.epoch = 0
+
+    def get(self, city: str, day: date) -> Tuple[bool, Optional[Override]]:
+        """
+        Returns the cached override of the city for the date.
+
+        Args:
+            city (str): City name.
+            day (date): Date of the forecast.
+
+        Returns:
+            Tuple[bool, Override | None]: Whether the entry was found and
+            the override (None if the city has no override for the date).
+        """
+        found = self.get_many(city, (day,))
+        return day in found, found.get(day)
+
+    def get_many(self, city: str, days: Iterable[date]) -> dict:
+        """
+        Returns cached overrides of the city for several dates.
+
+        Returns:
+            dict: Overrides (None for dates without one) by dates, misses
+            are left out.
+        """
+        self.sync()
+        prefix = self._get_prefix(city)
+        keys = {f'{prefix}:{day.isoformat()}': day for day in days}
+        return {
+            keys[key]: entry or None
+            for key, entry in cache.get_many(keys).items()
+        }
+
+    def add_many(self, city: str, overrides: dict) -> None:
+        """
+        Caches overrides read from the database unless entries exist.
+
+        Args:
+            city (str): City name.
+            overrides (dict): Overrides (None for dates without one) by
+                dates.
+        """
+        prefix = self._get_prefix(city)
+        for day, override in overrides.items():
+            cache.add(
+                f'{prefix}:{day.isoformat()}', override or (), self.timeout
+            )
+
+    def set(self, city: str, day: date, override: Optional[Override]):
+        """
+        Writes the changed override through to the cache of every worker.
+
+        Args:
+            city (str): City name.
+            day (date): Date of the forecast.
+            override (Override | None): New override or None if it was
+                deleted.
+        """
+        self._store(city, day, override)
+        if self.log is None:
+            return
+        if override is not None:
+            override = [override[0], override[1], override[2].isoformat()]
+        self.log.publish(
+            {'city': city, 'date': day.isoformat(), 'override': override}
+        )
+
+    def invalidate(self, cities: Iterable[str]) -> None:
+        """
+        Drops all cached overrides of the cities in every worker.
+
+        Args:
+            cities (Iterable[str]): City names.
+        """
+        cities = sorted({normalize_city(city) for city in cities})
+        for city in cities:
+            self._bump(city)
+        if self.log is not None and cities:
+            self.log.publish({'cities': cities})
+
+    def sync(self) -> None:
+        """Applies changes published by other workers."""
+        if self.log is None:
+            return
+        messages = self.log.poll()
+        if messages is None:
+            self.epoch += 1
+            return
+        for message in messages:
+            if 'cities' in message:
+                for city in message['cities']:
+                    self._bump(city)
+                continue
+            override = message['override']
+            if override is not None:
+                override = (
+                    override[0],
+                    override[1],
+                    datetime.fromisoformat(override[2]),
+                )
+            self._store(
+                message['city'], date.fromisoformat(message['date']), override
+            )
+
+    def _store(self, city: str, day: date, override: Optional[Override]):
+        key = f'{self._get_prefix(city)}:{day.isoformat()}'
+        cache.set(key, override or (), self.timeout)
+
+    def _bump(self, city: str) -> None:
+        key = self._get_version_key(city)
+        try:
+            cache.incr(key)
+        except ValueError:
+            self._get_version(key)
+
+    def _get_prefix(self, city: str) -> str:
+        version_key = self._get_version_key(city)
+        version = self._get_version(version_key)
+        return f'{version_key}:{self.epoch}:{version}'
+
+    def _get_version_key(self, city: str) -> str:
+        digest = hashlib.blake2b(
+            normalize_city(city).encode(), digest_size=8
+        ).hexdigest()
+        return f'{self.prefix}:{digest}'
+
+    @staticmethod
+    def _get_version(key: str) -> int:
+        version = cache.get(key)
+        if version is None:
+            # Starts where no evicted version could have been.
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+
+def forecast_saved(sender, instance, **kwargs) -> None:
+    """Receiver of ``post_save`` of ``Forecast`` updating the cache."""
+    override = (
+        float(instance.min_temperature),
+        float(instance.max_temperature),
+        instance.updated_at,
+    )
+    transaction.on_commit(
+        lambda: override_cache.set(instance.city, instance.date, override),
+        using=kwargs.get('using'),
+    )
+
+
+def forecast_deleted(sender, instance, **kwargs) -> None:
+    """Receiver of ``post_delete`` of ``Forecast`` updating the cache."""
+    transaction.on_commit(
+        lambda: override_cache.set(instance.city, instance.date, None),
+        using=kwargs.get('using'),
+    )
+
+
+override_cache = OverrideCache()
@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from api.ingest import read_csv
+
+
+class CSVParser(BaseParser):
+    """Parses CSV with a header row into a list of dicts."""
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return read_csv(stream.read().decode(encoding))
+        except (UnicodeDecodeError, ValueError) as error:
+            raise ParseError(f'CSV parse error - {error}')
@@ -0,0 +1,390 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+
+from api import consts
+from api.archive import forecast_archiver
+from api.exeptions import UpstreamError
+from api.forecast_cache import forecast_cache
+from api.gazetteer import get_gazetteer
+from api.geocoding import geocode_cache
+from weather.models import Location
+from weather.utils import normalize_city
+
+logger = logging.getLogger(__name__)
+
+
+def jittered(seconds: float) -> float:
+    """Spreads the delay by ``PREFETCH_JITTER`` in both directions."""
+    return seconds * random.uniform(
+        1 - consts.PREFETCH_JITTER, 1 + consts.PREFETCH_JITTER
+    )
+
+
+class PopularityTracker:
+    """
+    Counts requests per city and adds them to ``Location.hits``.
+
+    Counts are buffered in the process, so a request only pays for a
+    dictionary update. A daemon thread adds them to the database every
+    ``flush_interval`` seconds, off the request path. The prefetcher halves
+    all counters once per ``PREFETCH_HALF_LIFE``, which turns them into a
+    decaying popularity.
+    """
+
+    def __init__(self, flush_interval: int = consts.PREFETCH_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pid = None
+
+    def record(self, city: str) -> None:
+        """
+        Counts a request for the city.
+
+        Args:
+            city (str): City name.
+        """
+        query = normalize_city(city)
+        with self._lock:
+            self._counts[query] += 1
+        self.start()
+
+    def flush(self) -> None:
+        """
+        Adds buffered counts to ``Location.hits``.
+
+        Cities answered by the gazetteer have no ``Location`` row yet, it
+        is created before their counts are added.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+
+        with transaction.atomic():
+            missing = [
+                query
+                for query, count in counts.items()
+                if not Location.objects.filter(query=query).update(
+                    hits=F('hits') + count
+                )
+            ]
+            if missing and geocode_cache.store_offline(missing):
+                for query in missing:
+                    Location.objects.filter(query=query).update(
+                        hits=F('hits') + counts[query]
+                    )
+
+    def run_forever(self) -> None:
+        """Flushes buffered counts periodically until stopped."""
+        while not self._stop.wait(jittered(self.flush_interval)):
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Failed to flush popularity counts.')
+            finally:
+                close_old_connections()
+
+    def start(self) -> None:
+        """Starts flushing in a daemon thread of the current process."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            threading.Thread(
+                target=self.run_forever, name='popularity', daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        """Stops the thread and flushes what is left in the buffer."""
+        self._stop.set()
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Failed to flush popularity counts.')
+
+
+class Prefetcher:
+    """
+    Keeps forecasts and coordinates of the most requested cities fresh.
+
+    Forecast cache entries of all locations expire together at the upstream
+    update boundary. The prefetcher wakes up right after it and fetches the
+    top cities again, entries are stored like the ones of requests until the
+    next boundary and stale ones are served meanwhile. Within ``lead``
+    seconds after the boundary only the prefetcher that claimed it does so,
+    the others would fetch the same cities at the same time. Later cycles
+    only fill entries that are missing or stale. Cities are refreshed in order of popularity, requests
+    to Open-Meteo are paced to ``open_meteo_rate`` locations per minute and
+    requests to Nominatim to one per ``NOMINATIM_MIN_DELAY_SECONDS``, both
+    with jitter.
+    """
+
+    def __init__(
+        self,
+        top_cities: Optional[int] = None,
+        lead: Optional[int] = None,
+        interval: Optional[float] = None,
+        open_meteo_rate: Optional[int] = None,
+    ):
+        self.top_cities = top_cities or settings.PREFETCH_TOP_CITIES
+        self.lead = lead or settings.PREFETCH_LEAD
+        self.interval = interval or settings.PREFETCH_INTERVAL
+        self.open_meteo_rate = (
+            open_meteo_rate or settings.PREFETCH_OPEN_METEO_RATE
+        )
+        self._next_calls = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def run_once(self) -> dict:
+        """
+        Runs one refresh cycle.
+
+        Returns:
+            dict: Number of tracked cities, geocoded cities, fetched and
+            failed locations.
+        """
+        popularity.flush()
+        self.decay()
+        locations = self.get_top_locations()
+        geocoded = self.refresh_coordinates(locations)
+
+        coordinates = list(
+            {
+                forecast_cache.make_key(latitude, longitude): (
+                    forecast_cache.snap(latitude, longitude)
+                )
+                for _, latitude, longitude, _ in locations
+            }.items()
+        )
+        elapsed = forecast_cache.update_interval - forecast_cache.get_timeout()
+        if elapsed < self.lead and not self.claim_boundary(elapsed):
+            # Another prefetcher refreshes the cities after this boundary.
+            coordinates = []
+        else:
+            cached = forecast_cache.peek_many([key for key, _ in coordinates])
+            coordinates = [
+                (key, location)
+                for key, location in coordinates
+                if key not in cached
+            ]
+
+        fetched, failed = self.refresh_forecasts(coordinates)
+        return {
+            'cities': len(locations),
+            'geocoded': geocoded,
+            'fetched': fetched,
+            'failed': failed,
+        }
+
+    def run_forever(self) -> None:
+        """
+        Runs refresh cycles every ``interval`` seconds and right after every
+        upstream update boundary until stopped.
+        """
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception('Prefetch cycle failed.')
+            finally:
+                close_old_connections()
+            self._stop.wait(
+                min(jittered(self.interval), forecast_cache.get_timeout() + 1)
+            )
+
+    def start(self) -> None:
+        """Starts the prefetcher in a daemon thread of the current process."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            threading.Thread(
+                target=self.run_forever, name='prefetcher', daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def decay(self) -> None:
+        """
+        Halves popularity of all cities once per ``PREFETCH_HALF_LIFE``.
+
+        The period is claimed through ``cache.add``, so several prefetchers
+        sharing a cache decay only once. An extra halving after a restart
+        with a local cache keeps the order of cities intact.
+        """
+        period = int(time.time()) // consts.PREFETCH_HALF_LIFE
+        key = f'{consts.PREFETCH_PREFIX}:decay:{period}'
+        if cache.add(key, True, consts.PREFETCH_HALF_LIFE):
+            Location.objects.filter(hits__gt=0).update(hits=F('hits') / 2)
+
+    def claim_boundary(self, elapsed: int) -> bool:
+        """
+        Claims the refresh after the upstream update boundary.
+
+        Args:
+            elapsed (int): Seconds since the boundary.
+
+        Returns:
+            bool: Whether this prefetcher has to refresh all top cities.
+        """
+        boundary = int(time.time()) - elapsed
+        key = f'{consts.PREFETCH_PREFIX}:boundary:{boundary}'
+        return cache.add(key, True, self.lead)
+
+    def get_top_locations(self) -> list:
+        """
+        Returns the most requested geocoded cities.
+
+        Returns:
+            list: Name, latitude, longitude and time of geocoding of every
+            city, most popular first.
+        """
+        return list(
+            Location.objects.filter(
+                hits__gt=0, latitude__isnull=False, longitude__isnull=False
+            )
+            .order_by('-hits')
+            .values_list('query', 'latitude', 'longitude', 'updated_at')[
+                : self.top_cities
+            ]
+        )
+
+    def refresh_coordinates(self, locations: list) -> int:
+        """
+        Geocodes again popular cities geocoded more than
+        ``GEOCODE_MAX_AGE`` seconds ago.
+
+        Known coordinates are kept if Nominatim does not find the city
+        anymore or fails. Cities found in the gazetteer are skipped, their
+        coordinates come from it and do not get outdated.
+
+        Args:
+            locations (list): Cities returned by ``get_top_locations``.
+
+        Returns:
+            int: Number of geocoded cities.
+        """
+        outdated_at = timezone.now() - timedelta(
+            seconds=consts.GEOCODE_MAX_AGE
+        )
+        gazetteer = get_gazetteer()
+        queries = [
+            query
+            for query, _, _, updated_at in locations
+            if updated_at < outdated_at
+            and (gazetteer is None or gazetteer.lookup(query) is None)
+        ][: consts.PREFETCH_GEOCODE_PER_CYCLE]
+
+        geocoded = 0
+        for query in queries:
+            if self._stop.is_set():
+                break
+            self.pace('nominatim', consts.NOMINATIM_MIN_DELAY_SECONDS)
+            try:
+                location = geocode_cache.geolocator.geocode(query)
+            except UpstreamError:
+                continue
+
+            if location:
+                geocode_cache.store(
+                    query, (location.latitude, location.longitude)
+                )
+                geocoded += 1
+            else:
+                Location.objects.filter(query=query).update(
+                    updated_at=timezone.now()
+                )
+        return geocoded
+
+    def refresh_forecasts(self, coordinates: list):
+        """
+        Fetches forecasts with multi-location Open-Meteo requests.
+
+        Entries are fresh until the next upstream update boundary.
+
+        Args:
+            coordinates (list): Pairs of cache key and location.
+
+        Returns:
+            Tuple[int, int]: Numbers of fetched and failed locations.
+        """
+        from api.views import BaseWeatherMixin
+
+        fetched = failed = 0
+        size = consts.BATCH_LOCATIONS_PER_REQUEST
+        for start in range(0, len(coordinates), size):
+            if self._stop.is_set():
+                break
+            chunk = coordinates[start : start + size]
+            self.pace('open_meteo', 60 * len(chunk) / self.open_meteo_rate)
+            try:
+                response = BaseWeatherMixin.get_forecasts(
+                    [location for _, location in chunk]
+                )
+                payloads = response.json()
+            except (UpstreamError, ValueError):
+                failed += len(chunk)
+                continue
+            if response.status_code != status.HTTP_200_OK:
+                failed += len(chunk)
+                continue
+
+            if isinstance(payloads, dict):
+                payloads = [payloads]
+            forecast_cache.set_many(
+                {key: data for (key, _), data in zip(chunk, payloads)}
+            )
+            for (_, location), data in zip(chunk, payloads):
+                forecast_archiver.record(*location, data)
+            fetched += len(chunk)
+        return fetched, failed
+
+    def pace(self, name: str, delay: float) -> None:
+        """
+        Waits until the next call to the upstream is allowed.
+
+        Args:
+            name (str): Name of the upstream.
+            delay (float): Minimal delay until the call after this one.
+        """
+        wait = self._next_calls.get(name, 0) - time.monotonic()
+        if wait > 0:
+            self._stop.wait(wait)
+        self._next_calls[name] = time.monotonic() + jittered(delay)
+
+
+def start_prefetcher(**kwargs) -> None:
+    """Receiver of ``request_started`` running the in-process prefetcher."""
+    prefetcher.start()
+
+
+popularity = PopularityTracker()
+atexit.register(popularity.stop)
+prefetcher = Prefetcher()
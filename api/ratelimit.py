@@ -0,0 +1,132 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from api import consts
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all workers through the Django cache.
+
+    The bucket is kept as the theoretical arrival time of the next request
+    in milliseconds (GCRA), so a check is one atomic ``incr`` of a single
+    key: every request moves the time forward by the refill interval of a
+    token and is rejected, and its move rolled back, if the time gets more
+    than ``burst`` intervals ahead of the clock.
+
+    A bucket left idle has its time in the past and is moved up to the
+    clock by a second ``incr``. Concurrent requests may all find it idle,
+    a request whose correction lands after another one sees that the time
+    has already been caught up and rolls its correction back, so the gap
+    is added once.
+    """
+
+    def __init__(self, prefix: str, per_minute: float, burst: int):
+        self.prefix = prefix
+        self.per_minute = per_minute
+        self.burst = burst
+        self.interval = max(1, round(60_000 / per_minute)) if per_minute else 0
+
+    def acquire(self, key: str) -> float:
+        """
+        Takes a token for the key.
+
+        Args:
+            key (str): Key of the bucket, e.g. an ID of the client.
+
+        Returns:
+            float: 0 if the token was taken or seconds to wait until it is
+            available.
+        """
+        if not self.interval:
+            return 0.0
+
+        key = f'{self.prefix}:{key}'
+        now = time.time_ns() // 1_000_000
+        try:
+            arrival = cache.incr(key, self.interval)
+        except ValueError:
+            if cache.add(key, now + self.interval, consts.RATE_LIMIT_TTL):
+                return 0.0
+            arrival = cache.incr(key, self.interval)
+
+        try:
+            if arrival < now + self.interval:
+                # The bucket was idle and is full again.
+                gap = now + self.interval - arrival
+                arrival = cache.incr(key, gap)
+                if arrival - gap >= now + self.interval:
+                    arrival = cache.decr(key, gap)
+            wait = arrival - now - self.burst * self.interval
+            if wait <= 0:
+                return 0.0
+            cache.decr(key, self.interval)
+        except ValueError:
+            # The key has just expired, so the bucket is full.
+            return 0.0
+        return wait / 1000
+
+    async def aacquire(self, key: str) -> float:
+        """Async version of ``acquire``."""
+        if not self.interval:
+            return 0.0
+
+        key = f'{self.prefix}:{key}'
+        now = time.time_ns() // 1_000_000
+        try:
+            arrival = await cache.aincr(key, self.interval)
+        except ValueError:
+            if await cache.aadd(
+                key, now + self.interval, consts.RATE_LIMIT_TTL
+            ):
+                return 0.0
+            arrival = await cache.aincr(key, self.interval)
+
+        try:
+            if arrival < now + self.interval:
+                gap = now + self.interval - arrival
+                arrival = await cache.aincr(key, gap)
+                if arrival - gap >= now + self.interval:
+                    arrival = await cache.adecr(key, gap)
+            wait = arrival - now - self.burst * self.interval
+            if wait <= 0:
+                return 0.0
+            await cache.adecr(key, self.interval)
+        except ValueError:
+            return 0.0
+        return wait / 1000
+
+
+def get_client_id(request) -> str:
+    """
+    Returns the ID the client is rate limited by.
+
+    Clients are told apart by the API key header when they send one and
+    by the IP address otherwise, which is taken from X-Forwarded-For
+    behind ``NUM_PROXIES`` reverse proxies like DRF throttles do.
+
+    Args:
+        request (HttpRequest): Request of the client.
+
+    Returns:
+        str: ID of the client.
+    """
+    api_key = request.headers.get(settings.RATE_LIMIT_KEY_HEADER)
+    if api_key:
+        digest = hashlib.blake2b(api_key.encode(), digest_size=8)
+        return f'key:{digest.hexdigest()}'
+    return f'ip:{ident_throttle.get_ident(request)}'
+
+
+# Only its get_ident is used, it reads nothing but request.META.
+ident_throttle = BaseThrottle()
+
+client_limiter = TokenBucket(
+    consts.RATE_LIMIT_PREFIX,
+    settings.RATE_LIMIT_PER_MINUTE,
+    settings.RATE_LIMIT_BURST,
+)
@@ -0,0 +1,104 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer recording rendering time as the ``render`` stage."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class LeanJSONRenderer(BaseRenderer):
+    """
+    JSON-only renderer of the lean read path.
+
+    Serializes with orjson when it is installed and falls back to
+    ``TimedJSONRenderer`` otherwise. The output is compact UTF-8 JSON like
+    the one of the default renderer.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    fallback = TimedJSONRenderer()
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return self.fallback.render(
+                data, accepted_media_type, renderer_context
+            )
+        if data is None:
+            return b''
+
+        with timed('render'):
+            content = orjson.dumps(data, default=self.encoder.default)
+        # Escaped by the default renderer for embedding into JavaScript.
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028')
+            content = content.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer of ``application/msgpack``.
+
+    Sent only to clients asking for it in the Accept header. Needs msgpack,
+    ``ContentNegotiation`` skips the renderer if it is not installed.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    available = msgpack is not None
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        with timed('render'):
+            return msgpack.packb(
+                data, default=self.encoder.default, use_bin_type=True
+            )
+
+
+lean_json_renderer = LeanJSONRenderer()
+msgpack_renderer = MessagePackRenderer()
+
+
+def select_lean_renderer(request) -> BaseRenderer:
+    """
+    Picks the renderer of the lean read path.
+
+    MessagePack is used if it is installed and the client accepts it,
+    JSON otherwise.
+
+    Args:
+        request: Django or DRF request.
+
+    Returns:
+        BaseRenderer: Renderer of the response.
+    """
+    if msgpack_renderer.available and (
+        msgpack_renderer.media_type in request.headers.get('Accept', '')
+    ):
+        return msgpack_renderer
+    return lean_json_renderer
@@ -1,11 +1,10 @@
-from datetime import timedelta
-
-from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator, ValidationError
 
 from api import consts
+from api.validators import get_forecast_date_error
 from weather.models import Forecast
+from weather.utils import normalize_city
 
 
 class DateSerializer(serializers.Serializer):
@@ -18,18 +17,9 @@ class DateSerializer(serializers.Serializer):
     )
 
     def validate_date(self, value):
-        if value < timezone.now().date():
-            raise ValidationError(
-                detail={'message': 'The date cannot be in the past.'}
-            )
-
-        if value - timezone.now().date() > timedelta(10):
-            raise ValidationError(
-                detail={
-                    'message': 'The date cannot be more than 10 days in the '
-                    'future.'
-                }
-            )
+        error = get_forecast_date_error(value)
+        if error is not None:
+            raise ValidationError(detail=error)
 
         return value
 
@@ -40,6 +30,56 @@ class ForecastQueryParamsSerializer(DateSerializer):
     city = serializers.CharField(required=True)
 
 
+class BatchItemSerializer(DateSerializer):
+    """
+    Serializer for validate an item of the batch request.
+
+    Items without date ask for the current weather.
+    """
+
+    city = serializers.CharField(required=True)
+    date = serializers.DateField(
+        required=False,
+        allow_null=True,
+        format=consts.DATE_FORMAT,
+        input_formats=[consts.DATE_FORMAT],
+    )
+
+    def validate_date(self, value):
+        if value is None:
+            return None
+        return super().validate_date(value)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for validate the batch request."""
+
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=consts.BATCH_MAX_ITEMS,
+    )
+
+
+class ExportQueryParamsSerializer(serializers.Serializer):
+    """Serializer for validate export query params."""
+
+    output = serializers.ChoiceField(
+        choices=('ndjson', 'csv'), default='ndjson'
+    )
+    city_prefix = serializers.CharField(required=False)
+    date_from = serializers.DateField(
+        required=False,
+        format=consts.DATE_FORMAT,
+        input_formats=[consts.DATE_FORMAT],
+    )
+    date_to = serializers.DateField(
+        required=False,
+        format=consts.DATE_FORMAT,
+        input_formats=[consts.DATE_FORMAT],
+    )
+
+
 class ForecastReadSerializer(serializers.ModelSerializer):
     """Serializer for representation data of the Forecast Model."""
 
@@ -55,6 +95,9 @@ class ForecastWriteSerializer(DateSerializer, serializers.ModelSerializer):
         model = Forecast
         fields = ('city', 'date', 'min_temperature', 'max_temperature')
 
+    def validate_city(self, value):
+        return normalize_city(value)
+
     def validate(self, data):
         if data['min_temperature'] > data['max_temperature']:
             raise ValidationError(
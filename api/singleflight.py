@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api import consts
+
+
+class CacheLease:
+    """
+    Cross-process lease stored in the Django cache.
+
+    Relies on the atomicity of ``cache.add``, so the cache backend has to be
+    shared by all workers (database, memcached, redis).
+    """
+
+    def __init__(self, timeout: int, poll_interval: float):
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    @contextmanager
+    def hold(self, key: str):
+        lease_key = f'{consts.SINGLEFLIGHT_PREFIX}:{key}'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.timeout
+        acquired = cache.add(lease_key, token, self.timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            acquired = cache.add(lease_key, token, self.timeout)
+
+        try:
+            yield
+        finally:
+            if acquired and cache.get(lease_key) == token:
+                cache.delete(lease_key)
+
+
+class FileLease:
+    """
+    Cross-process lease based on ``flock`` of a file per key.
+
+    Locks are released by the OS if the holder dies, so a crashed worker
+    never blocks the others. Works for workers of one host only.
+    """
+
+    def __init__(self, directory: str, timeout: int, poll_interval: float):
+        self.directory = directory
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    @contextmanager
+    def hold(self, key: str):
+        import fcntl
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = hashlib.sha1(key.encode()).hexdigest()
+        path = os.path.join(self.directory, f'{name}.lock')
+        deadline = time.monotonic() + self.timeout
+
+        with open(path, 'a') as file:
+            acquired = False
+            while not acquired:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(self.poll_interval)
+
+            try:
+                yield
+            finally:
+                if acquired:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller of a key runs the function, the others wait for it and
+    get the same result or exception. Across processes the leaders of each
+    process are serialized by an optional lease, so the function should
+    re-check its cache before going upstream.
+    """
+
+    def __init__(self, lease=None):
+        self.lease = lease
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs the function once per key for all concurrent callers.
+
+        Args:
+            key (str): Key of the call.
+            func (Callable): Function to run.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Any: Result of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lease is None:
+                call.result = func(*args, **kwargs)
+            else:
+                with self.lease.hold(key):
+                    call.result = func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent coroutines with the same key into one execution.
+
+    Calls are tracked per event loop, so the same instance works under ASGI
+    and with views run through ``async_to_sync``.
+    """
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Awaits the coroutine function once per key for all concurrent callers.
+
+        Args:
+            key (str): Key of the call.
+            func (Callable): Coroutine function to await.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Any: Result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del calls[key]
+
+
+class BackgroundFlight:
+    """
+    Runs functions in background threads, at most once per key at a time.
+
+    Submissions of a key that is still running are dropped. The thread pool
+    is created lazily in every process, so it survives forking workers.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+        self._pid = None
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> bool:
+        """
+        Schedules the function unless the key is already running.
+
+        Args:
+            key (str): Key of the call.
+            func (Callable): Function to run.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            bool: Whether the function was scheduled.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers)
+                self._pid = os.getpid()
+                self._keys.clear()
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            future = self._executor.submit(func, *args, **kwargs)
+
+        future.add_done_callback(lambda _: self._done(key))
+        return True
+
+    def _done(self, key: str) -> None:
+        with self._lock:
+            self._keys.discard(key)
+
+
+class AsyncBackgroundFlight:
+    """
+    Runs coroutine functions in background tasks, at most once per key at a
+    time.
+
+    Keeps references to the tasks, so they are not garbage collected before
+    they finish.
+    """
+
+    def __init__(self):
+        self._tasks = weakref.WeakKeyDictionary()
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> bool:
+        """
+        Schedules the coroutine function unless the key is already running.
+
+        Args:
+            key (str): Key of the call.
+            func (Callable): Coroutine function to await.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            bool: Whether the function was scheduled.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        if key in tasks:
+            return False
+
+        task = tasks[key] = loop.create_task(func(*args, **kwargs))
+        task.add_done_callback(lambda _: tasks.pop(key, None))
+        return True
+
+
+def get_lease() -> Optional[Any]:
+    """Builds the cross-process lease configured in settings."""
+    backend = settings.SINGLEFLIGHT_LEASE
+    if backend == 'cache':
+        return CacheLease(
+            settings.SINGLEFLIGHT_LEASE_TIMEOUT,
+            consts.SINGLEFLIGHT_POLL_INTERVAL,
+        )
+    if backend == 'file':
+        return FileLease(
+            settings.SINGLEFLIGHT_LOCK_DIR,
+            settings.SINGLEFLIGHT_LEASE_TIMEOUT,
+            consts.SINGLEFLIGHT_POLL_INTERVAL,
+        )
+    return None
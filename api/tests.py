@@ -0,0 +1,813 @@
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api import consts, geohash
+from api.accuracy import get_accuracy
+from api.archive import ForecastArchiver, forecast_archiver
+from api.exeptions import BudgetExceededError, UpstreamError
+from api.forecast_cache import forecast_cache, forecast_revalidation
+from api.geocoding import geocode_cache
+from api.http_cache import get_override_max_age, is_not_modified, make_etag
+from api.ingest import import_forecasts
+from api.invalidation import InvalidationLog
+from api.override_cache import OverrideCache
+from api.prefetch import PopularityTracker, Prefetcher, popularity
+from api.ratelimit import TokenBucket, client_limiter, get_client_id
+from api.validators import parse_date
+from weather.models import Forecast, ForecastArchive, Location
+
+
+class FakeResponse:
+    status_code = status.HTTP_200_OK
+    headers = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def get_payload() -> dict:
+    today = date.today()
+    days = [(today + timedelta(day)).isoformat() for day in range(11)]
+    return {
+        'latitude': 45.76,
+        'longitude': 4.83,
+        'current_weather': {
+            'temperature': 20.5,
+            'time': f'{today.isoformat()}T12:00',
+        },
+        'daily': {
+            'time': days,
+            'temperature_2m_min': [float(day) for day in range(11)],
+            'temperature_2m_max': [float(day + 10) for day in range(11)],
+        },
+    }
+
+
+class WeatherViewTestCase(APITestCase):
+    url = '/api/weather/current/'
+
+    def setUp(self):
+        cache.clear()
+        geocode_cache.clear()
+        geocode_cache.store('lyon', (45.76, 4.83))
+        self.latitude, self.longitude = forecast_cache.snap(45.76, 4.83)
+        for patcher in (
+            mock.patch.object(forecast_archiver, 'enabled', False),
+            mock.patch.object(popularity, 'record'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_current(self, upstream, **headers):
+        with mock.patch('api.views.open_meteo.get', upstream):
+            return self.client.get(self.url, {'city': 'lyon'}, **headers)
+
+
+class ForecastCacheTests(WeatherViewTestCase):
+    def set_stale(self, stale: int, age: int = 4000) -> None:
+        """Puts a payload that became stale ``stale`` seconds ago."""
+        now = time.time()
+        cache.set(
+            forecast_cache.make_key(self.latitude, self.longitude),
+            {
+                'data': get_payload(),
+                'fetched_at': now - age,
+                'expires_at': now - stale,
+            },
+            3600,
+        )
+
+    def test_fresh_entry_is_served_without_upstream(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        upstream = mock.Mock()
+
+        response = self.get_current(upstream)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['temperature'], 20.5)
+        self.assertNotIn('X-Data-Age', response.headers)
+        upstream.assert_not_called()
+
+    def test_stale_entry_is_served_and_revalidated_once(self):
+        self.set_stale(60)
+        upstream = mock.Mock()
+
+        with mock.patch.object(forecast_revalidation, 'submit') as submit:
+            response = self.get_current(upstream)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['temperature'], 20.5)
+        self.assertEqual(response.headers['X-Data-Age'], '4000')
+        self.assertIn('max-age=0', response.headers['Cache-Control'])
+        submit.assert_called_once()
+        self.assertEqual(
+            submit.call_args.args[0],
+            forecast_cache.make_key(self.latitude, self.longitude),
+        )
+        upstream.assert_not_called()
+
+    @override_settings(FORECAST_STALE_WHILE_REVALIDATE=0)
+    def test_stale_entry_is_served_when_upstream_fails(self):
+        self.set_stale(60)
+        failure = FakeResponse({'reason': 'unavailable'})
+        failure.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        upstream = mock.Mock(return_value=failure)
+
+        response = self.get_current(upstream)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['temperature'], 20.5)
+        self.assertEqual(response.headers['X-Data-Age'], '4000')
+        upstream.assert_called_once()
+
+    def test_upstream_failure_without_stale_entry_is_passed_on(self):
+        failure = FakeResponse({'reason': 'unavailable'})
+        failure.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+        response = self.get_current(mock.Mock(return_value=failure))
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    def test_concurrent_misses_share_one_upstream_call(self):
+        requests = 8
+        barrier = threading.Barrier(requests)
+        responses = []
+
+        def slow_upstream(*args, **kwargs):
+            # Keeps the leader busy until every request has arrived.
+            time.sleep(0.2)
+            return FakeResponse(get_payload())
+
+        def get():
+            barrier.wait()
+            responses.append(
+                self.client_class().get(self.url, {'city': 'lyon'})
+            )
+
+        upstream = mock.Mock(side_effect=slow_upstream)
+        threads = [threading.Thread(target=get) for _ in range(requests)]
+        with mock.patch('api.views.open_meteo.get', upstream):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_200_OK] * requests,
+        )
+        upstream.assert_called_once()
+
+
+class HttpCacheTests(WeatherViewTestCase):
+    def test_same_etag_is_not_modified(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        first = self.get_current(mock.Mock())
+
+        response = self.get_current(
+            mock.Mock(), HTTP_IF_NONE_MATCH=first.headers['ETag']
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(response.content, b'')
+        self.assertRegex(
+            response.headers['Cache-Control'], r'^public, max-age=\d+$'
+        )
+
+    def test_changed_payload_gets_new_etag(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        first = self.get_current(mock.Mock())
+        payload = get_payload()
+        payload['current_weather']['temperature'] = 21.0
+        forecast_cache.set(self.latitude, self.longitude, payload)
+
+        response = self.get_current(
+            mock.Mock(), HTTP_IF_NONE_MATCH=first.headers['ETag']
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(response.json()['temperature'], 21.0)
+
+    def test_etag_matching(self):
+        etag = make_etag({'temperature': 20.5})
+        request = RequestFactory().get(
+            '/', HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+        )
+
+        self.assertEqual(etag, make_etag({'temperature': 20.5}))
+        self.assertNotEqual(etag, make_etag({'temperature': 20.5}, 'msgpack'))
+        self.assertTrue(is_not_modified(request, etag))
+        self.assertFalse(is_not_modified(RequestFactory().get('/'), etag))
+
+    def test_fresh_override_is_not_cached_by_clients(self):
+        day = date.today()
+        Forecast.objects.create(
+            city='lyon', date=day, min_temperature=1, max_temperature=7
+        )
+
+        response = self.client.get(
+            '/api/weather/forecast/',
+            {'city': 'lyon', 'date': day.strftime('%d.%m.%Y')},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.headers['Cache-Control'], 'public, max-age=0'
+        )
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_override_max_age_grows_with_its_age(self):
+        now = timezone.now()
+
+        self.assertEqual(get_override_max_age(now), 0)
+        self.assertEqual(
+            get_override_max_age(now - timedelta(seconds=600)), 60
+        )
+        self.assertEqual(
+            get_override_max_age(now - timedelta(days=365)),
+            consts.OVERRIDE_MAX_AGE,
+        )
+
+
+class OverrideCacheTests(WeatherViewTestCase):
+    def setUp(self):
+        super().setUp()
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        self.day = date.today().strftime('%d.%m.%Y')
+
+    def get_forecast(self):
+        response = self.client.get(
+            '/api/weather/forecast/', {'city': 'Lyon', 'date': self.day}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def get_cached_forecast(self):
+        with self.assertNumQueries(0):
+            return self.get_forecast()
+
+    def post_override(self, min_temperature, max_temperature):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/weather/forecast/',
+                {
+                    'city': 'lyon',
+                    'date': self.day,
+                    'min_temperature': min_temperature,
+                    'max_temperature': max_temperature,
+                },
+                format='json',
+            )
+        self.assertIn(
+            response.status_code, (status.HTTP_200_OK, status.HTTP_201_CREATED)
+        )
+
+    def test_changes_of_override_are_written_through(self):
+        # Caches the absence of an override.
+        self.assertEqual(self.get_forecast()['min_temperature'], 0.0)
+        self.assertEqual(self.get_cached_forecast()['min_temperature'], 0.0)
+
+        self.post_override(1.5, 7)
+        self.assertEqual(
+            self.get_cached_forecast(),
+            {'min_temperature': 1.5, 'max_temperature': 7.0},
+        )
+
+        self.post_override(-2, 3)
+        self.assertEqual(
+            self.get_cached_forecast(),
+            {'min_temperature': -2.0, 'max_temperature': 3.0},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Forecast.objects.get().delete()
+        self.assertEqual(self.get_cached_forecast()['min_temperature'], 0.0)
+
+    def test_bulk_import_invalidates_cached_overrides(self):
+        self.post_override(1.5, 7)
+        self.assertEqual(self.get_forecast()['min_temperature'], 1.5)
+
+        response = self.client.post(
+            '/api/weather/forecast/bulk/',
+            [
+                {
+                    'city': 'Lyon',
+                    'date': self.day,
+                    'min_temperature': 4,
+                    'max_temperature': 9,
+                }
+            ],
+            format='json',
+        )
+
+        self.assertEqual(response.data['saved'], 1)
+        self.assertEqual(
+            self.get_forecast(),
+            {'min_temperature': 4.0, 'max_temperature': 9.0},
+        )
+
+    def test_changes_of_other_workers_are_applied(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'invalidations.log')
+        worker = OverrideCache('test-worker')
+        worker.log = InvalidationLog(path)
+        day = date.today()
+        self.assertEqual(worker.get('lyon', day), (False, None))
+        worker.add_many('lyon', {day: None})
+
+        other = InvalidationLog(path)
+        with mock.patch('api.invalidation.os.getpid', return_value=0):
+            other.publish(
+                {
+                    'city': 'lyon',
+                    'date': day.isoformat(),
+                    'override': [1.5, 7.0, timezone.now().isoformat()],
+                }
+            )
+        found, override = worker.get('Lyon', day)
+        self.assertTrue(found)
+        self.assertEqual(override[:2], (1.5, 7.0))
+
+        with mock.patch('api.invalidation.os.getpid', return_value=0):
+            other.publish({'cities': ['lyon']})
+        self.assertEqual(worker.get('lyon', day), (False, None))
+
+
+class AsyncViewParityTests(WeatherViewTestCase):
+    """Async views answer like their sync counterparts."""
+
+    def get_both(self, path, params, upstream, headers=None):
+        """Returns responses of the sync and the async view."""
+        with mock.patch('api.views.open_meteo.get', upstream):
+            response = self.client.get(f'/api/{path}', params, headers=headers)
+        async_upstream = mock.AsyncMock(
+            return_value=upstream.return_value,
+            side_effect=upstream.side_effect,
+        )
+        with mock.patch(
+            'api.async_views.async_open_meteo.get', async_upstream
+        ):
+            async_response = async_to_sync(self.async_client.get)(
+                f'/api/async/{path}', params, headers=headers
+            )
+        return response, async_response
+
+    def assertSameResponses(self, responses, status_code):
+        response, async_response = responses
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(async_response.status_code, status_code)
+        self.assertEqual(response.content, async_response.content)
+        for header in ('ETag', 'Cache-Control', 'Retry-After', 'X-Data-Age'):
+            self.assertEqual(
+                response.headers.get(header),
+                async_response.headers.get(header),
+                header,
+            )
+
+    def test_fresh_forecast(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+
+        responses = self.get_both(
+            'weather/current/', {'city': 'lyon'}, mock.Mock()
+        )
+
+        self.assertSameResponses(responses, status.HTTP_200_OK)
+
+    def test_not_modified(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        etag = self.client.get(self.url, {'city': 'lyon'}).headers['ETag']
+
+        responses = self.get_both(
+            'weather/current/',
+            {'city': 'lyon'},
+            mock.Mock(),
+            headers={'If-None-Match': etag},
+        )
+
+        self.assertSameResponses(responses, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unknown_city(self):
+        geocode_cache.store('atlantis', None)
+
+        responses = self.get_both(
+            'weather/forecast/',
+            {'city': 'atlantis', 'date': date.today().strftime('%d.%m.%Y')},
+            mock.Mock(),
+        )
+
+        self.assertSameResponses(responses, status.HTTP_404_NOT_FOUND)
+
+    def test_upstream_unavailable(self):
+        responses = self.get_both(
+            'weather/current/',
+            {'city': 'lyon'},
+            mock.Mock(side_effect=UpstreamError('open-meteo')),
+        )
+
+        self.assertSameResponses(
+            responses, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    def test_stale_forecast_while_upstream_fails(self):
+        now = time.time()
+        cache.set(
+            forecast_cache.make_key(self.latitude, self.longitude),
+            {
+                'data': get_payload(),
+                'fetched_at': now - 4000,
+                'expires_at': now - 60,
+            },
+            3600,
+        )
+        failure = FakeResponse({'reason': 'unavailable'})
+        failure.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+        with override_settings(FORECAST_STALE_WHILE_REVALIDATE=0):
+            responses = self.get_both(
+                'weather/current/',
+                {'city': 'lyon'},
+                mock.Mock(return_value=failure),
+            )
+
+        self.assertSameResponses(responses, status.HTTP_200_OK)
+
+    def test_throttled(self):
+        forecast_cache.set(self.latitude, self.longitude, get_payload())
+        with mock.patch.object(client_limiter, 'burst', 0):
+            # Fills the bucket of the client.
+            self.client.get(self.url, {'city': 'lyon'})
+            responses = self.get_both(
+                'weather/current/', {'city': 'lyon'}, mock.Mock()
+            )
+
+        self.assertSameResponses(responses, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class BatchWeatherViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        geocode_cache.clear()
+        geocode_cache.store('lyon', (45.76, 4.83))
+        for patcher in (
+            mock.patch.object(forecast_archiver, 'enabled', False),
+            mock.patch.object(popularity, 'record'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post_batch(self, items):
+        with mock.patch(
+            'api.views.open_meteo.get',
+            return_value=FakeResponse([get_payload()]),
+        ):
+            return self.client.post(
+                '/api/weather/batch/', {'items': items}, format='json'
+            )
+
+    def test_null_date_asks_for_current_weather(self):
+        response = self.post_batch([{'city': 'lyon', 'date': None}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['status'], status.HTTP_200_OK)
+        self.assertIsNone(result['date'])
+        self.assertEqual(result['data']['temperature'], 20.5)
+
+    def test_response_of_current_weather_can_be_sent_back(self):
+        first = self.post_batch([{'city': 'lyon'}])
+        items = [
+            {'city': result['city'], 'date': result['date']}
+            for result in first.data['results']
+        ]
+
+        response = self.post_batch(items)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['results'][0]['status'], status.HTTP_200_OK
+        )
+
+
+class ImportForecastsTests(APITestCase):
+    def get_row(self, city, min_temperature='1.5', max_temperature='7'):
+        return {
+            'city': city,
+            'date': date.today().strftime('%d.%m.%Y'),
+            'min_temperature': min_temperature,
+            'max_temperature': max_temperature,
+        }
+
+    def test_non_finite_temperatures_are_row_errors(self):
+        rows = [
+            self.get_row('lyon', 'nan'),
+            self.get_row('nice', '1', 'inf'),
+            self.get_row('metz', '-inf'),
+            self.get_row('lille'),
+        ]
+
+        report = import_forecasts(rows)
+
+        self.assertEqual(report['saved'], 1)
+        self.assertEqual(
+            [error['row'] for error in report['errors']], [0, 1, 2]
+        )
+        self.assertEqual(Forecast.objects.get().city, 'lille')
+
+    def test_rejected_batch_is_reported_and_import_goes_on(self):
+        rows = [self.get_row(city) for city in ('lyon', 'nice', 'metz')]
+        bulk_create = Forecast.objects.bulk_create
+        calls = []
+
+        def fail_first_batch(objects, **kwargs):
+            calls.append(objects)
+            if len(calls) == 1:
+                raise DatabaseError('rejected')
+            return bulk_create(objects, **kwargs)
+
+        with mock.patch.object(
+            Forecast.objects, 'bulk_create', side_effect=fail_first_batch
+        ):
+            report = import_forecasts(rows, batch_size=2)
+
+        self.assertEqual(report['saved'], 1)
+        self.assertEqual(report['failed'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [0, 1])
+        self.assertEqual(Forecast.objects.get().city, 'metz')
+
+
+class PrefetcherTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Location.objects.create(
+            query='lyon', latitude=45.76, longitude=4.83, hits=5
+        )
+        patcher = mock.patch.object(forecast_archiver, 'enabled', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_after_boundary(self, prefetcher, elapsed):
+        timeout = forecast_cache.update_interval - elapsed
+        with (
+            mock.patch.object(
+                forecast_cache, 'get_timeout', return_value=timeout
+            ),
+            mock.patch(
+                'api.views.BaseWeatherMixin.get_forecasts',
+                return_value=FakeResponse([get_payload()]),
+            ) as get_forecasts,
+        ):
+            report = prefetcher.run_once()
+        return report, get_forecasts
+
+    def test_one_prefetcher_refreshes_cities_after_boundary(self):
+        latitude, longitude = forecast_cache.snap(45.76, 4.83)
+        now = time.time()
+        # Fetched before the boundary, stale since it.
+        cache.set(
+            forecast_cache.make_key(latitude, longitude),
+            {
+                'data': get_payload(),
+                'fetched_at': now - 600,
+                'expires_at': now - 10,
+            },
+            3600,
+        )
+
+        report, _ = self.run_after_boundary(Prefetcher(lead=300), 10)
+        other, get_forecasts = self.run_after_boundary(
+            Prefetcher(lead=300), 20
+        )
+
+        self.assertEqual(report['fetched'], 1)
+        self.assertEqual(other['fetched'], 0)
+        get_forecasts.assert_not_called()
+        entry = cache.get(forecast_cache.make_key(latitude, longitude))
+        # Fresh until the next boundary only.
+        self.assertLessEqual(
+            entry['expires_at'] - entry['fetched_at'],
+            forecast_cache.update_interval - 10,
+        )
+
+    def test_fresh_entries_are_not_refetched_before_boundary(self):
+        latitude, longitude = forecast_cache.snap(45.76, 4.83)
+        forecast_cache.set(latitude, longitude, get_payload(), timeout=100)
+
+        report, get_forecasts = self.run_after_boundary(
+            Prefetcher(lead=300), forecast_cache.update_interval - 100
+        )
+
+        self.assertEqual(report['fetched'], 0)
+        get_forecasts.assert_not_called()
+
+    def test_later_cycles_fill_missing_entries_only(self):
+        report, _ = self.run_after_boundary(Prefetcher(lead=300), 400)
+        again, get_forecasts = self.run_after_boundary(
+            Prefetcher(lead=300), 500
+        )
+
+        self.assertEqual(report['fetched'], 1)
+        self.assertEqual(again['fetched'], 0)
+        get_forecasts.assert_not_called()
+
+    def test_gazetteer_cities_are_not_geocoded_again(self):
+        Location.objects.create(
+            query='atlantis', latitude=10.0, longitude=20.0, hits=1
+        )
+        Location.objects.update(
+            updated_at=timezone.now()
+            - timedelta(seconds=consts.GEOCODE_MAX_AGE + 1)
+        )
+        gazetteer = mock.Mock()
+        gazetteer.lookup.side_effect = {'lyon': (45.76, 4.83)}.get
+        prefetcher = Prefetcher()
+        prefetcher.pace = mock.Mock()
+
+        with (
+            mock.patch('api.prefetch.get_gazetteer', return_value=gazetteer),
+            mock.patch.object(
+                geocode_cache.geolocator, 'geocode', return_value=None
+            ) as geocode,
+        ):
+            prefetcher.refresh_coordinates(prefetcher.get_top_locations())
+
+        geocode.assert_called_once_with('atlantis')
+
+
+class PopularityTrackerTests(APITestCase):
+    def test_counts_of_gazetteer_cities_are_kept(self):
+        gazetteer = mock.Mock()
+        gazetteer.lookup.side_effect = {'lyon': (45.76, 4.83)}.get
+        tracker = PopularityTracker()
+        tracker.start = mock.Mock()
+        for city in ('Lyon', 'lyon', 'Atlantis'):
+            tracker.record(city)
+
+        with mock.patch('api.geocoding.get_gazetteer', return_value=gazetteer):
+            tracker.flush()
+
+        location = Location.objects.get()
+        self.assertEqual(location.query, 'lyon')
+        self.assertEqual(location.hits, 2)
+        self.assertEqual(
+            (location.latitude, location.longitude), (45.76, 4.83)
+        )
+
+
+class AccuracyTests(APITestCase):
+    def setUp(self):
+        geocode_cache.clear()
+        self.today = date.today()
+        cell = geohash.encode(48.85, 2.35, settings.FORECAST_GRID_PRECISION)
+        issued_at = timezone.now()
+        rows = []
+        for back in range(1, 4):
+            day = self.today - timedelta(back)
+            for lead, minimum, maximum in (
+                (0, 5, 15),
+                (0, 7, 17),
+                (1, 7, 15),
+                (2, 8, None),
+            ):
+                rows.append(
+                    ForecastArchive(
+                        cell=cell,
+                        target_date=day,
+                        issued_at=issued_at,
+                        lead_days=lead,
+                        min_temperature=minimum,
+                        max_temperature=maximum,
+                    )
+                )
+        ForecastArchive.objects.bulk_create(rows)
+
+    def test_errors_are_aggregated_by_lead_time(self):
+        accuracy = get_accuracy(self.today - timedelta(3), self.today)
+
+        self.assertEqual(
+            accuracy['observed_source'], consts.ACCURACY_OBSERVED_SOURCE
+        )
+        self.assertEqual(accuracy['observed_days'], 3)
+        first, second = accuracy['forecasts']
+        self.assertEqual(first['lead_days'], 1)
+        self.assertEqual(
+            first['min_temperature'],
+            {'count': 3, 'bias': 1.0, 'mae': 1.0, 'rmse': 1.0},
+        )
+        self.assertEqual(first['max_temperature']['bias'], -1.0)
+        self.assertEqual(second['min_temperature']['bias'], 2.0)
+        self.assertEqual(second['max_temperature']['count'], 0)
+
+    def test_overrides_of_gazetteer_cities_are_compared(self):
+        geocode_cache.store('paris', (48.85, 2.35))
+        Forecast.objects.create(
+            city='paris',
+            date=self.today - timedelta(1),
+            min_temperature=8,
+            max_temperature=18,
+        )
+
+        accuracy = get_accuracy(self.today - timedelta(3), self.today)
+
+        self.assertEqual(
+            accuracy['overrides']['min_temperature'],
+            {'count': 1, 'bias': 2.0, 'mae': 2.0, 'rmse': 2.0},
+        )
+
+    def test_partial_payloads_are_not_archived(self):
+        archiver = ForecastArchiver(enabled=True)
+        archiver.start = mock.Mock()
+        partial = get_payload()
+        del partial['daily']['temperature_2m_max']
+
+        self.assertEqual(archiver.record(45.76, 4.83, partial), 0)
+        self.assertEqual(archiver.record(45.76, 4.83, get_payload()), 11)
+
+
+class ParseDateTests(SimpleTestCase):
+    def test_accepts_what_strptime_accepts(self):
+        for value in ('01.02.2026', '1.2.2026', ' 1.02.2026', '01. 2.2026'):
+            with self.subTest(value=value):
+                try:
+                    expected = datetime.strptime(
+                        value, consts.DATE_FORMAT
+                    ).date()
+                except ValueError:
+                    expected = None
+                self.assertEqual(parse_date(value), expected)
+
+
+class ClientIdTests(APITestCase):
+    def get_request(self, **meta):
+        return RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', **meta)
+
+    def test_forwarded_address_is_used_behind_proxies(self):
+        request = self.get_request(HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.2')
+
+        self.assertEqual(get_client_id(request), 'ip:10.0.0.1')
+        with override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1}):
+            self.assertEqual(get_client_id(request), 'ip:10.0.0.2')
+        with override_settings(REST_FRAMEWORK={'NUM_PROXIES': 2}):
+            self.assertEqual(get_client_id(request), 'ip:1.2.3.4')
+
+
+class TokenBucketTests(APITestCase):
+    def test_idle_correction_is_applied_once(self):
+        bucket = TokenBucket('test', 60, 3)
+        cache.set('test:lyon', 0)
+        incr = cache.incr
+        raced = []
+
+        def incr_racing(key, delta=1):
+            # Another request corrects the idle bucket in the meantime.
+            if delta > bucket.interval:
+                racing.incr.side_effect = incr
+                raced.append(bucket.acquire('lyon'))
+            return incr(key, delta)
+
+        racing = mock.Mock(wraps=cache)
+        racing.incr.side_effect = incr_racing
+        with mock.patch('api.ratelimit.cache', racing):
+            self.assertEqual(bucket.acquire('lyon'), 0)
+
+        self.assertEqual(raced, [0])
+        self.assertEqual(bucket.acquire('lyon'), 0)
+
+
+class WarmGeocodeCacheTests(APITestCase):
+    def setUp(self):
+        geocode_cache.clear()
+
+    @mock.patch('geopy.extra.rate_limiter.sleep')
+    def test_upstream_errors_are_counted_as_failed(self, sleep):
+        output = io.StringIO()
+        with mock.patch(
+            'api.upstream.nominatim.get',
+            side_effect=BudgetExceededError('nominatim: budget is spent'),
+        ):
+            call_command('warm_geocode_cache', 'Berlin', 'Rome', stdout=output)
+
+        self.assertIn('0 not found, 2 failed', output.getvalue())
+        self.assertFalse(Location.objects.exists())
@@ -0,0 +1,25 @@
+from rest_framework.throttling import BaseThrottle
+
+from api.metrics import throttled_requests
+from api.ratelimit import client_limiter, get_client_id
+
+
+class ClientRateThrottle(BaseThrottle):
+    """
+    Throttle limiting every client by ``client_limiter``.
+
+    Rejected requests are answered with 429 and ``Retry-After`` by DRF.
+    """
+
+    def __init__(self):
+        self.wait_time = None
+
+    def allow_request(self, request, view) -> bool:
+        self.wait_time = client_limiter.acquire(get_client_id(request))
+        if self.wait_time:
+            throttled_requests.inc('client')
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_time
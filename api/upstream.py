@@ -0,0 +1,248 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+from api import consts
+from api.exeptions import BudgetExceededError, CircuitOpenError, UpstreamError
+from api.metrics import throttled_requests, timed, upstream_requests
+from api.ratelimit import TokenBucket
+
+if TYPE_CHECKING:
+    import requests
+
+
+class CircuitBreaker:
+    """
+    Suspends calls to upstream after ``failure_threshold`` failures in a row.
+
+    After ``reset_timeout`` seconds one trial call is let through, its
+    result either closes the circuit or keeps it open for another period.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError
+            self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """
+    HTTP client for an upstream service.
+
+    Keeps a keep-alive connection pool per process, applies connect and
+    read timeouts, retries connection errors and 5xx answers with jittered
+    exponential backoff and stops calling upstream while it keeps failing.
+    Calls of all workers are counted against the budget of
+    ``budget_per_minute`` calls, calls over it are not sent at all.
+    requests is imported with the first session, so that workers that
+    never call upstream do not pay for it on startup.
+    """
+
+    def __init__(self, name: str, budget_per_minute: int):
+        self.name = name
+        self.budget = TokenBucket(
+            consts.UPSTREAM_BUDGET_PREFIX,
+            budget_per_minute,
+            consts.UPSTREAM_BUDGET_BURST,
+        )
+        self.timeout = (
+            settings.UPSTREAM_CONNECT_TIMEOUT,
+            settings.UPSTREAM_READ_TIMEOUT,
+        )
+        self.breaker = CircuitBreaker(
+            settings.UPSTREAM_BREAKER_THRESHOLD,
+            settings.UPSTREAM_BREAKER_RESET_TIMEOUT,
+        )
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._session = self._create_session()
+                    self._pid = os.getpid()
+        return self._session
+
+    @staticmethod
+    def _create_session() -> 'requests.Session':
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=settings.UPSTREAM_RETRIES,
+            allowed_methods=('GET',),
+            status_forcelist=consts.UPSTREAM_RETRY_STATUSES,
+            backoff_factor=settings.UPSTREAM_BACKOFF_FACTOR,
+            backoff_jitter=settings.UPSTREAM_BACKOFF_FACTOR,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_maxsize=settings.UPSTREAM_POOL_SIZE, max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        """
+        Sends GET request to upstream.
+
+        Args:
+            url (str): URL of the request.
+            **kwargs: Arguments of ``requests.Session.get``.
+
+        Raises:
+            BudgetExceededError: If the budget of calls is spent.
+            CircuitOpenError: If upstream is considered to be down.
+            UpstreamError: If upstream did not answer.
+
+        Returns:
+            Response: HTTP response object from upstream.
+        """
+        import requests
+
+        if self.budget.acquire(self.name):
+            throttled_requests.inc(self.name)
+            raise BudgetExceededError(f'{self.name}: budget is spent')
+        self.breaker.before_call()
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            with timed(self.name):
+                response = self.session.get(url, **kwargs)
+        except requests.RequestException as error:
+            upstream_requests.inc(self.name, 'error')
+            self.breaker.record_failure()
+            raise UpstreamError(f'{self.name}: {error}') from error
+
+        upstream_requests.inc(self.name, response.status_code)
+        if response.status_code in consts.UPSTREAM_RETRY_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+
+class AsyncUpstreamClient:
+    """
+    Non-blocking HTTP client for an upstream service based on httpx.
+
+    Follows the same timeouts, retry policy and circuit breaker as the
+    synchronous client it is created for. Connection pools are kept per
+    event loop.
+    """
+
+    def __init__(self, client: UpstreamClient):
+        self.name = client.name
+        self.budget = client.budget
+        self.breaker = client.breaker
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get_client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    settings.UPSTREAM_READ_TIMEOUT,
+                    connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.UPSTREAM_ASYNC_POOL_SIZE,
+                    max_keepalive_connections=settings.UPSTREAM_POOL_SIZE,
+                ),
+            )
+        return client
+
+    async def get(self, url: str, **kwargs):
+        """
+        Sends GET request to upstream.
+
+        Args:
+            url (str): URL of the request.
+            **kwargs: Arguments of ``httpx.AsyncClient.get``.
+
+        Raises:
+            BudgetExceededError: If the budget of calls is spent.
+            CircuitOpenError: If upstream is considered to be down.
+            UpstreamError: If upstream did not answer.
+
+        Returns:
+            httpx.Response: HTTP response object from upstream.
+        """
+        import httpx
+
+        if await self.budget.aacquire(self.name):
+            throttled_requests.inc(self.name)
+            raise BudgetExceededError(f'{self.name}: budget is spent')
+        self.breaker.before_call()
+        client = self.get_client()
+        for attempt in range(settings.UPSTREAM_RETRIES + 1):
+            last_attempt = attempt == settings.UPSTREAM_RETRIES
+            try:
+                with timed(self.name):
+                    response = await client.get(url, **kwargs)
+            except httpx.TransportError as error:
+                upstream_requests.inc(self.name, 'error')
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise UpstreamError(f'{self.name}: {error}') from error
+            else:
+                upstream_requests.inc(self.name, response.status_code)
+                if response.status_code not in consts.UPSTREAM_RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                if last_attempt:
+                    self.breaker.record_failure()
+                    return response
+
+            backoff = settings.UPSTREAM_BACKOFF_FACTOR
+            await asyncio.sleep(
+                backoff * 2**attempt + random.uniform(0, backoff)
+            )
+
+
+open_meteo = UpstreamClient('open-meteo', settings.OPEN_METEO_BUDGET)
+nominatim = UpstreamClient('nominatim', settings.NOMINATIM_BUDGET)
+async_open_meteo = AsyncUpstreamClient(open_meteo)
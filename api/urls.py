@@ -1,9 +1,26 @@
-from django.contrib import admin
 from django.urls import include, path
 
-from api.views import CurrentWeatherView, ForecastWeatherView
+from api.async_views import AsyncCurrentWeatherView, AsyncForecastWeatherView
+from api.views import (
+    BatchWeatherView,
+    CurrentWeatherView,
+    ForecastAccuracyView,
+    ForecastBulkView,
+    ForecastExportView,
+    ForecastHourlyView,
+    ForecastRangeView,
+    ForecastWeatherView,
+)
 
 urlpatterns = [
     path('weather/current/', CurrentWeatherView.as_view()),
     path('weather/forecast/', ForecastWeatherView.as_view()),
+    path('weather/forecast/bulk/', ForecastBulkView.as_view()),
+    path('weather/forecast/export/', ForecastExportView.as_view()),
+    path('weather/forecast/range/', ForecastRangeView.as_view()),
+    path('weather/forecast/hourly/', ForecastHourlyView.as_view()),
+    path('weather/forecast/accuracy/', ForecastAccuracyView.as_view()),
+    path('weather/batch/', BatchWeatherView.as_view()),
+    path('async/weather/current/', AsyncCurrentWeatherView.as_view()),
+    path('async/weather/forecast/', AsyncForecastWeatherView.as_view()),
 ]
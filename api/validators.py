@@ -0,0 +1,263 @@
+import re
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from api import consts
+
+# Accepts what ``datetime.strptime`` accepts for ``consts.DATE_FORMAT``.
+DATE_PATTERN = re.compile(
+    r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])\.(1[0-2]|0[1-9]|[1-9])\.(\d{4})'
+)
+
+NULL_ERROR = ['This field may not be null.']
+BLANK_ERROR = ['This field may not be blank.']
+DATE_FORMAT_ERROR = [
+    'Date has wrong format. Use one of these formats instead: DD.MM.YYYY.'
+]
+PAST_DATE_ERROR = {'message': 'The date cannot be in the past.'}
+FAR_DATE_ERROR = {
+    'message': 'The date cannot be more than 10 days in the future.'
+}
+RANGE_ORDER_ERROR = {'message': 'The date cannot be before date_from.'}
+RANGE_LENGTH_ERROR = {
+    'message': (
+        f'The range cannot be longer than {consts.ACCURACY_MAX_DAYS} days.'
+    )
+}
+
+
+def parse_date(value: str) -> Optional[date]:
+    """
+    Parses the date in ``consts.DATE_FORMAT``.
+
+    Args:
+        value (str): Date passed by the client.
+
+    Returns:
+        date | None: Parsed date or None if the value is malformed.
+    """
+    match = DATE_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    day, month, year = match.groups()
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def get_forecast_date_error(value: date) -> Optional[dict]:
+    """
+    Checks that the date is within the forecast window.
+
+    Args:
+        value (date): Date of the forecast.
+
+    Returns:
+        dict | None: Error payload or None if the date is valid.
+    """
+    today = timezone.now().date()
+    if value < today:
+        return PAST_DATE_ERROR
+    if value - today > timedelta(consts.FORECAST_MAX_DAYS_AHEAD):
+        return FAR_DATE_ERROR
+    return None
+
+
+def parse_forecast_query(query_params) -> Tuple[str, date]:
+    """
+    Validates query params of the forecast request.
+
+    Does the same checks with the same error payloads as
+    ``ForecastQueryParamsSerializer`` without building serializer fields,
+    and parses every param once.
+
+    Args:
+        query_params (QueryDict): Query params of the request.
+
+    Raises:
+        ValidationError: If a param is missing or invalid.
+
+    Returns:
+        Tuple[str, date]: City name and date of the forecast.
+    """
+    city = query_params.get('city')
+    value = query_params.get('date')
+
+    errors = {}
+    forecast_date = None
+    if value is None:
+        errors['date'] = NULL_ERROR
+    else:
+        forecast_date = parse_date(value)
+        if forecast_date is None:
+            errors['date'] = DATE_FORMAT_ERROR
+        else:
+            error = get_forecast_date_error(forecast_date)
+            if error is not None:
+                errors['date'] = error
+
+    if city is None:
+        errors['city'] = NULL_ERROR
+    elif not city.strip():
+        errors['city'] = BLANK_ERROR
+
+    if errors:
+        raise ValidationError(errors)
+    return city.strip(), forecast_date
+
+
+def parse_window_date(value: Optional[str], errors: dict, name: str):
+    """
+    Parses the optional date param and checks the forecast window.
+
+    Errors are put into ``errors`` under ``name``.
+
+    Returns:
+        date | None: Parsed date or None if it is missing or invalid.
+    """
+    if value is None:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        errors[name] = DATE_FORMAT_ERROR
+        return None
+    error = get_forecast_date_error(parsed)
+    if error is not None:
+        errors[name] = error
+        return None
+    return parsed
+
+
+def parse_fields(value: Optional[str], choices: dict, errors: dict):
+    """
+    Parses the comma-separated list of fields.
+
+    Duplicates are dropped, the order of the first occurrences is kept.
+    Errors are put into ``errors`` under ``fields``.
+
+    Returns:
+        tuple | None: Fields or None if the value is invalid.
+    """
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',')))
+    if '' in fields:
+        errors['fields'] = BLANK_ERROR
+        return None
+    invalid = [field for field in fields if field not in choices]
+    if invalid:
+        errors['fields'] = [
+            f'"{field}" is not a valid choice.' for field in invalid
+        ]
+        return None
+    return fields
+
+
+def parse_range_query(
+    query_params,
+    fields: dict = consts.DAILY_FIELDS,
+    default_fields: tuple = consts.DAILY_DEFAULT_FIELDS,
+    layouts: tuple = consts.RANGE_LAYOUTS,
+) -> Tuple[str, date, date, str, tuple]:
+    """
+    Validates query params of the forecast range request.
+
+    ``date_from`` defaults to today and ``date_to`` to the last day of the
+    forecast window, ``layout`` to the first of ``layouts`` and ``fields``
+    (comma-separated) to ``default_fields``.
+
+    Args:
+        query_params (QueryDict): Query params of the request.
+        fields (dict): Fields that may be requested.
+        default_fields (tuple): Fields of the response by default.
+        layouts (tuple): Layouts of the response that may be requested.
+
+    Raises:
+        ValidationError: If a param is missing or invalid.
+
+    Returns:
+        Tuple[str, date, date, str, tuple]: City name, first and last date
+        of the range, layout and fields of the response.
+    """
+    errors = {}
+    city = query_params.get('city')
+    if city is None:
+        errors['city'] = NULL_ERROR
+    elif not city.strip():
+        errors['city'] = BLANK_ERROR
+
+    date_from = parse_window_date(
+        query_params.get('date_from'), errors, 'date_from'
+    )
+    date_to = parse_window_date(query_params.get('date_to'), errors, 'date_to')
+    if date_from is not None and date_to is not None and date_to < date_from:
+        errors['date_to'] = RANGE_ORDER_ERROR
+
+    layout = query_params.get('layout', layouts[0])
+    if layout not in layouts:
+        errors['layout'] = [f'"{layout}" is not a valid choice.']
+
+    requested = query_params.get('fields')
+    if requested is not None:
+        requested = parse_fields(requested, fields, errors)
+
+    if errors:
+        raise ValidationError(errors)
+
+    today = timezone.now().date()
+    return (
+        city.strip(),
+        date_from or today,
+        date_to or today + timedelta(consts.FORECAST_MAX_DAYS_AHEAD),
+        layout,
+        requested or default_fields,
+    )
+
+
+def parse_accuracy_query(query_params) -> Tuple[Optional[str], date, date]:
+    """
+    Validates query params of the forecast accuracy request.
+
+    ``date_to`` defaults to today and ``date_from`` to
+    ``ACCURACY_DEFAULT_DAYS`` days before it, past dates are allowed. The
+    range is at most ``ACCURACY_MAX_DAYS`` days long. ``city`` is optional.
+
+    Args:
+        query_params (QueryDict): Query params of the request.
+
+    Raises:
+        ValidationError: If a param is invalid.
+
+    Returns:
+        Tuple[str | None, date, date]: City name or None for all cities,
+        first and last date of the range.
+    """
+    errors = {}
+    city = query_params.get('city')
+    if city is not None:
+        city = city.strip()
+        if not city:
+            errors['city'] = BLANK_ERROR
+
+    dates = {}
+    for name in ('date_from', 'date_to'):
+        value = query_params.get(name)
+        if value is not None:
+            dates[name] = parse_date(value)
+            if dates[name] is None:
+                errors[name] = DATE_FORMAT_ERROR
+
+    if errors:
+        raise ValidationError(errors)
+
+    date_to = dates.get('date_to') or timezone.now().date()
+    date_from = dates.get('date_from') or date_to - timedelta(
+        consts.ACCURACY_DEFAULT_DAYS - 1
+    )
+    if date_to < date_from:
+        raise ValidationError({'date_to': RANGE_ORDER_ERROR})
+    if (date_to - date_from).days >= consts.ACCURACY_MAX_DAYS:
+        raise ValidationError({'date_to': RANGE_LENGTH_ERROR})
+    return city, date_from, date_to
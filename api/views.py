@@ -1,65 +1,167 @@
-from datetime import datetime
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
 
-import requests
-from django.utils import timezone
-from geopy.geocoders import Nominatim
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import status
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api import consts
-from api.exeptions import LocationError
+from api import consts, geohash
+from api.accuracy import get_accuracy
+from api.archive import forecast_archiver
+from api.exeptions import LocationError, UpstreamError
+from api.export import iter_forecasts, render_csv, render_ndjson
+from api.forecast_cache import (
+    forecast_cache,
+    forecast_flight,
+    forecast_revalidation,
+)
+from api.geocoding import geocode_cache
+from api.http_cache import (
+    get_cache_headers,
+    get_override_max_age,
+    is_not_modified,
+    make_etag,
+)
+from api.ingest import import_forecasts
+from api.metrics import timed
+from api.override_cache import override_cache
+from api.parsers import CSVParser
+from api.prefetch import popularity
+from api.renderers import select_lean_renderer
 from api.serializers import (
-    ForecastQueryParamsSerializer,
-    ForecastReadSerializer,
+    BatchItemSerializer,
+    BatchSerializer,
+    ExportQueryParamsSerializer,
     ForecastWriteSerializer,
 )
+from api.upstream import open_meteo
+from api.validators import (
+    parse_accuracy_query,
+    parse_forecast_query,
+    parse_range_query,
+)
 from weather.models import Forecast
+from weather.utils import normalize_city
 
 
 class BaseWeatherMixin:
     """Mixin to work with weather forecast through open-meteo."""
 
+    # Seconds since stale forecast data of the response was fetched.
+    data_age = None
+
+    @staticmethod
+    def get_forecast_params(
+        latitude: float, longitude: float, variables: Optional[dict] = None
+    ) -> dict:
+        """
+        Returns query params of the Open-Meteo API request.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variables (dict | None): Daily and hourly variables to request
+                instead of the default daily temperatures and the current
+                weather.
+
+        Returns:
+            dict: Query params.
+        """
+        params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'daily': 'temperature_2m_min,temperature_2m_max',
+            'timezone': 'auto',
+            'forecast_days': consts.REQUIRED_FORECAST_DAYS,
+            'current_weather': 'true',
+        }
+        if variables is not None:
+            del params['daily'], params['current_weather']
+            params.update(
+                (kind, ','.join(names)) for kind, names in variables.items()
+            )
+        return params
+
+    @staticmethod
+    def get_variables(daily: tuple = (), hourly: tuple = ()):
+        """
+        Returns Open-Meteo variables of the requested fields.
+
+        Args:
+            daily (tuple): Fields of ``consts.DAILY_FIELDS``.
+            hourly (tuple): Fields of ``consts.HOURLY_FIELDS``.
+
+        Returns:
+            dict | None: Sorted daily and hourly variables or None if the
+            default payload has all of them.
+        """
+        if not hourly and set(daily) <= set(consts.DAILY_DEFAULT_FIELDS):
+            return None
+        variables = {}
+        if daily:
+            variables['daily'] = tuple(
+                sorted(consts.DAILY_FIELDS[field] for field in daily)
+            )
+        if hourly:
+            variables['hourly'] = tuple(
+                sorted(consts.HOURLY_FIELDS[field] for field in hourly)
+            )
+        return variables
+
     @staticmethod
     def get_forecast(
-        city_name: str, days_count: int, current_weather: bool = False
+        latitude: float, longitude: float, variables: Optional[dict] = None
     ):
         """
         Fetches daily weather forecast from Open-Meteo API.
 
+        By default the whole forecast window is requested together with the
+        current weather, so one payload serves every endpoint. Other sets of
+        variables are requested exactly as given.
+
         Args:
-            city_name (str): Name of the city to fetch forecast for.
-            days_count (int): Number of forecast days (max 16 supported).
-            current_weather (bool): Flag for include data about the present
-                time.
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variables (dict | None): Daily and hourly variables to request.
 
         Raises:
-            LocationError: If the city cannot be geocoded.
+            UpstreamError: If Open-Meteo API did not answer.
 
         Returns:
             Response: HTTP response object from Open-Meteo API.
         """
-        geolocator = Nominatim(user_agent='weather_api')
+        response = open_meteo.get(
+            settings.OPEN_METEO_URL,
+            params=BaseWeatherMixin.get_forecast_params(
+                latitude, longitude, variables
+            ),
+        )
+
+        return response
 
-        location = geolocator.geocode(city_name)
-        if not location:
-            raise LocationError
+    @staticmethod
+    def get_forecasts(locations: list):
+        """
+        Fetches forecasts for several locations with one Open-Meteo request.
 
-        lat, lon = location.latitude, location.longitude
+        Args:
+            locations (list): Latitude and longitude pairs.
 
-        response = requests.get(
-            'https://api.open-meteo.com/v1/forecast',
-            params={
-                'latitude': lat,
-                'longitude': lon,
-                'daily': 'temperature_2m_min,temperature_2m_max',
-                'timezone': 'auto',
-                'forecast_days': days_count,
-                'current_weather': current_weather,
-            },
-        )
+        Raises:
+            UpstreamError: If Open-Meteo API did not answer.
 
-        return response
+        Returns:
+            Response: HTTP response object from Open-Meteo API.
+        """
+        params = BaseWeatherMixin.get_forecast_params(0, 0)
+        params['latitude'] = ','.join(str(lat) for lat, _ in locations)
+        params['longitude'] = ','.join(str(lon) for _, lon in locations)
+        return open_meteo.get(settings.OPEN_METEO_URL, params=params)
 
     @staticmethod
     def parse_weather_response(response: Response):
@@ -74,45 +176,409 @@ class BaseWeatherMixin:
             success,
             or None and DRF Response on failure.
         """
-        if response.status_code != status.HTTP_200_OK:
-            return None, Response(response.json(), status=response.status_code)
-
         try:
-            data = response.json()
-            return data, None
-        except Exception:
+            with timed('parse'):
+                data = response.json()
+        except ValueError:
             return None, Response(
                 {'message': 'Error parsing data with weather API'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        if response.status_code != status.HTTP_200_OK:
+            return None, Response(data, status=response.status_code)
+        return data, None
+
     def get_validated_forecast(
-        self, city: str, days_count: int, current_weather: bool = False
+        self, city: str, variables: Optional[dict] = None
     ):
         """
         Validates city and fetches weather data from Open-Meteo API.
 
+        Payloads are taken from the forecast cache when possible, concurrent
+        misses for the same location share one upstream fetch.
+
         Args:
             city (str): City name.
-            days_count (int): Number of forecast days.
-            current_weather (bool): Flag for include data about the present
-                time.
+            variables (dict | None): Daily and hourly variables of the
+                payload, the default set if None.
 
         Returns:
             Tuple[dict | None, Response | None]: Parsed forecast data or error
             response.
         """
         try:
-            response = self.get_forecast(city, days_count, current_weather)
+            latitude, longitude = geocode_cache.get_coordinates(city)
         except LocationError:
             return None, Response(
                 {'message': 'Location not found.'},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        return self.parse_weather_response(response)
+        except UpstreamError:
+            return None, Response(
+                {'message': 'Weather service is unavailable.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        popularity.record(city)
+
+        latitude, longitude = forecast_cache.snap(latitude, longitude)
+        variant = forecast_cache.get_variant(variables)
+        key = forecast_cache.make_key(latitude, longitude, variant)
+        cached = forecast_cache.lookup(latitude, longitude, variant)
+        if cached is not None and not cached.stale:
+            return cached.data, None
+        if (
+            cached is not None
+            and cached.stale <= settings.FORECAST_STALE_WHILE_REVALIDATE
+        ):
+            forecast_cache.increment('stale')
+            forecast_revalidation.submit(
+                key, self.revalidate_forecast, latitude, longitude, variables
+            )
+            self.data_age = cached.age
+            return cached.data, None
+
+        try:
+            data, error_response = forecast_flight.do(
+                key, self.fetch_forecast, latitude, longitude, variables
+            )
+        except UpstreamError:
+            data, error_response = None, Response(
+                {'message': 'Weather service is unavailable.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        if error_response is None:
+            return data, None
+        if (
+            cached is not None
+            and cached.stale <= settings.FORECAST_STALE_IF_ERROR
+            and error_response.status_code in consts.STALE_IF_ERROR_STATUSES
+        ):
+            forecast_cache.increment('stale_if_error')
+            self.data_age = cached.age
+            return cached.data, None
+        return None, Response(
+            error_response.data, status=error_response.status_code
+        )
+
+    def revalidate_forecast(
+        self,
+        latitude: float,
+        longitude: float,
+        variables: Optional[dict] = None,
+    ) -> None:
+        """
+        Refreshes the stale forecast in the background.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variables (dict | None): Daily and hourly variables of the
+                payload.
+        """
+        variant = forecast_cache.get_variant(variables)
+        try:
+            _, error_response = forecast_flight.do(
+                forecast_cache.make_key(latitude, longitude, variant),
+                self.fetch_forecast,
+                latitude,
+                longitude,
+                variables,
+            )
+        except UpstreamError:
+            forecast_cache.increment('revalidation_errors')
+            return
+        if error_response is not None:
+            forecast_cache.increment('revalidation_errors')
+
+    def fetch_forecast(
+        self,
+        latitude: float,
+        longitude: float,
+        variables: Optional[dict] = None,
+    ):
+        """
+        Fetches the forecast from Open-Meteo API and stores it in the cache.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+            variables (dict | None): Daily and hourly variables of the
+                payload.
+
+        Returns:
+            Tuple[dict | None, Response | None]: Parsed forecast data or error
+            response.
+        """
+        variant = forecast_cache.get_variant(variables)
+        data = forecast_cache.peek(latitude, longitude, variant)
+        if data is not None:
+            return data, None
+
+        response = self.get_forecast(latitude, longitude, variables)
+        data, error_response = self.parse_weather_response(response)
+        if data is not None:
+            forecast_cache.set(latitude, longitude, data, variant=variant)
+            forecast_archiver.record(latitude, longitude, data)
+        return data, error_response
+
+    @staticmethod
+    def get_override(city: str, date):
+        """
+        Fetches the manual forecast override.
+
+        Overrides and their absence are cached, misses are read with a
+        single indexed query. The query goes to the primary database: a
+        replica lagging behind a bulk import would put the previous state
+        into the cache for the whole timeout.
+
+        Args:
+            city (str): City name.
+            date (date): Date of the forecast.
+
+        Returns:
+            dict | None: Minimal and maximal temperature with time of the
+            last change or None if there is no override.
+        """
+        found, override = override_cache.get(city, date)
+        if not found:
+            override = (
+                Forecast.objects.using('default')
+                .filter(city=normalize_city(city), date=date)
+                .values_list(
+                    'min_temperature', 'max_temperature', 'updated_at'
+                )
+                .first()
+            )
+            override_cache.add_many(city, {date: override})
+
+        if override is None:
+            return None
+        return {
+            'min_temperature': override[0],
+            'max_temperature': override[1],
+            'updated_at': override[2],
+        }
+
+    @staticmethod
+    def get_overrides(city: str, date_from, date_to) -> dict:
+        """
+        Fetches manual overrides of the date range.
+
+        Overrides are taken from the cache, if any date is missing there
+        the whole range is read from the primary database with one range
+        query, like in ``get_override``.
+
+        Args:
+            city (str): City name.
+            date_from (date): First date of the range.
+            date_to (date): Last date of the range.
+
+        Returns:
+            dict: Minimal and maximal temperature with time of the last
+            change by dates.
+        """
+        days = [
+            date_from + timedelta(offset)
+            for offset in range((date_to - date_from).days + 1)
+        ]
+        overrides = override_cache.get_many(city, days)
+        if len(overrides) < len(days):
+            rows = (
+                Forecast.objects.using('default')
+                .filter(
+                    city=normalize_city(city),
+                    date__range=(date_from, date_to),
+                )
+                .order_by()
+                .values_list(
+                    'date', 'min_temperature', 'max_temperature', 'updated_at'
+                )
+            )
+            overrides = dict.fromkeys(days)
+            overrides.update((row[0], row[1:]) for row in rows)
+            override_cache.add_many(city, overrides)
+
+        return {
+            day: override
+            for day, override in overrides.items()
+            if override is not None
+        }
+
+    def cached_response(
+        self, request, data: dict, max_age: int, last_modified=None
+    ) -> Response:
+        """
+        Builds the response with ETag and Cache-Control headers.
+
+        Answers 304 Not Modified if the client sent the same ETag in
+        If-None-Match. Stale data is sent with its age in X-Data-Age and is
+        not cached by clients.
+
+        Args:
+            request (Request): Request of the client.
+            data (dict): Payload of the response.
+            max_age (int): Freshness lifetime in seconds.
+            last_modified (datetime | None): Time of the last change of data.
+
+        Returns:
+            Response: Response with payload or 304 Not Modified.
+        """
+        renderer = getattr(request, 'accepted_renderer', None)
+        etag = make_etag(data, getattr(renderer, 'format', 'json'))
+        if self.data_age is not None:
+            max_age = 0
+        headers = get_cache_headers(etag, max_age, last_modified)
+        if self.data_age is not None:
+            headers['X-Data-Age'] = str(self.data_age)
+        if is_not_modified(request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        return Response(data=data, status=status.HTTP_200_OK, headers=headers)
+
+    @staticmethod
+    def get_current_weather(data: dict) -> dict:
+        """
+        Picks the current weather out of the Open-Meteo payload.
+
+        Args:
+            data (dict): Open-Meteo payload.
+
+        Returns:
+            dict: Temperature and local time.
+        """
+        return {
+            'temperature': data['current_weather']['temperature'],
+            'local_time': data['current_weather']['time'][-5:],
+        }
+
+    @staticmethod
+    def get_daily_forecast(data: dict, date):
+        """
+        Picks the forecast for the date out of the Open-Meteo payload.
+
+        Args:
+            data (dict): Open-Meteo payload.
+            date (date): Date of the forecast.
+
+        Returns:
+            dict | None: Minimal and maximal temperature or None if the date
+            is out of the forecast window.
+        """
+        daily = data['daily']
+        try:
+            index = daily['time'].index(date.isoformat())
+        except ValueError:
+            return None
+
+        return {
+            'min_temperature': daily['temperature_2m_min'][index],
+            'max_temperature': daily['temperature_2m_max'][index],
+        }
+
+    @staticmethod
+    def get_daily_forecasts(
+        data: dict,
+        date_from,
+        date_to,
+        fields: tuple = consts.DAILY_DEFAULT_FIELDS,
+    ) -> dict:
+        """
+        Picks forecasts for the date range out of the Open-Meteo payload.
+
+        Args:
+            data (dict): Open-Meteo payload.
+            date_from (date): First date of the range.
+            date_to (date): Last date of the range.
+            fields (tuple): Fields of ``consts.DAILY_FIELDS`` to pick.
+
+        Returns:
+            dict: Values of the fields by dates, dates out of the forecast
+            window are missing.
+        """
+        daily = data['daily']
+        first = date_from.isoformat()
+        last = date_to.isoformat()
+        columns = [daily[consts.DAILY_FIELDS[field]] for field in fields]
+        return {
+            day: values
+            for day, *values in zip(daily['time'], *columns)
+            if first <= day <= last
+        }
+
+    @staticmethod
+    def get_hourly_forecast(
+        data: dict, date_from, date_to, fields: tuple
+    ) -> Optional[dict]:
+        """
+        Picks the hourly forecast for the date range as parallel arrays.
+
+        Hours of the payload are sorted, so the range is cut out of every
+        series with one slice.
+
+        Args:
+            data (dict): Open-Meteo payload.
+            date_from (date): First date of the range.
+            date_to (date): Last date of the range.
+            fields (tuple): Fields of ``consts.HOURLY_FIELDS`` to pick.
+
+        Returns:
+            dict | None: Local times and values of the fields or None if the
+            range is out of the forecast window.
+        """
+        hourly = data['hourly']
+        times = hourly['time']
+        start = bisect.bisect_left(times, date_from.isoformat())
+        end = bisect.bisect_left(
+            times, (date_to + timedelta(1)).isoformat(), start
+        )
+        if start == end:
+            return None
+
+        forecast = {
+            'time': [
+                f'{hour[8:10]}.{hour[5:7]}.{hour[:4]} {hour[11:16]}'
+                for hour in times[start:end]
+            ]
+        }
+        for field in fields:
+            forecast[field] = hourly[consts.HOURLY_FIELDS[field]][start:end]
+        return forecast
+
+
+class LeanReadMixin:
+    """
+    Mixin answering read requests without DRF per-request machinery.
+
+    While ``API_LEAN_READS`` is on, GET requests skip authentication (the
+    endpoints are public) and DRF content negotiation and are rendered by
+    ``MessagePackRenderer`` if the client accepts it or ``LeanJSONRenderer``
+    otherwise. Other methods are processed as usual.
+    """
 
+    lean_methods = ('GET', 'HEAD')
 
-class CurrentWeatherView(BaseWeatherMixin, APIView):
+    def is_lean(self) -> bool:
+        return (
+            settings.API_LEAN_READS
+            and self.request.method in self.lean_methods
+        )
+
+    def get_authenticators(self):
+        if self.is_lean():
+            return ()
+        return super().get_authenticators()
+
+    def perform_content_negotiation(self, request, force=False):
+        if self.is_lean():
+            renderer = select_lean_renderer(request)
+            return renderer, renderer.media_type
+        return super().perform_content_negotiation(request, force)
+
+
+class CurrentWeatherView(LeanReadMixin, BaseWeatherMixin, APIView):
     """View for precessing requests for current weather."""
 
     def get(self, request):
@@ -124,70 +590,521 @@ class CurrentWeatherView(BaseWeatherMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        data, error_response = self.get_validated_forecast(city, 1, True)
+        data, error_response = self.get_validated_forecast(city)
 
         if error_response:
             return error_response
 
-        temperature = data['current_weather']['temperature']
-        time = data['current_weather']['time'][-5:]
-
-        return Response(
-            data={
-                'temperature': temperature,
-                'local_time': time,
-            },
-            status=status.HTTP_200_OK,
+        return self.cached_response(
+            request,
+            self.get_current_weather(data),
+            forecast_cache.get_timeout(),
         )
 
 
-class ForecastWeatherView(BaseWeatherMixin, APIView):
+class ForecastWeatherView(LeanReadMixin, BaseWeatherMixin, APIView):
     """View for precessing requests for forecast weather."""
 
     def get(self, request):
-        city = request.query_params.get('city')
-        date = request.query_params.get('date')
+        with timed('validate'):
+            city, date = parse_forecast_query(request.query_params)
 
-        serializer = ForecastQueryParamsSerializer(
-            data={'city': city, 'date': date}
-        )
-        serializer.is_valid(raise_exception=True)
+        override = self.get_override(city, date)
+        if override is not None:
+            updated_at = override.pop('updated_at')
+            return self.cached_response(
+                request,
+                override,
+                get_override_max_age(updated_at),
+                updated_at,
+            )
+
+        data, error_response = self.get_validated_forecast(city)
+
+        if error_response:
+            return error_response
+
+        forecast = self.get_daily_forecast(data, date)
+        if forecast is None:
+            return Response(
+                {'message': 'Forecast for this date is not available.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-        forecast_response = Forecast.objects.filter(
-            city=city, date=datetime.strptime(date, consts.DATE_FORMAT)
+        return self.cached_response(
+            request, forecast, forecast_cache.get_timeout()
         )
 
-        if forecast_response.exists():
+    def post(self, request):
+        serializer = ForecastWriteSerializer(data=request.data)
+        with timed('validate'):
+            serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        if not serializer.context.get('created'):
+            return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ForecastRangeView(LeanReadMixin, BaseWeatherMixin, APIView):
+    """
+    View for precessing requests for forecast of a range of dates.
+
+    Query params: city, date_from and date_to (dd.mm.yyyy, the whole
+    forecast window by default), layout: ``rows`` (list of days) or
+    ``columns`` (parallel arrays) and fields: comma-separated fields of
+    ``consts.DAILY_FIELDS`` (temperatures by default). Overrides of the
+    range are read with one query and replace forecasted temperatures, the
+    rest comes from one Open-Meteo payload of exactly the requested
+    variables, which is not fetched at all if every day has an override of
+    all requested fields.
+    """
+
+    def get(self, request):
+        with timed('validate'):
+            city, date_from, date_to, layout, fields = parse_range_query(
+                request.query_params
+            )
+
+        overrides = {}
+        if not set(fields).isdisjoint(consts.OVERRIDE_FIELDS):
+            overrides = self.get_overrides(city, date_from, date_to)
+        days = (date_to - date_from).days + 1
+        forecasts = {}
+        if len(overrides) < days or not set(fields).issubset(
+            consts.OVERRIDE_FIELDS
+        ):
+            data, error_response = self.get_validated_forecast(
+                city, self.get_variables(daily=fields)
+            )
+            if error_response:
+                return error_response
+            forecasts = self.get_daily_forecasts(
+                data, date_from, date_to, fields
+            )
+
+        rows = []
+        for offset in range(days):
+            day = date_from + timedelta(offset)
+            override = overrides.get(day)
+            forecast = forecasts.get(day.isoformat())
+            if override is None and forecast is None:
+                continue
+            row = dict(zip(fields, forecast or (None,) * len(fields)))
+            if override is None:
+                row['source'] = 'forecast'
+            else:
+                for field, value in zip(consts.OVERRIDE_FIELDS, override):
+                    if field in row:
+                        row[field] = value
+                row['source'] = 'override'
+            rows.append((day, row))
+
+        if not rows:
             return Response(
-                data=ForecastReadSerializer(forecast_response.first()).data,
-                status=status.HTTP_200_OK,
+                {'message': 'Forecast for these dates is not available.'},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
-        diff = (serializer.validated_data['date'] - timezone.now().date()).days
-        data, error_response = self.get_validated_forecast(
-            city, consts.REQUIRED_FORECAST_DAYS
+        max_ages = []
+        last_modified = None
+        if forecasts:
+            max_ages.append(forecast_cache.get_timeout())
+        if overrides:
+            last_modified = max(override[2] for override in overrides.values())
+            max_ages.append(get_override_max_age(last_modified))
+
+        return self.cached_response(
+            request,
+            self.format_days(rows, layout, fields),
+            min(max_ages),
+            None if forecasts else last_modified,
         )
 
+    @staticmethod
+    def format_days(rows: list, layout: str, fields: tuple) -> dict:
+        """
+        Lays days of the range out as a list of objects or parallel arrays.
+
+        Args:
+            rows (list): Date and values of the fields with the source of
+                every day.
+            layout (str): ``rows`` or ``columns``.
+            fields (tuple): Requested fields.
+
+        Returns:
+            dict: Payload of the response.
+        """
+        if layout == 'columns':
+            payload = {
+                'date': [day.strftime(consts.DATE_FORMAT) for day, _ in rows]
+            }
+            for name in fields + ('source',):
+                payload[name] = [row[name] for _, row in rows]
+            return payload
+
+        return {
+            'days': [
+                {'date': day.strftime(consts.DATE_FORMAT), **row}
+                for day, row in rows
+            ]
+        }
+
+
+class ForecastHourlyView(LeanReadMixin, BaseWeatherMixin, APIView):
+    """
+    View for precessing requests for hourly forecast of a range of dates.
+
+    Query params: city, date_from and date_to (dd.mm.yyyy, the whole
+    forecast window by default) and fields: comma-separated fields of
+    ``consts.HOURLY_FIELDS`` (temperature by default). Hours are sent as
+    parallel arrays of local times (dd.mm.yyyy hh:mm) and values, so the
+    response does not repeat field names for every hour.
+    """
+
+    def get(self, request):
+        with timed('validate'):
+            city, date_from, date_to, _, fields = parse_range_query(
+                request.query_params,
+                consts.HOURLY_FIELDS,
+                consts.HOURLY_DEFAULT_FIELDS,
+                consts.HOURLY_LAYOUTS,
+            )
+
+        data, error_response = self.get_validated_forecast(
+            city, self.get_variables(hourly=fields)
+        )
         if error_response:
             return error_response
 
-        min_temp = data['daily']['temperature_2m_min'][diff]
-        max_temp = data['daily']['temperature_2m_max'][diff]
+        forecast = self.get_hourly_forecast(data, date_from, date_to, fields)
+        if forecast is None:
+            return Response(
+                {'message': 'Forecast for these dates is not available.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return self.cached_response(
+            request, forecast, forecast_cache.get_timeout()
+        )
+
+
+class ForecastBulkView(APIView):
+    """
+    View for creating and updating many forecast overrides at once.
+
+    Accepts a JSON array or CSV with a header row.
+    """
+
+    parser_classes = (JSONParser, CSVParser)
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'message': 'Expected a list of forecasts.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        report = import_forecasts(request.data)
 
+        if not report['saved'] and report['failed']:
+            return Response(data=report, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(data=report, status=status.HTTP_200_OK)
+
+
+class ForecastExportView(APIView):
+    """
+    View for streaming forecast overrides as NDJSON or CSV.
+
+    Query params: output (ndjson or csv), city_prefix, date_from and
+    date_to (dd.mm.yyyy).
+    """
+
+    content_types = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    renderers = {
+        'ndjson': render_ndjson,
+        'csv': render_csv,
+    }
+
+    def get(self, request):
+        serializer = ExportQueryParamsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        output = params.pop('output')
+
+        response = StreamingHttpResponse(
+            self.renderers[output](iter_forecasts(**params)),
+            content_type=self.content_types[output],
+        )
+        if output == 'csv':
+            response['Content-Disposition'] = (
+                'attachment; filename="forecasts.csv"'
+            )
+        return response
+
+
+class ForecastAccuracyView(APIView):
+    """
+    View for precessing requests for accuracy of forecasts.
+
+    Query params: city (all cities by default), date_from and date_to
+    (dd.mm.yyyy, the last 30 days by default). Archived forecasts are
+    compared with observed temperatures by lead time and manual overrides
+    as a whole, every group gets the number of compared values, mean error
+    (bias), mean absolute error and root mean square error.
+    """
+
+    def get(self, request):
+        with timed('validate'):
+            city, date_from, date_to = parse_accuracy_query(
+                request.query_params
+            )
+
+        cell = None
+        if city is not None:
+            try:
+                latitude, longitude = geocode_cache.get_coordinates(city)
+            except LocationError:
+                return Response(
+                    {'message': 'Location not found.'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            except UpstreamError:
+                return Response(
+                    {'message': 'Weather service is unavailable.'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            city = normalize_city(city)
+            cell, _, _ = geohash.snap(
+                latitude, longitude, settings.FORECAST_GRID_PRECISION
+            )
+
+        with timed('accuracy'):
+            accuracy = get_accuracy(date_from, date_to, city, cell)
         return Response(
-            data={
-                'min_temperature': min_temp,
-                'max_temperature': max_temp,
-            },
-            status=status.HTTP_200_OK,
+            {
+                'date_from': date_from.strftime(consts.DATE_FORMAT),
+                'date_to': date_to.strftime(consts.DATE_FORMAT),
+                **accuracy,
+            }
         )
 
+
+class BatchWeatherView(BaseWeatherMixin, APIView):
+    """
+    View for precessing batch requests for weather in many cities.
+
+    Overrides of all items are read with one query, items of the same
+    location share one forecast and uncached locations are fetched from
+    Open-Meteo with multi-location requests sent concurrently. Errors are
+    reported per item.
+    """
+
     def post(self, request):
-        serializer = ForecastWriteSerializer(data=request.data)
+        serializer = BatchSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
 
-        if not serializer.context.get('created'):
-            return Response(data=serializer.data, status=status.HTTP_200_OK)
+        results = []
+        items = {}
+        for raw_item in serializer.validated_data['items']:
+            item_serializer = BatchItemSerializer(data=raw_item)
+            results.append(
+                {
+                    'city': raw_item.get('city'),
+                    'date': raw_item.get('date'),
+                }
+            )
+            if item_serializer.is_valid():
+                items[len(results) - 1] = item_serializer.validated_data
+            else:
+                self.set_error(
+                    results[-1],
+                    item_serializer.errors,
+                    status.HTTP_400_BAD_REQUEST,
+                )
 
-        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+        items = self.apply_overrides(items, results)
+        locations = self.get_locations(items, results)
+        forecasts = self.get_batch_forecasts(set(locations.values()))
+
+        for index, key in locations.items():
+            data, error = forecasts[key]
+            if error is not None:
+                self.set_error(results[index], *error)
+                continue
+
+            date = items[index].get('date')
+            if date is None:
+                data = self.get_current_weather(data)
+            else:
+                data = self.get_daily_forecast(data, date)
+
+            if data is None:
+                self.set_error(
+                    results[index],
+                    {'message': 'Forecast for this date is not available.'},
+                    status.HTTP_404_NOT_FOUND,
+                )
+            else:
+                results[index]['status'] = status.HTTP_200_OK
+                results[index]['data'] = data
+
+        return Response(data={'results': results}, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def set_error(result: dict, error: dict, status_code: int) -> None:
+        result['status'] = status_code
+        result['error'] = error
+
+    @staticmethod
+    def apply_overrides(items: dict, results: list) -> dict:
+        """
+        Answers dated items that have overrides with a single query.
+
+        Returns:
+            dict: Items left without an answer.
+        """
+        dated = [item for item in items.values() if item.get('date')]
+        if not dated:
+            return items
+
+        overrides = {}
+        rows = (
+            Forecast.objects.filter(
+                city__in={normalize_city(item['city']) for item in dated},
+                date__in={item['date'] for item in dated},
+            )
+            .order_by()
+            .values_list('city', 'date', 'min_temperature', 'max_temperature')
+        )
+        for city, date, min_temperature, max_temperature in rows:
+            overrides[city, date] = {
+                'min_temperature': min_temperature,
+                'max_temperature': max_temperature,
+            }
+
+        pending = {}
+        for index, item in items.items():
+            override = overrides.get(
+                (normalize_city(item['city']), item.get('date'))
+            )
+            if override is None:
+                pending[index] = item
+            else:
+                results[index]['status'] = status.HTTP_200_OK
+                results[index]['data'] = override
+        return pending
+
+    @staticmethod
+    def get_locations(items: dict, results: list) -> dict:
+        """
+        Geocodes every distinct city of the items.
+
+        Returns:
+            dict: Forecast cache keys by indexes of geocoded items.
+        """
+        coordinates = {}
+        for city in {item['city'] for item in items.values()}:
+            try:
+                coordinates[city] = forecast_cache.snap(
+                    *geocode_cache.get_coordinates(city)
+                )
+                popularity.record(city)
+            except LocationError:
+                coordinates[city] = (
+                    {'message': 'Location not found.'},
+                    status.HTTP_404_NOT_FOUND,
+                )
+            except UpstreamError:
+                coordinates[city] = (
+                    {'message': 'Weather service is unavailable.'},
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+
+        locations = {}
+        for index, item in items.items():
+            location = coordinates[item['city']]
+            if isinstance(location[0], dict):
+                BatchWeatherView.set_error(results[index], *location)
+            else:
+                locations[index] = location
+        return locations
+
+    def get_batch_forecasts(self, locations: set) -> dict:
+        """
+        Returns forecasts of the locations from the cache or Open-Meteo.
+
+        Returns:
+            dict: Pairs of forecast data and error by locations.
+        """
+        keys = {
+            location: forecast_cache.make_key(*location)
+            for location in locations
+        }
+        cached = forecast_cache.get_many(list(keys.values()))
+        forecasts = {
+            location: (cached[key], None)
+            for location, key in keys.items()
+            if key in cached
+        }
+
+        missing = [
+            location for location in locations if location not in forecasts
+        ]
+        chunks = [
+            missing[start : start + consts.BATCH_LOCATIONS_PER_REQUEST]
+            for start in range(
+                0, len(missing), consts.BATCH_LOCATIONS_PER_REQUEST
+            )
+        ]
+        if not chunks:
+            return forecasts
+
+        workers = min(consts.BATCH_MAX_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk, chunk_forecasts in zip(
+                chunks, executor.map(self.fetch_chunk, chunks)
+            ):
+                forecasts.update(zip(chunk, chunk_forecasts))
+
+        fetched = {
+            location: data
+            for location, (data, error) in forecasts.items()
+            if error is None and keys[location] not in cached
+        }
+        forecast_cache.set_many(
+            {keys[location]: data for location, data in fetched.items()}
+        )
+        for location, data in fetched.items():
+            forecast_archiver.record(*location, data)
+        return forecasts
+
+    def fetch_chunk(self, chunk: list) -> list:
+        """
+        Fetches forecasts of the locations with one Open-Meteo request.
+
+        Returns:
+            list: Pairs of forecast data and error in order of locations.
+        """
+        try:
+            response = self.get_forecasts(chunk)
+        except UpstreamError:
+            error = (
+                {'message': 'Weather service is unavailable.'},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            return [(None, error)] * len(chunk)
+
+        data, error_response = self.parse_weather_response(response)
+        if error_response is not None:
+            error = (error_response.data, error_response.status_code)
+            return [(None, error)] * len(chunk)
+
+        if isinstance(data, dict):
+            data = [data]
+        return [(payload, None) for payload in data]
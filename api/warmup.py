@@ -0,0 +1,94 @@
+import logging
+import time
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from api import consts
+from api.gazetteer import get_gazetteer
+from api.geocoding import geocode_cache
+from api.renderers import lean_json_renderer, msgpack_renderer
+from api.upstream import nominatim, open_meteo
+from weather.models import Location
+
+logger = logging.getLogger(__name__)
+
+
+def load_urls() -> None:
+    """Imports the URLconf with every view and its dependencies."""
+    get_resolver().url_patterns
+
+
+def render_payload() -> None:
+    """Runs renderers of the lean read path once."""
+    payload = {'min_temperature': 1.5, 'max_temperature': 7.0}
+    lean_json_renderer.render(payload)
+    if msgpack_renderer.available:
+        msgpack_renderer.render(payload)
+
+
+def create_clients() -> None:
+    """Creates connection pools of upstream clients and the geocoder."""
+    open_meteo.session
+    nominatim.session
+    geocode_cache.geolocator
+
+
+def open_gazetteer() -> None:
+    """Maps the offline gazetteer into memory if it is configured."""
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        len(gazetteer)
+
+
+def preload_locations(limit: int = consts.WARMUP_TOP_CITIES) -> int:
+    """
+    Puts coordinates of the most requested cities into the geocode cache.
+
+    Returns:
+        int: Number of preloaded cities.
+    """
+    locations = (
+        Location.objects.filter(
+            hits__gt=0, latitude__isnull=False, longitude__isnull=False
+        )
+        .order_by('-hits')
+        .values_list('query', 'latitude', 'longitude')[:limit]
+    )
+    return geocode_cache.preload(locations)
+
+
+STAGES = (
+    ('urls', load_urls),
+    ('render', render_payload),
+    ('clients', create_clients),
+    ('gazetteer', open_gazetteer),
+    ('locations', preload_locations),
+)
+
+
+def warm_up() -> dict:
+    """
+    Does the work of the first requests before the worker takes traffic.
+
+    Imports every view, builds connection pools and fills in-process caches.
+    Stages that fail are logged and skipped, a cold cache is not a reason
+    to keep the worker down. Database connections are closed at the end,
+    so that they are not shared with processes forked afterwards.
+
+    Returns:
+        dict: Duration of every stage in milliseconds, None for stages that
+        failed.
+    """
+    durations = {}
+    for name, stage in STAGES:
+        started = time.perf_counter()
+        try:
+            stage()
+        except (DatabaseError, OSError, ValueError):
+            logger.exception('Warm-up stage %s failed.', name)
+            durations[name] = None
+            continue
+        durations[name] = round((time.perf_counter() - started) * 1000, 1)
+    connections.close_all()
+    return durations
@@ -0,0 +1,68 @@
+"""
+Compares throughput of the sync views under WSGI (gunicorn) with the async
+views under ASGI (uvicorn) against the local stub upstream.
+
+The forecast cache is disabled, so every request pays an upstream round
+trip of ``--latency`` seconds. Cities are geocoded before the measurement.
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 200 --requests 2000
+"""
+
+import argparse
+import json
+
+from benchmarks.harness import (
+    load,
+    project_database,
+    running,
+    server_command,
+    server_env,
+    stub_upstream,
+)
+
+ENDPOINTS = {
+    'wsgi': '/api/weather/current/',
+    'asgi': '/api/async/weather/current/',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--cities', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--port', type=int, default=8901)
+    parser.add_argument('--stub-port', type=int, default=8900)
+    args = parser.parse_args()
+
+    results = {}
+    with stub_upstream(args.stub_port, args.latency):
+        with project_database(args.stub_port) as db_path:
+            for kind, endpoint in ENDPOINTS.items():
+                command = server_command(
+                    kind, args.port, args.workers, args.threads
+                )
+                env = server_env(args.stub_port, db_path)
+                url = f'http://127.0.0.1:{args.port}{endpoint}'
+
+                def make_request(number, url=url):
+                    city = f'city-{number % args.cities}'
+                    return 'GET', url, {'params': {'city': city}}
+
+                with running(command, args.port, env):
+                    load(make_request, 1, args.cities)
+                    results[kind] = load(
+                        make_request,
+                        args.concurrency,
+                        args.requests,
+                        args.stub_port,
+                    )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
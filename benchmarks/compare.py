@@ -0,0 +1,69 @@
+"""
+Compares two results of ``benchmarks.scenarios`` and fails on regressions.
+
+A scenario regresses if its req/s dropped or its p99 latency grew by more
+than ``--tolerance`` relative to the baseline.
+
+    python -m benchmarks.compare baseline.json results.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list:
+    """
+    Returns one row per scenario present in both results.
+
+    Every row holds the name, req/s and p99 of both runs and whether the
+    scenario regressed.
+    """
+    rows = []
+    for name, new in results['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        slower = new['rps'] < old['rps'] * (1 - tolerance)
+        laggier = new['p99_ms'] > old['p99_ms'] * (1 + tolerance)
+        regressed = slower or laggier
+        rows.append(
+            (
+                name,
+                old['rps'],
+                new['rps'],
+                old['p99_ms'],
+                new['p99_ms'],
+                regressed,
+            )
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('baseline')
+    parser.add_argument('results')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.results, encoding='utf-8') as file:
+        results = json.load(file)
+
+    rows = compare(baseline, results, args.tolerance)
+    print(f'{"scenario":<20} {"rps":>20} {"p99, ms":>22}')
+    for name, old_rps, new_rps, old_p99, new_p99, regressed in rows:
+        mark = '  REGRESSION' if regressed else ''
+        print(
+            f'{name:<20} {old_rps:>8} -> {new_rps:>8} '
+            f'{old_p99:>9} -> {new_p99:>9}{mark}'
+        )
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Compares output formats of the API in payload size and serialization time.
+
+Payloads are shaped like the responses of the endpoints:
+
+    current   GET /api/weather/current/
+    forecast  GET /api/weather/forecast/
+    range     GET /api/weather/forecast/range/ of the whole forecast window
+    hourly    GET /api/weather/forecast/hourly/ with three fields
+    batch     POST /api/weather/batch/ of ``--batch-size`` items
+
+Every payload is serialized by the standard library json (the default DRF
+renderer), orjson (the lean read path) and msgpack, formats whose library
+is not installed are skipped. Sizes are reported as is and compressed with
+gzip and brotli like ``CompressionMiddleware`` does.
+
+    python -m benchmarks.formats --iterations 2000 --output formats.json
+"""
+
+import argparse
+import gzip
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATE_FORMAT = '%d.%m.%Y'
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def measure(func: Callable, iterations: int) -> float:
+    """Returns CPU microseconds per call of ``func``."""
+    for _ in range(min(iterations, 100)):
+        func()
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def get_payloads(batch_size: int) -> dict:
+    days = [date.today() + timedelta(day) for day in range(11)]
+    hours = len(days) * 24
+    forecast = {'min_temperature': 11.1, 'max_temperature': 24.5}
+    return {
+        'current': {'temperature': 20.5, 'local_time': '12:00'},
+        'forecast': forecast,
+        'range': {
+            'days': [
+                {
+                    'date': day.strftime(DATE_FORMAT),
+                    'min_temperature': day.day / 3,
+                    'max_temperature': day.day / 2 + 10,
+                    'source': 'forecast',
+                }
+                for day in days
+            ]
+        },
+        'hourly': {
+            'time': [
+                f'{days[hour // 24].strftime(DATE_FORMAT)} {hour % 24:02d}:00'
+                for hour in range(hours)
+            ],
+            'temperature': [round(hour / 7, 1) for hour in range(hours)],
+            'wind_speed': [round(hour / 11, 1) for hour in range(hours)],
+            'precipitation': [0.0] * hours,
+        },
+        'batch': {
+            'results': [
+                {
+                    'city': f'City {index}',
+                    'date': days[index % len(days)].strftime(DATE_FORMAT),
+                    'status': 200,
+                    'data': forecast,
+                }
+                for index in range(batch_size)
+            ]
+        },
+    }
+
+
+def get_serializers() -> dict:
+    serializers = {
+        'json': lambda data: json.dumps(
+            data, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode(),
+    }
+    if orjson is not None:
+        serializers['orjson'] = orjson.dumps
+    if msgpack is not None:
+        serializers['msgpack'] = lambda data: msgpack.packb(
+            data, use_bin_type=True
+        )
+    return serializers
+
+
+def get_sizes(content: bytes) -> dict:
+    sizes = {
+        'bytes': len(content),
+        'gzip_bytes': len(
+            gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+        ),
+    }
+    if brotli is not None:
+        sizes['brotli_bytes'] = len(
+            brotli.compress(content, quality=BROTLI_QUALITY)
+        )
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        'payload', nargs='*', help='Payloads to run, all by default.'
+    )
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--output', help='File to write the results to.')
+    args = parser.parse_args()
+
+    payloads = get_payloads(args.batch_size)
+    serializers = get_serializers()
+    results = {'iterations': args.iterations, 'payloads': {}}
+    for name in args.payload or payloads:
+        data = payloads[name]
+        results['payloads'][name] = {
+            output: {
+                'serialize_us': round(
+                    measure(lambda: serialize(data), args.iterations), 2
+                ),
+                **get_sizes(serialize(data)),
+            }
+            for output, serialize in serializers.items()
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Helpers to run the project against the local stub upstream and load it.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, round(fraction * (len(values) - 1)))
+    return values[index]
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    import socket
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f'Nothing is listening on port {port}.')
+
+
+def server_env(stub_port: int, db_path: str, **extra) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+            'PYTHONPATH': str(BASE_DIR),
+            'DEBUG': 'False',
+            'BENCHMARK_DB': db_path,
+            'OPEN_METEO_URL': f'http://127.0.0.1:{stub_port}/v1/forecast',
+            'NOMINATIM_DOMAIN': f'127.0.0.1:{stub_port}',
+            'NOMINATIM_SCHEME': 'http',
+            # Load comes from one address and goes to the stub upstream.
+            'RATE_LIMIT_PER_MINUTE': '0',
+            'OPEN_METEO_BUDGET': '0',
+            'NOMINATIM_BUDGET': '0',
+        }
+    )
+    env.update(extra)
+    return env
+
+
+@contextmanager
+def running(command: list, port: int, env: dict):
+    process = subprocess.Popen(
+        command,
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextmanager
+def stub_upstream(
+    port: int,
+    latency: float,
+    error_rate: float = 0.0,
+    jitter: float = 0.0,
+    payload: Optional[str] = None,
+):
+    command = [
+        sys.executable,
+        '-m',
+        'benchmarks.stub_upstream',
+        '--port',
+        str(port),
+        '--latency',
+        str(latency),
+        '--error-rate',
+        str(error_rate),
+        '--jitter',
+        str(jitter),
+    ]
+    if payload:
+        command.extend(('--payload', payload))
+    with running(command, port, dict(os.environ)) as process:
+        yield process
+
+
+@contextmanager
+def project_database(stub_port: int):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'db.sqlite3')
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '-v0'],
+            cwd=BASE_DIR,
+            env=server_env(stub_port, db_path),
+            check=True,
+        )
+        yield db_path
+
+
+def server_command(kind: str, port: int, workers: int, threads: int) -> list:
+    if kind == 'wsgi':
+        return [
+            sys.executable,
+            '-m',
+            'gunicorn',
+            'weather_api.wsgi:application',
+            '--bind',
+            f'127.0.0.1:{port}',
+            '--workers',
+            str(workers),
+            '--threads',
+            str(threads),
+        ]
+    return [
+        sys.executable,
+        '-m',
+        'uvicorn',
+        'weather_api.asgi:application',
+        '--port',
+        str(port),
+        '--workers',
+        str(workers),
+        '--log-level',
+        'warning',
+    ]
+
+
+def upstream_calls(stub_port: int) -> dict:
+    import httpx
+
+    return httpx.get(f'http://127.0.0.1:{stub_port}/stats').json()
+
+
+async def _load(
+    make_request: Callable,
+    concurrency: int,
+    requests: int,
+) -> dict:
+    import httpx
+
+    latencies = []
+    statuses = {}
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+
+        async def worker():
+            for number in counter:
+                method, url, kwargs = make_request(number)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    code = response.status_code
+                except httpx.HTTPError:
+                    code = 'error'
+                latencies.append(time.perf_counter() - started)
+                statuses[code] = statuses.get(code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'statuses': {str(code): count for code, count in statuses.items()},
+    }
+
+
+def load(
+    make_request: Callable,
+    concurrency: int,
+    requests: int,
+    stub_port: Optional[int] = None,
+) -> dict:
+    """
+    Sends ``requests`` requests keeping ``concurrency`` of them in flight.
+
+    ``make_request`` gets the number of the request and returns the method,
+    the URL and keyword arguments of ``httpx.AsyncClient.request``.
+    """
+    before = upstream_calls(stub_port) if stub_port else None
+    result = asyncio.run(_load(make_request, concurrency, requests))
+    if before is not None:
+        after = upstream_calls(stub_port)
+        result['upstream_calls'] = {
+            name: after[name] - before.get(name, 0) for name in after
+        }
+    return result
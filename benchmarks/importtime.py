@@ -0,0 +1,160 @@
+"""
+Measures how long a new worker takes to load the application.
+
+Every run starts a fresh interpreter with ``-X importtime`` that loads
+``weather_api.wsgi`` (settings, apps, middleware) and then resolves an API
+URL, which imports the URLconf with every view like the first request does.
+Reported are the median wall time of both steps, which of the packages
+that should stay off the startup path were imported by each step and the
+modules with the longest own import time. Modules imported by Django
+through ``importlib`` (installed apps) have no line of their own in the
+``-X importtime`` output, so packages are checked in ``sys.modules``.
+Results of earlier runs can be passed as ``--baseline`` to fail on
+regressions, so the startup time can be tracked in CI:
+
+    python -m benchmarks.importtime --runs 10 --output importtime.json
+    python -m benchmarks.importtime --baseline importtime.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PACKAGES = (
+    'environs',
+    'geopy',
+    'requests',
+    'httpx',
+    'rest_framework',
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+)
+
+CODE = f'''
+import json, sys, time
+packages = {PACKAGES!r}
+started = time.perf_counter()
+import weather_api.wsgi
+loaded = time.perf_counter()
+on_load = [package for package in packages if package in sys.modules]
+from django.urls import resolve
+resolve('/api/weather/current/')
+resolved = time.perf_counter()
+on_resolve = [
+    package
+    for package in packages
+    if package in sys.modules and package not in on_load
+]
+print(json.dumps([
+    (loaded - started) * 1000, (resolved - loaded) * 1000, on_load, on_resolve
+]))
+'''
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+\d+ \| \s*(\S+)')
+
+
+def run_once(env: dict) -> dict:
+    """Loads the application in a new interpreter and parses its output."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    load_ms, resolve_ms, on_load, on_resolve = json.loads(process.stdout)
+
+    modules = {}
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match is not None:
+            modules[match.group(2)] = int(match.group(1))
+    return {
+        'load_ms': load_ms,
+        'resolve_ms': resolve_ms,
+        'on_load': on_load,
+        'on_resolve': on_resolve,
+        'modules': modules,
+    }
+
+
+def measure(runs: int, env: dict) -> dict:
+    results = [run_once(env) for _ in range(runs)]
+    last = results[-1]
+    slowest = sorted(
+        last['modules'].items(), key=lambda item: item[1], reverse=True
+    )
+    return {
+        'runs': runs,
+        'load_ms': round(statistics.median(r['load_ms'] for r in results), 1),
+        'resolve_ms': round(
+            statistics.median(r['resolve_ms'] for r in results), 1
+        ),
+        'imported_on_load': last['on_load'],
+        'imported_on_resolve': last['on_resolve'],
+        'slowest_self_ms': {
+            module: round(microseconds / 1000, 1)
+            for module, microseconds in slowest[:15]
+        },
+    }
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list:
+    """Returns names of the steps that got slower by more than tolerance."""
+    return [
+        step
+        for step in ('load_ms', 'resolve_ms')
+        if results[step] > baseline[step] * (1 + tolerance)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument(
+        '--api-only',
+        action='store_true',
+        help='Load the application with API_ONLY turned on.',
+    )
+    parser.add_argument('--output', help='File to write the results to.')
+    parser.add_argument('--baseline', help='Results to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='weather_api.settings',
+        DEBUG=os.environ.get('DEBUG', 'False'),
+        API_ONLY=str(args.api_only),
+        WARMUP_ON_START='False',
+    )
+    results = measure(args.runs, env)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressed = compare(baseline, results, args.tolerance)
+        for step in regressed:
+            print(
+                f'REGRESSION {step}: {baseline[step]} -> {results[step]}',
+                file=sys.stderr,
+            )
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Micro-benchmarks of the read path measuring CPU time per request.
+
+Every case runs in this process against a temporary SQLite database and a
+local memory cache, with the forecast and coordinates already cached, so
+only the work of the API itself is measured:
+
+    validate    query params by the serializer and by the lean validator
+    render      a forecast by the default and by the lean JSON renderer
+    rate_limit  a request by DRF SimpleRateThrottle and by the token bucket
+    current     GET /api/weather/current/ with API_LEAN_READS off and on
+    forecast    GET /api/weather/forecast/ answered from the cached forecast
+    override    GET /api/weather/forecast/ answered by an override
+
+    python -m benchmarks.micro --iterations 20000 --output micro.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+DATE_FORMAT = '%d.%m.%Y'
+
+
+def measure(func: Callable, iterations: int) -> float:
+    """Returns CPU microseconds per call of ``func``."""
+    for _ in range(min(iterations, 100)):
+        func()
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def get_payload(latitude: float, longitude: float) -> dict:
+    days = [date.today() + timedelta(day) for day in range(11)]
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'current_weather': {
+            'temperature': 20.5,
+            'time': f'{date.today().isoformat()}T12:00',
+        },
+        'daily': {
+            'time': [day.isoformat() for day in days],
+            'temperature_2m_min': [float(day.day) for day in days],
+            'temperature_2m_max': [float(day.day + 10) for day in days],
+        },
+    }
+
+
+def setup_project(directory: str) -> None:
+    os.environ.update(
+        {
+            'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+            'DEBUG': 'False',
+            'RATE_LIMIT_PER_MINUTE': '0',
+            'BENCHMARK_DB': os.path.join(directory, 'db.sqlite3'),
+            'BENCHMARK_CACHE_BACKEND': (
+                'django.core.cache.backends.locmem.LocMemCache'
+            ),
+        }
+    )
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+    from api.forecast_cache import forecast_cache
+    from weather.models import Forecast, Location
+
+    Location.objects.create(query='paris', latitude=48.85, longitude=2.35)
+    Forecast.objects.create(
+        city='paris',
+        date=date.today() + timedelta(1),
+        min_temperature=1.5,
+        max_temperature=7.0,
+    )
+    latitude, longitude = forecast_cache.snap(48.85, 2.35)
+    forecast_cache.set(
+        latitude, longitude, get_payload(latitude, longitude), 3600
+    )
+
+
+def get_cases() -> dict:
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from api.ratelimit import TokenBucket, get_client_id
+    from api.renderers import LeanJSONRenderer, TimedJSONRenderer
+    from api.serializers import ForecastQueryParamsSerializer
+    from api.validators import parse_forecast_query
+    from api.views import CurrentWeatherView, ForecastWeatherView
+
+    factory = RequestFactory()
+    params = {
+        'city': 'Paris',
+        'date': (date.today() + timedelta(2)).strftime(DATE_FORMAT),
+    }
+    override_params = dict(
+        params, date=(date.today() + timedelta(1)).strftime(DATE_FORMAT)
+    )
+    query_params = Request(factory.get('/', params)).query_params
+    forecast = {'min_temperature': 1.5, 'max_temperature': 7.0}
+
+    def validate_serializer():
+        serializer = ForecastQueryParamsSerializer(
+            data={
+                'city': query_params.get('city'),
+                'date': query_params.get('date'),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+    def get_view(view_class, path: str, query: dict):
+        view = view_class.as_view()
+
+        def call():
+            response = view(factory.get(path, query))
+            response.render()
+            assert response.status_code == 200, response.content
+
+        return call
+
+    class HistoryThrottle(SimpleRateThrottle):
+        rate = '1000/min'
+
+        def get_cache_key(self, request, view):
+            return 'micro'
+
+    bucket = TokenBucket('micro', 1000, 1000)
+    request = factory.get('/')
+
+    default_renderer = TimedJSONRenderer()
+    lean_renderer = LeanJSONRenderer()
+    cases = {
+        'validate': (
+            validate_serializer,
+            lambda: parse_forecast_query(query_params),
+        ),
+        'render': (
+            lambda: default_renderer.render(forecast),
+            lambda: lean_renderer.render(forecast),
+        ),
+        'rate_limit': (
+            lambda: HistoryThrottle().allow_request(request, None),
+            lambda: bucket.acquire(get_client_id(request)),
+        ),
+    }
+    for name, view_class, path, query in (
+        ('current', CurrentWeatherView, '/api/weather/current/', params),
+        ('forecast', ForecastWeatherView, '/api/weather/forecast/', params),
+        (
+            'override',
+            ForecastWeatherView,
+            '/api/weather/forecast/',
+            override_params,
+        ),
+    ):
+        call = get_view(view_class, path, query)
+        cases[name] = (call, call)
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        'case', nargs='*', help='Cases to run, all by default.'
+    )
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--output', help='File to write the results to.')
+    args = parser.parse_args()
+
+    results = {'iterations': args.iterations, 'cases': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        setup_project(directory)
+        from django.test import override_settings
+
+        cases = get_cases()
+        for name in args.case or cases:
+            before, after = cases[name]
+            with override_settings(API_LEAN_READS=False):
+                before_us = measure(before, args.iterations)
+            with override_settings(API_LEAN_READS=True):
+                after_us = measure(after, args.iterations)
+            results['cases'][name] = {
+                'before_us': round(before_us, 2),
+                'after_us': round(after_us, 2),
+                'speedup': round(before_us / after_us, 2),
+            }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
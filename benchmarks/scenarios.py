@@ -0,0 +1,229 @@
+"""
+End-to-end scenarios of the weather API against the local stub upstream.
+
+Every scenario runs ``--requests`` requests at fixed ``--concurrency`` and
+reports req/s, p50/p95/p99 latency, response statuses and calls to the
+stub upstream as JSON:
+
+    current            GET /api/weather/current/
+    forecast_override  GET /api/weather/forecast/ answered by overrides
+    forecast_miss      GET /api/weather/forecast/ answered by Open-Meteo
+    forecast_post      POST /api/weather/forecast/
+
+The forecast cache is disabled unless ``--cache locmem`` is passed, so
+upstream scenarios pay a round trip of ``--latency`` seconds per request.
+
+    python -m benchmarks.scenarios --concurrency 50 --requests 2000 \\
+        --output results.json
+"""
+
+import argparse
+import json
+from datetime import date, timedelta
+
+from benchmarks.harness import (
+    load,
+    project_database,
+    running,
+    server_command,
+    server_env,
+    stub_upstream,
+)
+
+DATE_FORMAT = '%d.%m.%Y'
+
+CACHE_BACKENDS = {
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def get_date(days: int) -> str:
+    return (date.today() + timedelta(days)).strftime(DATE_FORMAT)
+
+
+class Scenario:
+    """
+    Requests of one benchmark scenario.
+
+    ``prepare`` runs once before the measurement, ``make_request`` returns
+    the method, URL and keyword arguments of the request with the number.
+    """
+
+    method = 'GET'
+    path = ''
+    async_path = None
+
+    def __init__(self, base_url: str, cities: int, use_async: bool):
+        self.base_url = base_url
+        self.cities = cities
+        self.url = base_url + (
+            self.async_path if use_async and self.async_path else self.path
+        )
+
+    def prepare(self) -> None:
+        pass
+
+    def make_request(self, number: int):
+        return self.method, self.url, {'params': self.get_params(number)}
+
+    def get_params(self, number: int) -> dict:
+        raise NotImplementedError
+
+    def warm_geocoding(self) -> None:
+        # One by one, so that concurrent first lookups do not lock SQLite.
+        load(self.make_request, 1, self.cities)
+
+
+class CurrentScenario(Scenario):
+    path = '/api/weather/current/'
+    async_path = '/api/async/weather/current/'
+
+    def prepare(self) -> None:
+        self.warm_geocoding()
+
+    def get_params(self, number: int) -> dict:
+        return {'city': f'city-{number % self.cities}'}
+
+
+class ForecastMissScenario(Scenario):
+    path = '/api/weather/forecast/'
+    async_path = '/api/async/weather/forecast/'
+
+    def prepare(self) -> None:
+        self.warm_geocoding()
+
+    def get_params(self, number: int) -> dict:
+        return {'city': f'city-{number % self.cities}', 'date': get_date(1)}
+
+
+class ForecastOverrideScenario(Scenario):
+    path = '/api/weather/forecast/'
+    async_path = '/api/async/weather/forecast/'
+
+    def prepare(self) -> None:
+        import httpx
+
+        overrides = [
+            {
+                'city': f'override-city-{number}',
+                'date': get_date(1),
+                'min_temperature': 1,
+                'max_temperature': 2,
+            }
+            for number in range(self.cities)
+        ]
+        httpx.post(
+            self.base_url + '/api/weather/forecast/bulk/',
+            json=overrides,
+            timeout=60,
+        ).raise_for_status()
+
+    def get_params(self, number: int) -> dict:
+        return {
+            'city': f'override-city-{number % self.cities}',
+            'date': get_date(1),
+        }
+
+
+class ForecastPostScenario(Scenario):
+    method = 'POST'
+    path = '/api/weather/forecast/'
+
+    def make_request(self, number: int):
+        return (
+            self.method,
+            self.url,
+            {
+                'json': {
+                    'city': f'post-city-{number % self.cities}',
+                    'date': get_date(number % 10),
+                    'min_temperature': number % 10,
+                    'max_temperature': number % 10 + 5,
+                }
+            },
+        )
+
+
+SCENARIOS = {
+    'current': CurrentScenario,
+    'forecast_override': ForecastOverrideScenario,
+    'forecast_miss': ForecastMissScenario,
+    'forecast_post': ForecastPostScenario,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--scenario',
+        action='append',
+        choices=SCENARIOS,
+        help='Scenario to run, may be repeated. All by default.',
+    )
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--cache', choices=CACHE_BACKENDS, default='dummy')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--cities', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--payload', help='JSON file with a forecast.')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--port', type=int, default=8901)
+    parser.add_argument('--stub-port', type=int, default=8900)
+    parser.add_argument('--output', help='File to write the results to.')
+    args = parser.parse_args()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    command = server_command(
+        args.server, args.port, args.workers, args.threads
+    )
+    results = {
+        'config': {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ('output', 'port', 'stub_port')
+        },
+        'scenarios': {},
+    }
+
+    with stub_upstream(
+        args.stub_port,
+        args.latency,
+        args.error_rate,
+        args.jitter,
+        args.payload,
+    ):
+        for name in args.scenario or SCENARIOS:
+            with project_database(args.stub_port) as db_path:
+                env = server_env(
+                    args.stub_port,
+                    db_path,
+                    BENCHMARK_CACHE_BACKEND=CACHE_BACKENDS[args.cache],
+                )
+                with running(command, args.port, env):
+                    scenario = SCENARIOS[name](
+                        base_url, args.cities, args.server == 'asgi'
+                    )
+                    scenario.prepare()
+                    results['scenarios'][name] = load(
+                        scenario.make_request,
+                        args.concurrency,
+                        args.requests,
+                        args.stub_port,
+                    )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
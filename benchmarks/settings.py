@@ -0,0 +1,29 @@
+"""
+Settings of the project under benchmark.
+
+Upstream URLs and the database are taken from the environment (see
+``.env_example``), so the servers started by the benchmark talk to the local
+stub upstream. SQLite databases are placed in ``BENCHMARK_DB``.
+"""
+
+import os
+
+from weather_api.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+if 'sqlite' in DATABASES['default']['ENGINE']:  # noqa: F405
+    DATABASES['default']['NAME'] = os.environ.get(  # noqa: F405
+        'BENCHMARK_DB', 'benchmark.sqlite3'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'BENCHMARK_CACHE_BACKEND',
+            'django.core.cache.backends.dummy.DummyCache',
+        ),
+    }
+}
@@ -0,0 +1,190 @@
+"""
+Local stand-in for Open-Meteo and Nominatim.
+
+Answers ``/v1/forecast`` like Open-Meteo and ``/search`` like Nominatim
+after a configurable delay. Every city name is geocoded to its own
+coordinates, so distinct cities never share a cached forecast. Forecasts
+are generated, or copied from ``--payload`` with coordinates of the
+request, and fail with 503 at ``--error-rate``.
+
+    python -m benchmarks.stub_upstream --port 8900 --latency 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def city_coordinates(city: str):
+    digest = hashlib.sha1(city.casefold().encode()).digest()
+    latitude = int.from_bytes(digest[:4], 'big') / 2**32 * 140 - 70
+    longitude = int.from_bytes(digest[4:8], 'big') / 2**32 * 360 - 180
+    return round(latitude, 4), round(longitude, 4)
+
+
+def forecast_payload(params: dict, template: Optional[dict] = None):
+    latitudes = params.get('latitude', ['0'])[0].split(',')
+    longitudes = params.get('longitude', ['0'])[0].split(',')
+    days = int(params.get('forecast_days', ['11'])[0])
+    payloads = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        if template is None:
+            payload = location_payload(float(latitude), float(longitude), days)
+        else:
+            payload = dict(template, latitude=float(latitude))
+            payload['longitude'] = float(longitude)
+        payloads.append(payload)
+    if len(payloads) == 1:
+        return payloads[0]
+    return payloads
+
+
+def location_payload(latitude: float, longitude: float, days: int) -> dict:
+    today = date.today()
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'timezone': 'GMT',
+        'current_weather': {
+            'time': f'{today.isoformat()}T12:00',
+            'temperature': 20.0,
+            'windspeed': 3.5,
+        },
+        'daily': {
+            'time': [(today + timedelta(i)).isoformat() for i in range(days)],
+            'temperature_2m_min': [10.0 + i for i in range(days)],
+            'temperature_2m_max': [20.0 + i for i in range(days)],
+        },
+    }
+
+
+class StubState:
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float,
+        jitter: float = 0.0,
+        payload: Optional[dict] = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.payload = payload
+        self.calls = {'forecast': 0, 'search': 0}
+        self.lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.calls[name] += 1
+
+    def wait(self) -> None:
+        time.sleep(max(0.0, self.latency + random.uniform(0, self.jitter)))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state: StubState
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == '/stats':
+            return self.reply(200, self.state.calls)
+
+        if url.path == '/search':
+            self.state.count('search')
+            self.state.wait()
+            latitude, longitude = city_coordinates(params['q'][0])
+            return self.reply(
+                200,
+                [
+                    {
+                        'place_id': 1,
+                        'lat': str(latitude),
+                        'lon': str(longitude),
+                        'display_name': params['q'][0],
+                        'boundingbox': [0, 0, 0, 0],
+                    }
+                ],
+            )
+
+        if url.path == '/v1/forecast':
+            self.state.count('forecast')
+            self.state.wait()
+            if random.random() < self.state.error_rate:
+                return self.reply(
+                    503, {'error': True, 'reason': 'Stub failure'}
+                )
+            return self.reply(
+                200, forecast_payload(params, self.state.payload)
+            )
+
+        self.reply(404, {'error': True, 'reason': 'Not found'})
+
+    def reply(self, code: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def make_server(
+    port: int,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    jitter: float = 0.0,
+    payload: Optional[dict] = None,
+) -> StubServer:
+    state = StubState(latency, error_rate, jitter, payload)
+    handler = type('Handler', (StubHandler,), {'state': state})
+    return StubServer(('127.0.0.1', port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0.0,
+        help='Random extra latency up to this many seconds.',
+    )
+    parser.add_argument(
+        '--payload',
+        help='JSON file to answer forecast requests with.',
+    )
+    args = parser.parse_args()
+
+    payload = None
+    if args.payload:
+        with open(args.payload, encoding='utf-8') as file:
+            payload = json.load(file)
+
+    make_server(
+        args.port, args.latency, args.error_rate, args.jitter, payload
+    ).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from pathlib import Path
 
 from environs import Env
 
+ENV_FILE = Path(__file__).resolve().parent / '.env'
+
 
 @dataclass
 class DjangoSetting:
@@ -9,6 +12,108 @@ class DjangoSetting:
 
     secret_key: str
     debug: bool
+    api_only: bool
+
+
+@dataclass
+class DatabaseSetting:
+    """Database configuration data"""
+
+    engine: str
+    name: str
+    user: str
+    password: str
+    host: str
+    port: str
+    conn_max_age: int
+    conn_health_checks: bool
+    replicas: list
+
+
+@dataclass
+class ApiSetting:
+    """API request processing configuration data"""
+
+    lean_reads: bool
+    compression_min_size: int
+    warmup_on_start: bool
+
+
+@dataclass
+class RateLimitSetting:
+    """Client rate limit configuration data"""
+
+    per_minute: int
+    burst: int
+    key_header: str
+    num_proxies: int
+
+
+@dataclass
+class CacheSetting:
+    """Cache configuration data"""
+
+    backend: str
+    location: str
+    stale_while_revalidate: int
+    stale_if_error: int
+    grid_precision: int
+    invalidation_log: str
+    max_entries: int
+
+
+@dataclass
+class SingleFlightSetting:
+    """Request coalescing configuration data"""
+
+    lease: str
+    lease_timeout: int
+    lock_dir: str
+
+
+@dataclass
+class GeocoderSetting:
+    """Offline geocoder configuration data"""
+
+    gazetteer: str
+
+
+@dataclass
+class UpstreamSetting:
+    """Upstream HTTP client configuration data"""
+
+    open_meteo_url: str
+    nominatim_domain: str
+    nominatim_scheme: str
+    connect_timeout: float
+    read_timeout: float
+    retries: int
+    backoff_factor: float
+    pool_size: int
+    async_pool_size: int
+    breaker_threshold: int
+    breaker_reset_timeout: float
+    open_meteo_budget: int
+    nominatim_budget: int
+
+
+@dataclass
+class PrefetchSetting:
+    """Background prefetch configuration data"""
+
+    in_process: bool
+    top_cities: int
+    lead: int
+    interval: float
+    open_meteo_rate: int
+
+
+@dataclass
+class ArchiveSetting:
+    """Forecast archive configuration data"""
+
+    enabled: bool
+    flush_interval: float
 
 
 @dataclass
@@ -16,17 +121,107 @@ class Config:
     """Project configration data."""
 
     django_settings: DjangoSetting
+    database_settings: DatabaseSetting
+    api_settings: ApiSetting
+    rate_limit_settings: RateLimitSetting
+    cache_settings: CacheSetting
+    singleflight_settings: SingleFlightSetting
+    geocoder_settings: GeocoderSetting
+    upstream_settings: UpstreamSetting
+    prefetch_settings: PrefetchSetting
+    archive_settings: ArchiveSetting
 
 
 def load_config() -> Config:
     """Load environment variables from .env file."""
 
     env = Env()
-    env.read_env()
+    # The file of the project is read directly, without looking it up
+    # from the calling frame through parent directories.
+    env.read_env(ENV_FILE, recurse=False)
     return Config(
         DjangoSetting(
             secret_key=env.str('SECRET_KEY', 'SECRET_KEY'),
             debug=env.bool('DEBUG'),
+            api_only=env.bool('API_ONLY', False),
+        ),
+        DatabaseSetting(
+            engine=env.str('DB_ENGINE', 'api.backends.sqlite3'),
+            name=env.str('DB_NAME', ''),
+            user=env.str('DB_USER', ''),
+            password=env.str('DB_PASSWORD', ''),
+            host=env.str('DB_HOST', ''),
+            port=env.str('DB_PORT', ''),
+            conn_max_age=env.int('DB_CONN_MAX_AGE', 60),
+            conn_health_checks=env.bool('DB_CONN_HEALTH_CHECKS', True),
+            replicas=env.list('DB_REPLICAS', []),
+        ),
+        ApiSetting(
+            lean_reads=env.bool('API_LEAN_READS', True),
+            compression_min_size=env.int('COMPRESSION_MIN_SIZE', 1024),
+            warmup_on_start=env.bool('WARMUP_ON_START', False),
+        ),
+        RateLimitSetting(
+            per_minute=env.int('RATE_LIMIT_PER_MINUTE', 600),
+            burst=env.int('RATE_LIMIT_BURST', 60),
+            key_header=env.str('RATE_LIMIT_KEY_HEADER', 'X-API-Key'),
+            num_proxies=env.int('RATE_LIMIT_NUM_PROXIES', 0),
+        ),
+        CacheSetting(
+            backend=env.str(
+                'CACHE_BACKEND',
+                'django.core.cache.backends.locmem.LocMemCache',
+            ),
+            location=env.str('CACHE_LOCATION', ''),
+            stale_while_revalidate=env.int(
+                'FORECAST_STALE_WHILE_REVALIDATE', 600
+            ),
+            stale_if_error=env.int('FORECAST_STALE_IF_ERROR', 6 * 60 * 60),
+            grid_precision=env.int('FORECAST_GRID_PRECISION', 5),
+            invalidation_log=env.str(
+                'CACHE_INVALIDATION_LOG', '/tmp/weather_api/invalidations.log'
+            ),
+            max_entries=env.int('CACHE_MAX_ENTRIES', 0),
+        ),
+        SingleFlightSetting(
+            lease=env.str('SINGLEFLIGHT_LEASE', ''),
+            lease_timeout=env.int('SINGLEFLIGHT_LEASE_TIMEOUT', 15),
+            lock_dir=env.str('SINGLEFLIGHT_LOCK_DIR', '/tmp/weather_api'),
+        ),
+        GeocoderSetting(
+            gazetteer=env.str('GEOCODER_GAZETTEER', ''),
+        ),
+        UpstreamSetting(
+            open_meteo_url=env.str(
+                'OPEN_METEO_URL', 'https://api.open-meteo.com/v1/forecast'
+            ),
+            nominatim_domain=env.str(
+                'NOMINATIM_DOMAIN', 'nominatim.openstreetmap.org'
+            ),
+            nominatim_scheme=env.str('NOMINATIM_SCHEME', 'https'),
+            connect_timeout=env.float('UPSTREAM_CONNECT_TIMEOUT', 3.05),
+            read_timeout=env.float('UPSTREAM_READ_TIMEOUT', 10),
+            retries=env.int('UPSTREAM_RETRIES', 2),
+            backoff_factor=env.float('UPSTREAM_BACKOFF_FACTOR', 0.2),
+            pool_size=env.int('UPSTREAM_POOL_SIZE', 20),
+            async_pool_size=env.int('UPSTREAM_ASYNC_POOL_SIZE', 200),
+            breaker_threshold=env.int('UPSTREAM_BREAKER_THRESHOLD', 5),
+            breaker_reset_timeout=env.float(
+                'UPSTREAM_BREAKER_RESET_TIMEOUT', 30
+            ),
+            open_meteo_budget=env.int('OPEN_METEO_BUDGET', 500),
+            nominatim_budget=env.int('NOMINATIM_BUDGET', 55),
+        ),
+        PrefetchSetting(
+            in_process=env.bool('PREFETCH_IN_PROCESS', False),
+            top_cities=env.int('PREFETCH_TOP_CITIES', 1000),
+            lead=env.int('PREFETCH_LEAD', 300),
+            interval=env.float('PREFETCH_INTERVAL', 30),
+            open_meteo_rate=env.int('PREFETCH_OPEN_METEO_RATE', 500),
+        ),
+        ArchiveSetting(
+            enabled=env.bool('FORECAST_ARCHIVE', True),
+            flush_interval=env.float('FORECAST_ARCHIVE_FLUSH_INTERVAL', 5),
         ),
     )
 
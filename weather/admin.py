@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from weather.models import Forecast
+from weather.models import Forecast, ForecastArchive, Location
 
 admin.site.register(Forecast)
+admin.site.register(Location)
+admin.site.register(ForecastArchive)
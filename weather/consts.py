@@ -1,3 +1,4 @@
 MAX_NAME_LENGTH = 150
+MAX_CELL_LENGTH = 12
 MIN_TEMP = -100
 MAX_TEMP = 100
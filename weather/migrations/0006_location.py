@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_alter_forecast_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'query',
+                    models.CharField(
+                        max_length=150,
+                        unique=True,
+                        verbose_name='normalized name of location',
+                    ),
+                ),
+                (
+                    'latitude',
+                    models.FloatField(
+                        blank=True, null=True, verbose_name='latitude'
+                    ),
+                ),
+                (
+                    'longitude',
+                    models.FloatField(
+                        blank=True, null=True, verbose_name='longitude'
+                    ),
+                ),
+                (
+                    'updated_at',
+                    models.DateTimeField(
+                        auto_now=True, verbose_name='updated at'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'location',
+                'verbose_name_plural': 'locations',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def normalize_cities(apps, schema_editor):
+    """Normalizes city names and drops duplicated forecasts."""
+    Forecast = apps.get_model('weather', 'Forecast')
+
+    cities = Forecast.objects.values_list('city', flat=True).distinct()
+    for city in list(cities.order_by()):
+        normalized = ' '.join(city.split()).casefold()
+        if normalized != city:
+            Forecast.objects.filter(city=city).update(city=normalized)
+
+    duplicates = (
+        Forecast.objects.values('city', 'date')
+        .order_by()
+        .annotate(count=Count('id'), last_id=Max('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Forecast.objects.filter(
+            city=duplicate['city'], date=duplicate['date']
+        ).exclude(id=duplicate['last_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0006_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_cities, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='forecast',
+            constraint=models.UniqueConstraint(
+                fields=('city', 'date'), name='unique_weather_forecast'
+            ),
+        ),
+    ]
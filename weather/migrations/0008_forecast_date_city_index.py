@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0007_forecast_unique_city_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forecast',
+            index=models.Index(
+                fields=['date', 'city'], name='forecast_date_city'
+            ),
+        ),
+    ]
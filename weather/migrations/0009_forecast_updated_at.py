@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0008_forecast_date_city_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecast',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, verbose_name='updated at'
+            ),
+        ),
+    ]
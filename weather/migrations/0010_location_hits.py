@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_forecast_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='hits',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='decaying number of requests'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['-hits'], name='location_hits'),
+        ),
+    ]
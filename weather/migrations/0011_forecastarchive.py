@@ -0,0 +1,112 @@
+# Generated by Django 4.2 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+# Django models cannot declare partitioning, so on PostgreSQL the table is
+# created by hand as partitioned by range of target_date. The primary key
+# of a partitioned table has to include the partition key. Monthly
+# partitions are created by "manage.py archive_partitions", rows outside of
+# them go to the default partition.
+POSTGRESQL_SQL = (
+    'CREATE TABLE "weather_forecastarchive" ('
+    '"id" bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY, '
+    '"cell" varchar(12) NOT NULL, '
+    '"target_date" date NOT NULL, '
+    '"issued_at" timestamp with time zone NOT NULL, '
+    '"lead_days" smallint NOT NULL CHECK ("lead_days" >= 0), '
+    '"min_temperature" double precision NULL, '
+    '"max_temperature" double precision NULL, '
+    'PRIMARY KEY ("id", "target_date")'
+    ') PARTITION BY RANGE ("target_date")',
+    'CREATE TABLE "weather_forecastarchive_default" '
+    'PARTITION OF "weather_forecastarchive" DEFAULT',
+    'CREATE INDEX "archive_date_cell" '
+    'ON "weather_forecastarchive" ("target_date", "cell")',
+)
+
+
+def create_archive(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRESQL_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.create_model(apps.get_model('weather', 'ForecastArchive'))
+
+
+def delete_archive(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('weather', 'ForecastArchive'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0010_location_hits'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ForecastArchive',
+                    fields=[
+                        (
+                            'id',
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name='ID',
+                            ),
+                        ),
+                        (
+                            'cell',
+                            models.CharField(
+                                max_length=12,
+                                verbose_name='geohash of the grid cell',
+                            ),
+                        ),
+                        (
+                            'target_date',
+                            models.DateField(verbose_name='forecasted date'),
+                        ),
+                        (
+                            'issued_at',
+                            models.DateTimeField(verbose_name='fetched at'),
+                        ),
+                        (
+                            'lead_days',
+                            models.PositiveSmallIntegerField(
+                                verbose_name=(
+                                    'days between fetching and the '
+                                    'forecasted date'
+                                )
+                            ),
+                        ),
+                        (
+                            'min_temperature',
+                            models.FloatField(
+                                null=True, verbose_name='minimal temperature'
+                            ),
+                        ),
+                        (
+                            'max_temperature',
+                            models.FloatField(
+                                null=True, verbose_name='maximum temperature'
+                            ),
+                        ),
+                    ],
+                    options={
+                        'verbose_name': 'archived forecast',
+                        'verbose_name_plural': 'archived forecasts',
+                        'indexes': [
+                            models.Index(
+                                fields=['target_date', 'cell'],
+                                name='archive_date_cell',
+                            )
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive, delete_archive),
+    ]
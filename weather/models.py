@@ -1,6 +1,7 @@
 from django.db import models
 
 from weather import consts
+from weather.utils import normalize_city
 from weather.validators import temperature_validators
 
 
@@ -17,11 +18,94 @@ class Forecast(models.Model):
         verbose_name='maximum temperature',
         validators=temperature_validators,
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
 
     class Meta:
         ordering = ('-date',)
         verbose_name = 'city'
         verbose_name_plural = 'cities'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('city', 'date'), name='unique_weather_forecast'
+            ),
+        )
+        indexes = (
+            models.Index(fields=('date', 'city'), name='forecast_date_city'),
+        )
 
     def __str__(self):
         return f'{self.city}|{self.date}'
+
+    def save(self, *args, **kwargs):
+        self.city = normalize_city(self.city)
+        super().save(*args, **kwargs)
+
+
+class Location(models.Model):
+    """Cached result of geocoding a city name."""
+
+    query = models.CharField(
+        max_length=consts.MAX_NAME_LENGTH,
+        unique=True,
+        verbose_name='normalized name of location',
+    )
+    latitude = models.FloatField(
+        null=True, blank=True, verbose_name='latitude'
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, verbose_name='longitude'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+    hits = models.PositiveIntegerField(
+        default=0, verbose_name='decaying number of requests'
+    )
+
+    class Meta:
+        verbose_name = 'location'
+        verbose_name_plural = 'locations'
+        indexes = (models.Index(fields=('-hits',), name='location_hits'),)
+
+    def __str__(self):
+        return self.query
+
+    @property
+    def is_found(self) -> bool:
+        """Whether the geocoder resolved the location."""
+        return self.latitude is not None and self.longitude is not None
+
+
+class ForecastArchive(models.Model):
+    """
+    Daily forecast fetched from Open-Meteo, kept for accuracy analytics.
+
+    Rows are only appended. On PostgreSQL the table is partitioned by month
+    of ``target_date``, see ``api.archive``.
+    """
+
+    cell = models.CharField(
+        max_length=consts.MAX_CELL_LENGTH,
+        verbose_name='geohash of the grid cell',
+    )
+    target_date = models.DateField(verbose_name='forecasted date')
+    issued_at = models.DateTimeField(verbose_name='fetched at')
+    lead_days = models.PositiveSmallIntegerField(
+        verbose_name='days between fetching and the forecasted date'
+    )
+    min_temperature = models.FloatField(
+        null=True, verbose_name='minimal temperature'
+    )
+    max_temperature = models.FloatField(
+        null=True, verbose_name='maximum temperature'
+    )
+
+    class Meta:
+        verbose_name = 'archived forecast'
+        verbose_name_plural = 'archived forecasts'
+        indexes = (
+            models.Index(
+                fields=('target_date', 'cell'), name='archive_date_cell'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.cell}|{self.target_date}|{self.lead_days}'
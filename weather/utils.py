@@ -0,0 +1,11 @@
+def normalize_city(city: str) -> str:
+    """
+    Brings a city name to the form used for storing and lookups.
+
+    Args:
+        city (str): City name as passed by the client.
+
+    Returns:
+        str: City name with collapsed whitespace in case-folded form.
+    """
+    return ' '.join(city.split()).casefold()
@@ -29,10 +29,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'api.apps.ApiConfig',
-    'weather.apps.WeatherConfig'
+    'weather.apps.WeatherConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.TimingMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,8 +44,72 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# API-only deployments leave out the admin with the apps and middleware it
+# needs, the API itself does not use them
+
+API_ONLY = config.django_settings.api_only
+
+ADMIN_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+]
+
+ADMIN_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+if API_ONLY:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_APPS]
+    MIDDLEWARE = [
+        middleware
+        for middleware in MIDDLEWARE
+        if middleware not in ADMIN_MIDDLEWARE
+    ]
+
 ROOT_URLCONF = 'weather_api.urls'
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.TimedJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'api.negotiation.ContentNegotiation',
+    'DEFAULT_THROTTLE_CLASSES': ['api.throttling.ClientRateThrottle'],
+    # Reverse proxies in front of the API, client IP addresses of throttles
+    # are taken from X-Forwarded-For when above 0
+    'NUM_PROXIES': config.rate_limit_settings.num_proxies,
+}
+
+if API_ONLY:
+    # Session authentication needs the session middleware.
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+        'rest_framework.authentication.BasicAuthentication',
+    ]
+
+# Token bucket of every client (API key header or IP address) shared by
+# all workers through the cache, 0 requests per minute to disable
+
+RATE_LIMIT_PER_MINUTE = config.rate_limit_settings.per_minute
+
+RATE_LIMIT_BURST = config.rate_limit_settings.burst
+
+RATE_LIMIT_KEY_HEADER = config.rate_limit_settings.key_header
+
+# GET endpoints skip authentication and content negotiation and are always
+# rendered as JSON, turn off to get the browsable API for them
+API_LEAN_READS = config.api_settings.lean_reads
+
+# Responses of at least this many bytes are compressed with brotli or gzip,
+# 0 to disable
+COMPRESSION_MIN_SIZE = config.api_settings.compression_min_size
+
+# Workers warm caches and connection pools up when they load the application
+WARMUP_ON_START = config.api_settings.warmup_on_start
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -66,13 +132,158 @@ WSGI_APPLICATION = 'weather_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DB_ENGINE is api.backends.sqlite3 (SQLite in WAL mode) by default or
+# django.db.backends.postgresql. Connections are kept for DB_CONN_MAX_AGE
+# seconds and checked before reuse when DB_CONN_HEALTH_CHECKS is on.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': config.database_settings.engine,
+        'NAME': config.database_settings.name or BASE_DIR / 'db.sqlite3',
+        'USER': config.database_settings.user,
+        'PASSWORD': config.database_settings.password,
+        'HOST': config.database_settings.host,
+        'PORT': config.database_settings.port,
+        'CONN_MAX_AGE': config.database_settings.conn_max_age,
+        'CONN_HEALTH_CHECKS': config.database_settings.conn_health_checks,
+    }
+}
+
+# Read replicas of forecast overrides and the forecast archive: hosts of
+# PostgreSQL replicas listed in DB_REPLICAS. SQLite has no replication,
+# nothing would keep copies of the file in sync, so DB_REPLICAS is ignored
+# with SQLite and all reads go to the default database
+
+DATABASE_REPLICAS = []
+if 'sqlite' not in config.database_settings.engine:
+    for number, host in enumerate(config.database_settings.replicas, 1):
+        alias = f'replica_{number}'
+        DATABASES[alias] = dict(
+            DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'}
+        )
+        DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config.cache_settings.backend,
+        'LOCATION': config.cache_settings.location,
     }
 }
 
+# Local memory, file and database caches evict entries beyond MAX_ENTRIES
+# (300 by default), 0 to size them for the prefetched cities: a forecast,
+# overrides of the forecast window and a few variants of every city and room
+# for rate limit buckets
+
+CULLING_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+CACHE_ENTRIES_PER_CITY = 20
+
+CACHE_MAX_ENTRIES = config.cache_settings.max_entries or max(
+    10_000,
+    config.prefetch_settings.top_cities * CACHE_ENTRIES_PER_CITY,
+)
+
+if config.cache_settings.backend in CULLING_CACHE_BACKENDS:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': CACHE_MAX_ENTRIES}
+
+# File broadcasting changes of forecast overrides to the other workers of
+# the host, needed while the cache is local to the process (LocMemCache),
+# empty to disable for shared caches
+
+CACHE_INVALIDATION_LOG = config.cache_settings.invalidation_log
+
+# Seconds after expiry a forecast is served while it is refreshed in the
+# background and when upstream fails
+
+FORECAST_STALE_WHILE_REVALIDATE = config.cache_settings.stale_while_revalidate
+
+FORECAST_STALE_IF_ERROR = config.cache_settings.stale_if_error
+
+# Length of geohashes of the grid cells sharing one forecast: 4 is about
+# 39 x 20 km, 5 is about 5 x 5 km, 6 is about 1.2 x 0.6 km
+
+FORECAST_GRID_PRECISION = config.cache_settings.grid_precision
+
+
+# Request coalescing: '' (threads of one process only), 'cache' or 'file'
+
+SINGLEFLIGHT_LEASE = config.singleflight_settings.lease
+
+SINGLEFLIGHT_LEASE_TIMEOUT = config.singleflight_settings.lease_timeout
+
+SINGLEFLIGHT_LOCK_DIR = config.singleflight_settings.lock_dir
+
+
+# Offline gazetteer consulted before Nominatim, empty to disable
+
+GEOCODER_GAZETTEER = config.geocoder_settings.gazetteer
+
+
+# Upstream HTTP clients (Open-Meteo, Nominatim)
+
+OPEN_METEO_URL = config.upstream_settings.open_meteo_url
+
+NOMINATIM_DOMAIN = config.upstream_settings.nominatim_domain
+
+NOMINATIM_SCHEME = config.upstream_settings.nominatim_scheme
+
+UPSTREAM_CONNECT_TIMEOUT = config.upstream_settings.connect_timeout
+
+UPSTREAM_READ_TIMEOUT = config.upstream_settings.read_timeout
+
+UPSTREAM_RETRIES = config.upstream_settings.retries
+
+UPSTREAM_BACKOFF_FACTOR = config.upstream_settings.backoff_factor
+
+UPSTREAM_POOL_SIZE = config.upstream_settings.pool_size
+
+UPSTREAM_ASYNC_POOL_SIZE = config.upstream_settings.async_pool_size
+
+UPSTREAM_BREAKER_THRESHOLD = config.upstream_settings.breaker_threshold
+
+UPSTREAM_BREAKER_RESET_TIMEOUT = config.upstream_settings.breaker_reset_timeout
+
+# Calls per minute of all workers to upstream services, calls over the
+# budget are not sent and stale forecasts are served instead
+
+OPEN_METEO_BUDGET = config.upstream_settings.open_meteo_budget
+
+NOMINATIM_BUDGET = config.upstream_settings.nominatim_budget
+
+
+# Background prefetch of popular cities, refreshed right after every hourly
+# upstream update by the prefetcher that claims it within PREFETCH_LEAD
+# seconds
+
+PREFETCH_IN_PROCESS = config.prefetch_settings.in_process
+
+PREFETCH_TOP_CITIES = config.prefetch_settings.top_cities
+
+PREFETCH_LEAD = config.prefetch_settings.lead
+
+PREFETCH_INTERVAL = config.prefetch_settings.interval
+
+PREFETCH_OPEN_METEO_RATE = config.prefetch_settings.open_meteo_rate
+
+
+# Fetched daily forecasts are appended to the archive in the background,
+# every FORECAST_ARCHIVE_FLUSH_INTERVAL seconds
+
+FORECAST_ARCHIVE = config.archive_settings.enabled
+
+FORECAST_ARCHIVE_FLUSH_INTERVAL = config.archive_settings.flush_interval
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -1,7 +1,14 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 
+from api.metrics import metrics_view
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/', include('api.urls'))
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view),
 ]
+
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))